@@ -56,6 +56,27 @@ class FocusedPromptBuilderTest {
         assertThat(prompt).doesNotContain("Examples:")
     }
 
+    @Test
+    fun buildCoalescedPrompt_forTwoFields_usesMultiFieldLayout() {
+        val draft = HeuristicDraft(
+            merchant = null,
+            description = null,
+            confidences = mapOf(
+                FieldKey.MERCHANT to 0.1f,
+                FieldKey.DESCRIPTION to 0.1f
+            )
+        )
+
+        val prompt = builder.buildCoalescedPrompt(
+            input = "Bought coffee at Starbucks",
+            heuristicDraft = draft,
+            targetFields = setOf(FieldKey.DESCRIPTION, FieldKey.MERCHANT)
+        )
+
+        assertThat(prompt).contains("Return a JSON object with only these keys: \"merchant\", \"description\"")
+        assertThat(prompt).doesNotContain("Field: Merchant")
+    }
+
     @Test
     fun buildFocusedPrompt_remainsUnderCharacterLimit() {
         val draft = HeuristicDraft(
@@ -309,6 +309,59 @@ class StagedParsingOrchestratorTest {
         ).inOrder()
     }
 
+    @Test
+    fun coalesced_mode_refines_all_fields_with_one_prompt() = runBlocking {
+        val draft = HeuristicDraft(
+            merchant = null,
+            description = null,
+            expenseCategory = null,
+            confidences = mapOf(
+                FieldKey.MERCHANT to 0.1f,
+                FieldKey.DESCRIPTION to 0.2f,
+                FieldKey.EXPENSE_CATEGORY to 0.2f
+            )
+        )
+        val gateway = FakeGenAiGateway().apply {
+            result = Result.success("""{"merchant":"REI","description":"Tent","expenseCategory":"Outdoors"}""")
+        }
+        val orchestrator = StagedParsingOrchestrator(
+            heuristicExtractor = heuristicExtractor,
+            genAiGateway = gateway,
+            focusedPromptBuilder = focusedPromptBuilder,
+            thresholds = thresholds,
+            coalescePrompts = true
+        )
+        val snapshot = StagedParsingOrchestrator.Stage1Snapshot(
+            heuristicDraft = draft,
+            targetFields = listOf(FieldKey.MERCHANT, FieldKey.DESCRIPTION, FieldKey.EXPENSE_CATEGORY),
+            stage1DurationMs = 0L
+        )
+        val updates = mutableListOf<FieldRefinementUpdate>()
+
+        val result = orchestrator.parseStaged(
+            input = "bought a tent at rei",
+            context = ParsingContext(),
+            stage1Snapshot = snapshot,
+            listener = { updates += it }
+        )
+
+        assertThat(gateway.calls).isEqualTo(1)
+        assertThat(gateway.lastPrompt).contains("Return a JSON object with only these keys")
+        assertThat(result.fieldsRefined).containsExactly(
+            FieldKey.MERCHANT,
+            FieldKey.DESCRIPTION,
+            FieldKey.EXPENSE_CATEGORY
+        )
+        assertThat(result.mergedResult.merchant).isEqualTo("REI")
+        assertThat(result.mergedResult.description).isEqualTo("Tent")
+        assertThat(result.mergedResult.expenseCategory).isEqualTo("Outdoors")
+        assertThat(updates.map(FieldRefinementUpdate::field)).containsExactly(
+            FieldKey.MERCHANT,
+            FieldKey.DESCRIPTION,
+            FieldKey.EXPENSE_CATEGORY
+        ).inOrder()
+    }
+
     private class FakeGenAiGateway : GenAiGateway {
         var available: Boolean = true
         var result: Result<String> = Result.success("{}")
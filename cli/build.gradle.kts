@@ -17,6 +17,9 @@ dependencies {
     implementation(project(":parsing"))
     implementation("com.squareup.moshi:moshi-kotlin:1.15.1")
     implementation("org.jetbrains.kotlinx:kotlinx-coroutines-core:1.8.1")
+
+    testImplementation("junit:junit:4.13.2")
+    testImplementation("com.google.truth:truth:1.4.4")
 }
 
 tasks.named<Jar>("jar") {
@@ -8,12 +8,15 @@ import com.voiceexpense.ai.parsing.ParsedResult
 import com.voiceexpense.ai.parsing.ParsingContext
 import com.voiceexpense.ai.parsing.TransactionParser
 import com.voiceexpense.ai.parsing.heuristic.HeuristicDraft
+import com.voiceexpense.ai.parsing.heuristic.toParsedResult
 import com.voiceexpense.ai.parsing.hybrid.HybridParsingResult
 import com.voiceexpense.ai.parsing.hybrid.HybridTransactionParser
 import com.voiceexpense.ai.parsing.hybrid.ProcessingMethod
+import com.voiceexpense.ai.parsing.logging.Log
 import kotlinx.coroutines.runBlocking
 import java.io.BufferedReader
 import java.io.InputStreamReader
+import java.io.PrintStream
 import java.time.LocalDate
 
 private val moshi: Moshi = Moshi.Builder()
@@ -24,11 +27,29 @@ private val inputAdapter = moshi.adapter(CliInput::class.java)
 private val needsAiAdapter = moshi.adapter(CliOutputNeedsAi::class.java)
 private val completeAdapter = moshi.adapter(CliOutputComplete::class.java)
 private val errorAdapter = moshi.adapter(CliError::class.java)
+private val promptRequestAdapter = moshi.adapter(CliPromptRequest::class.java)
+private val promptReplyAdapter = moshi.adapter(CliPromptReply::class.java)
+private val benchmarkInputAdapter = moshi.adapter(BenchmarkInput::class.java)
+private val benchmarkOutputAdapter = moshi.adapter(BenchmarkOutput::class.java)
 
-fun main() {
+private const val INTERACTIVE_FLAG = "--interactive"
+private const val BENCHMARK_FLAG = "--benchmark"
+private const val TAG = "CliMain"
+private const val PROMPT_MODE_COALESCED = "coalesced"
+
+fun main(args: Array<String>) {
     // Initialize console logger for parsing module
     com.voiceexpense.ai.parsing.logging.Log.setLogger(ConsoleLogger())
 
+    if (INTERACTIVE_FLAG in args) {
+        runInteractive(BufferedReader(InputStreamReader(System.`in`)), System.out)
+        return
+    }
+    if (BENCHMARK_FLAG in args) {
+        runBenchmark()
+        return
+    }
+
     val stdin = readStdin()
     if (stdin.isBlank()) {
         emitError("EMPTY_INPUT", "No input provided on stdin")
@@ -45,11 +66,17 @@ fun main() {
     payload.modelResponses?.let { gateway.injectResponses(it) }
 
     val context = payload.context.toParsingContext()
-    val hybrid = HybridTransactionParser(genai = gateway)
+    val hybrid = HybridTransactionParser(genai = gateway, stagedConfig = payload.toStagedConfig())
     val parser = TransactionParser(hybrid = hybrid)
 
     runBlocking {
-        val stage1 = parser.prepareStage1(payload.utterance, context)
+        val restored = payload.stage1Snapshot?.let { token -> Stage1SnapshotCodec.decode(token, payload) }
+        if (payload.stage1Snapshot != null && restored == null) {
+            Log.w(TAG, "Ignoring stage1_snapshot that does not match this payload; recomputing stage 1")
+        }
+        val stage1 = restored
+            ?.let { snapshot -> TransactionParser.Stage1Preparation(snapshot, snapshot.heuristicDraft.toParsedResult(context)) }
+            ?: parser.prepareStage1(payload.utterance, context)
         val staged = runCatching {
             parser.runStagedRefinement(
                 text = payload.utterance,
@@ -69,7 +96,8 @@ fun main() {
                 val output = CliOutputNeedsAi(
                     heuristicResults = summary,
                     promptsNeeded = prompts.map { PromptRequest(field = it.key, prompt = it.value) },
-                    stats = stats
+                    stats = stats,
+                    stage1Snapshot = Stage1SnapshotCodec.encode(stage1.snapshot, payload)
                 )
                 println(needsAiAdapter.toJson(output))
                 return@runBlocking
@@ -77,8 +105,91 @@ fun main() {
         }
 
         val output = staged.toCompleteOutput()
-        println(completeAdapter.toJson(output))
+        val stats = output.stats?.copy(stage1Restored = restored != null)
+        println(completeAdapter.toJson(output.copy(stats = stats)))
+    }
+}
+
+/**
+ * Single-pass protocol: the first stdin line carries the usual payload, then every
+ * prompt is written to stdout as a `prompt` line and the parser suspends until Python
+ * writes the matching reply line back. The final line is the `complete` output.
+ */
+internal fun runInteractive(reader: BufferedReader, out: PrintStream) {
+    val firstLine = reader.readLine()?.trim().orEmpty()
+    if (firstLine.isBlank()) {
+        emitError("EMPTY_INPUT", "No input provided on stdin", out)
+        return
+    }
+
+    val payload = runCatching { inputAdapter.fromJson(firstLine) }.getOrNull()
+    if (payload == null) {
+        emitError("INVALID_JSON", "Unable to decode CLI input", out)
+        return
+    }
+
+    val gateway = PythonGenAiGateway { fieldKey, prompt -> requestResponse(reader, out, fieldKey, prompt) }
+    val context = payload.context.toParsingContext()
+    val hybrid = HybridTransactionParser(genai = gateway, stagedConfig = payload.toStagedConfig())
+    val parser = TransactionParser(hybrid = hybrid)
+
+    runBlocking {
+        val stage1 = parser.prepareStage1(payload.utterance, context)
+        val staged = runCatching {
+            parser.runStagedRefinement(
+                text = payload.utterance,
+                context = context,
+                stage1Snapshot = stage1.snapshot
+            )
+        }.getOrElse { throwable ->
+            emitError("PARSER_ERROR", throwable.message ?: throwable::class.simpleName ?: "Unknown error", out)
+            return@runBlocking
+        }
+
+        val summary = stage1.heuristicDraft.toSummary(stage1.parsedResult)
+        val output = staged.toCompleteOutput().copy(heuristicResults = summary)
+        out.println(completeAdapter.toJson(output))
+        out.flush()
+    }
+}
+
+/**
+ * Benchmark protocol: stdin carries a [BenchmarkInput]; after warm-up the parser stages
+ * are timed in-process and one [BenchmarkOutput] line is written.
+ */
+private fun runBenchmark() {
+    val stdin = readStdin()
+    if (stdin.isBlank()) {
+        emitError("EMPTY_INPUT", "No input provided on stdin")
+        return
+    }
+    val input = runCatching { benchmarkInputAdapter.fromJson(stdin) }.getOrNull()
+    if (input == null || (input.cases.isNullOrEmpty() && input.utterances.isNullOrEmpty())) {
+        emitError("INVALID_JSON", "Unable to decode benchmark input or no utterances supplied")
+        return
     }
+    val output = runCatching { ParserBenchmark(input).run() }.getOrElse { throwable ->
+        emitError("PARSER_ERROR", throwable.message ?: throwable::class.simpleName ?: "Unknown error")
+        return
+    }
+    println(benchmarkOutputAdapter.toJson(output))
+}
+
+private fun requestResponse(
+    reader: BufferedReader,
+    out: PrintStream,
+    fieldKey: String?,
+    prompt: String
+): Result<String> {
+    out.println(promptRequestAdapter.toJson(CliPromptRequest(field = fieldKey, prompt = prompt)))
+    out.flush()
+    val line = reader.readLine()
+        ?: return Result.failure(IllegalStateException("stdin closed before a response for ${fieldKey ?: "unknown"}"))
+    val reply = runCatching { promptReplyAdapter.fromJson(line) }.getOrNull()
+        ?: return Result.failure(IllegalArgumentException("Unable to decode prompt reply"))
+    reply.error?.let { return Result.failure(IllegalStateException(it)) }
+    return reply.response?.let { Result.success(it) }
+        ?: Result.failure(IllegalStateException("No response supplied for ${fieldKey ?: "unknown"}"))
 }
 
 private fun ParsedResult.toSnapshot(): ParsedSnapshot = ParsedSnapshot(
@@ -101,7 +212,12 @@ private fun com.voiceexpense.ai.parsing.hybrid.StagedParsingResult.toStats(): Cl
     totalMs = totalDurationMs
 )
 
-private fun CliContext?.toParsingContext(): ParsingContext {
+private fun CliInput.toStagedConfig(): HybridTransactionParser.StagedParsingConfig = stagedConfigFor(promptMode)
+
+internal fun stagedConfigFor(promptMode: String?): HybridTransactionParser.StagedParsingConfig =
+    HybridTransactionParser.StagedParsingConfig(coalescePrompts = promptMode == PROMPT_MODE_COALESCED)
+
+internal fun CliContext?.toParsingContext(): ParsingContext {
     if (this == null) return ParsingContext()
     val defaultDate = runCatching { defaultDate?.let(LocalDate::parse) }.getOrNull() ?: LocalDate.now()
     return ParsingContext(
@@ -154,9 +270,9 @@ private fun readStdin(): String = BufferedReader(InputStreamReader(System.`in`))
     }
 }.trim()
 
-private fun emitError(code: String, message: String) {
+private fun emitError(code: String, message: String, out: PrintStream = System.out) {
     val json = errorAdapter.toJson(CliError(code = code, message = message))
-    println(json)
+    out.println(json)
 }
 
 @JsonClass(generateAdapter = true)
@@ -13,7 +13,13 @@ data class CliInput(
     val utterance: String,
     val context: CliContext? = null,
     @Json(name = "model_responses")
-    val modelResponses: Map<String, String>? = null
+    val modelResponses: Map<String, String>? = null,
+    /** Token from a previous `needs_ai` output; restores stage 1 instead of recomputing it. */
+    @Json(name = "stage1_snapshot")
+    val stage1Snapshot: String? = null,
+    /** `per_field` (default) or `coalesced` to request one multi-field prompt per utterance. */
+    @Json(name = "prompt_mode")
+    val promptMode: String? = null
 )
 
 /** Representation of optional context fields used to construct a ParsingContext. */
@@ -45,7 +51,9 @@ data class CliOutputNeedsAi(
     val heuristicResults: HeuristicSummary? = null,
     @Json(name = "prompts_needed")
     val promptsNeeded: List<PromptRequest>,
-    val stats: CliStats? = null
+    val stats: CliStats? = null,
+    @Json(name = "stage1_snapshot")
+    val stage1Snapshot: String? = null
 )
 
 /** Result contract when parsing completes without further AI assistance required. */
@@ -54,7 +62,9 @@ data class CliOutputComplete(
     val status: String = "complete",
     val parsed: ParsedSnapshot,
     val method: String,
-    val stats: CliStats? = null
+    val stats: CliStats? = null,
+    @Json(name = "heuristic_results")
+    val heuristicResults: HeuristicSummary? = null
 )
 
 /** Compact snapshot of the parsed result for JSON interchange. */
@@ -96,6 +106,21 @@ data class PromptRequest(
     val prompt: String
 )
 
+/** Prompt emitted mid-parse in interactive mode; the CLI waits for a [CliPromptReply]. */
+@JsonClass(generateAdapter = true)
+data class CliPromptRequest(
+    val status: String = "prompt",
+    val field: String?,
+    val prompt: String
+)
+
+/** Reply written back by Python for the pending interactive prompt. */
+@JsonClass(generateAdapter = true)
+data class CliPromptReply(
+    val response: String? = null,
+    val error: String? = null
+)
+
 /** Flexible timing bucket used for both heuristic-only and full runs. */
 @JsonClass(generateAdapter = true)
 data class CliStats(
@@ -106,5 +131,73 @@ data class CliStats(
     @Json(name = "stage2_ms")
     val stage2Ms: Long? = null,
     @Json(name = "total_ms")
-    val totalMs: Long? = null
+    val totalMs: Long? = null,
+    @Json(name = "stage1_restored")
+    val stage1Restored: Boolean? = null
+)
+
+/**
+ * Stdin payload for `--benchmark`. Either [cases] (each with its own context and canned
+ * model responses) or [utterances] sharing [context] and [modelResponses].
+ */
+@JsonClass(generateAdapter = true)
+data class BenchmarkInput(
+    val cases: List<BenchmarkCase>? = null,
+    val utterances: List<String>? = null,
+    val context: CliContext? = null,
+    @Json(name = "model_responses")
+    val modelResponses: Map<String, String>? = null,
+    @Json(name = "prompt_mode")
+    val promptMode: String? = null,
+    @Json(name = "warmup_iterations")
+    val warmupIterations: Int = 5,
+    val iterations: Int = 20
+)
+
+/** One benchmarked utterance; model responses are keyed like `model_responses` in [CliInput]. */
+@JsonClass(generateAdapter = true)
+data class BenchmarkCase(
+    val utterance: String,
+    val context: CliContext? = null,
+    @Json(name = "model_responses")
+    val modelResponses: Map<String, String>? = null
+)
+
+/** Result of `--benchmark`: per-stage cost over the measured (post-warm-up) iterations. */
+@JsonClass(generateAdapter = true)
+data class BenchmarkOutput(
+    val status: String = "benchmark",
+    val cases: Int,
+    @Json(name = "warmup_iterations")
+    val warmupIterations: Int,
+    val iterations: Int,
+    val stages: Map<String, StageBenchmark>,
+    val jvm: JvmInfo
+)
+
+@JsonClass(generateAdapter = true)
+data class StageBenchmark(
+    val operations: Long,
+    @Json(name = "ns_per_op")
+    val nsPerOp: Double,
+    /** Fastest single iteration, per operation; the least noisy figure to compare. */
+    @Json(name = "best_ns_per_op")
+    val bestNsPerOp: Double,
+    /** Null when the JVM cannot measure per-thread allocation. */
+    @Json(name = "bytes_per_op")
+    val bytesPerOp: Double? = null,
+    @Json(name = "alloc_mb_per_s")
+    val allocMbPerSecond: Double? = null,
+    @Json(name = "gc_count")
+    val gcCount: Long,
+    @Json(name = "gc_ms")
+    val gcMs: Long
+)
+
+@JsonClass(generateAdapter = true)
+data class JvmInfo(
+    val version: String,
+    val vm: String,
+    @Json(name = "available_processors")
+    val availableProcessors: Int
 )
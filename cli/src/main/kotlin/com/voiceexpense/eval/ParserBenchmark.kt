@@ -0,0 +1,150 @@
+package com.voiceexpense.eval
+
+import com.voiceexpense.ai.parsing.ParsingContext
+import com.voiceexpense.ai.parsing.TransactionParser
+import com.voiceexpense.ai.parsing.hybrid.HybridTransactionParser
+import com.voiceexpense.ai.parsing.logging.Log
+import com.voiceexpense.ai.parsing.logging.Logger
+import kotlinx.coroutines.runBlocking
+import java.lang.management.ManagementFactory
+
+/**
+ * JIT-warm throughput of the parsing pipeline, for `--benchmark`.
+ *
+ * Per-call CLI timings are dominated by JVM start-up and a cold JIT, which hides the
+ * cost of the parser itself. Here every case is prepared once, then [BenchmarkInput.warmupIterations]
+ * passes over all cases let the JIT compile the hot paths before [BenchmarkInput.iterations]
+ * measured passes of each stage:
+ * - `stage1`: [TransactionParser.prepareStage1] (heuristics and field selection),
+ * - `stage2`: [TransactionParser.runStagedRefinement] from the stage-1 snapshot, with
+ *   the gateway answering from canned model responses.
+ *
+ * Allocation is read from the current thread's allocation counter. The parser runs
+ * on the `runBlocking` thread, so it sees all of the pipeline's allocation.
+ */
+internal class ParserBenchmark(private val input: BenchmarkInput) {
+
+    private class PreparedCase(
+        val text: String,
+        val context: ParsingContext,
+        val gateway: PythonGenAiGateway,
+        val parser: TransactionParser,
+        val stage1: TransactionParser.Stage1Preparation
+    )
+
+    private val threadBean = ManagementFactory.getThreadMXBean() as? com.sun.management.ThreadMXBean
+    private val allocationSupported = threadBean?.let {
+        if (it.isThreadAllocatedMemorySupported && !it.isThreadAllocatedMemoryEnabled) {
+            it.isThreadAllocatedMemoryEnabled = true
+        }
+        it.isThreadAllocatedMemorySupported && it.isThreadAllocatedMemoryEnabled
+    } ?: false
+
+    // Results are parked here so the JIT cannot discard the work that produced them.
+    @Volatile
+    private var sink: Any? = null
+
+    fun run(): BenchmarkOutput = runBlocking {
+        Log.setLogger(SilentLogger)
+        val cases = prepare()
+        val warmup = input.warmupIterations.coerceAtLeast(0)
+        val iterations = input.iterations.coerceAtLeast(1)
+        val stages = linkedMapOf(
+            "stage1" to measure(cases, warmup, iterations) { case ->
+                case.parser.prepareStage1(case.text, case.context)
+            },
+            "stage2" to measure(cases, warmup, iterations) { case ->
+                case.parser.runStagedRefinement(case.text, case.context, case.stage1.snapshot).also {
+                    case.gateway.consumePrompts()
+                }
+            }
+        )
+        BenchmarkOutput(
+            cases = cases.size,
+            warmupIterations = warmup,
+            iterations = iterations,
+            stages = stages,
+            jvm = JvmInfo(
+                version = System.getProperty("java.version").orEmpty(),
+                vm = System.getProperty("java.vm.name").orEmpty(),
+                availableProcessors = Runtime.getRuntime().availableProcessors()
+            )
+        )
+    }
+
+    private suspend fun prepare(): List<PreparedCase> {
+        val sources = input.cases
+            ?: input.utterances.orEmpty().map { BenchmarkCase(it, input.context, input.modelResponses) }
+        val stagedConfig = stagedConfigFor(input.promptMode)
+        return sources.map { source ->
+            val gateway = PythonGenAiGateway()
+            gateway.injectResponses(source.modelResponses ?: input.modelResponses.orEmpty())
+            val parser = TransactionParser(hybrid = HybridTransactionParser(genai = gateway, stagedConfig = stagedConfig))
+            val context = (source.context ?: input.context).toParsingContext()
+            PreparedCase(
+                text = source.utterance,
+                context = context,
+                gateway = gateway,
+                parser = parser,
+                stage1 = parser.prepareStage1(source.utterance, context)
+            )
+        }
+    }
+
+    private suspend fun measure(
+        cases: List<PreparedCase>,
+        warmup: Int,
+        iterations: Int,
+        operation: suspend (PreparedCase) -> Any
+    ): StageBenchmark {
+        repeat(warmup) { cases.forEach { sink = operation(it) } }
+
+        val gcBefore = gcTotals()
+        val allocatedBefore = allocatedBytes()
+        var totalNs = 0L
+        var bestNs = Long.MAX_VALUE
+        repeat(iterations) {
+            val start = System.nanoTime()
+            cases.forEach { sink = operation(it) }
+            val elapsed = System.nanoTime() - start
+            totalNs += elapsed
+            bestNs = minOf(bestNs, elapsed)
+        }
+        val allocated = allocatedBefore?.let { before -> allocatedBytes()?.minus(before) }
+        val gcAfter = gcTotals()
+
+        val operations = iterations.toLong() * cases.size
+        val perOp = if (operations > 0) totalNs.toDouble() / operations else 0.0
+        return StageBenchmark(
+            operations = operations,
+            nsPerOp = perOp,
+            bestNsPerOp = if (cases.isNotEmpty()) bestNs.toDouble() / cases.size else 0.0,
+            bytesPerOp = allocated?.takeIf { operations > 0 }?.let { it.toDouble() / operations },
+            allocMbPerSecond = allocated?.takeIf { totalNs > 0 }?.let { it / 1_048_576.0 / (totalNs / 1e9) },
+            gcCount = gcAfter.first - gcBefore.first,
+            gcMs = gcAfter.second - gcBefore.second
+        )
+    }
+
+    private fun allocatedBytes(): Long? =
+        if (allocationSupported) threadBean?.currentThreadAllocatedBytes?.takeIf { it >= 0 } else null
+
+    private fun gcTotals(): Pair<Long, Long> {
+        var count = 0L
+        var millis = 0L
+        for (bean in ManagementFactory.getGarbageCollectorMXBeans()) {
+            count += bean.collectionCount.coerceAtLeast(0)
+            millis += bean.collectionTime.coerceAtLeast(0)
+        }
+        return count to millis
+    }
+}
+
+/** Drops parser logging, which would otherwise dominate the measured time. */
+private object SilentLogger : Logger {
+    override fun d(tag: String, message: String) {}
+    override fun e(tag: String, message: String, throwable: Throwable?) {}
+    override fun w(tag: String, message: String) {}
+    override fun i(tag: String, message: String) {}
+    override fun v(tag: String, message: String) {}
+}
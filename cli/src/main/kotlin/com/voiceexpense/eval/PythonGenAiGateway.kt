@@ -13,12 +13,23 @@ import java.util.regex.Pattern
  * prompts and surface a `needs_ai` status back to Python. Once Python provides
  * responses via [injectResponses], the next CLI invocation will reuse the same
  * gateway instance and structured() will return the supplied response strings.
+ *
+ * In interactive mode a [responder] is supplied instead: structured() hands each
+ * prompt to it and suspends until Python answers, so the parser runs exactly once.
+ *
+ * Coalesced multi-field prompts are keyed by their comma-joined JSON keys
+ * (e.g. `merchant,description,tags`).
  */
-class PythonGenAiGateway : GenAiGateway {
+class PythonGenAiGateway(
+    private val responder: (suspend (fieldKey: String?, prompt: String) -> Result<String>)? = null
+) : GenAiGateway {
 
     class NeedsAiException(val fieldKey: String?, message: String) : RuntimeException(message)
 
     private val promptPattern = Pattern.compile("key \"(?<jsonKey>[a-zA-Z0-9_]+)\"")
+    private val coalescedPattern = Pattern.compile(
+        "only these keys: (?<jsonKeys>\"[a-zA-Z0-9_]+\"(?:, \"[a-zA-Z0-9_]+\")*)"
+    )
     private val prompts = LinkedHashMap<String, String>()
     private val responses = ConcurrentHashMap<String, String>()
 
@@ -27,14 +38,14 @@ class PythonGenAiGateway : GenAiGateway {
     override suspend fun structured(prompt: String): Result<String> {
         val key = extractFieldKey(prompt)
         val response = key?.let { responses[it] }
-        return if (response != null) {
-            Result.success(response)
-        } else {
-            if (key != null && !prompts.containsKey(key)) {
-                prompts[key] = prompt
-            }
-            Result.failure(NeedsAiException(key, "AI response required for ${key ?: "unknown"}"))
+        if (response != null) {
+            return Result.success(response)
         }
+        responder?.let { return it(key, prompt) }
+        if (key != null && !prompts.containsKey(key)) {
+            prompts[key] = prompt
+        }
+        return Result.failure(NeedsAiException(key, "AI response required for ${key ?: "unknown"}"))
     }
 
     fun injectResponses(modelResponses: Map<String, String>) {
@@ -50,6 +61,10 @@ class PythonGenAiGateway : GenAiGateway {
     }
 
     private fun extractFieldKey(prompt: String): String? {
+        val coalesced = coalescedPattern.matcher(prompt)
+        if (coalesced.find()) {
+            return coalesced.group("jsonKeys").split(", ").joinToString(separator = ",") { it.trim('"') }
+        }
         val matcher = promptPattern.matcher(prompt)
         if (matcher.find()) {
             return matcher.group("jsonKey")
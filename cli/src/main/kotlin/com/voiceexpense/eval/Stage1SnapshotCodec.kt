@@ -0,0 +1,113 @@
+package com.voiceexpense.eval
+
+import com.squareup.moshi.Json
+import com.squareup.moshi.JsonClass
+import com.squareup.moshi.Moshi
+import com.squareup.moshi.kotlin.reflect.KotlinJsonAdapterFactory
+import com.voiceexpense.ai.parsing.heuristic.FieldKey
+import com.voiceexpense.ai.parsing.heuristic.HeuristicDraft
+import com.voiceexpense.ai.parsing.hybrid.StagedParsingOrchestrator
+import java.math.BigDecimal
+import java.security.MessageDigest
+import java.time.LocalDate
+import java.util.Base64
+
+/**
+ * Converts [StagedParsingOrchestrator.Stage1Snapshot] to and from an opaque token.
+ *
+ * The `needs_ai` output carries the token so the stage-2 invocation can restore the
+ * exact heuristic draft and target fields instead of re-running stage 0. Tokens are
+ * bound to the utterance and context they were produced for; a token presented with a
+ * different payload is rejected and the CLI falls back to recomputing stage 1.
+ */
+object Stage1SnapshotCodec {
+
+    private const val VERSION = 1
+
+    private val moshi: Moshi = Moshi.Builder()
+        .addLast(KotlinJsonAdapterFactory())
+        .build()
+    private val payloadAdapter = moshi.adapter(SnapshotPayload::class.java)
+    private val contextAdapter = moshi.adapter(CliContext::class.java)
+
+    fun encode(snapshot: StagedParsingOrchestrator.Stage1Snapshot, input: CliInput): String {
+        val draft = snapshot.heuristicDraft
+        val payload = SnapshotPayload(
+            version = VERSION,
+            fingerprint = fingerprint(input),
+            amountUsd = draft.amountUsd?.toPlainString(),
+            merchant = draft.merchant,
+            description = draft.description,
+            type = draft.type,
+            expenseCategory = draft.expenseCategory,
+            incomeCategory = draft.incomeCategory,
+            tags = draft.tags,
+            userLocalDate = draft.userLocalDate?.toString(),
+            account = draft.account,
+            splitOverallChargedUsd = draft.splitOverallChargedUsd?.toPlainString(),
+            confidences = draft.confidences.mapKeys { it.key.name },
+            targetFields = snapshot.targetFields.map { it.name },
+            stage1DurationMs = snapshot.stage1DurationMs
+        )
+        val json = payloadAdapter.toJson(payload)
+        return Base64.getUrlEncoder().withoutPadding().encodeToString(json.toByteArray(Charsets.UTF_8))
+    }
+
+    fun decode(token: String, input: CliInput): StagedParsingOrchestrator.Stage1Snapshot? {
+        val payload = runCatching {
+            val json = String(Base64.getUrlDecoder().decode(token), Charsets.UTF_8)
+            payloadAdapter.fromJson(json)
+        }.getOrNull() ?: return null
+        if (payload.version != VERSION || payload.fingerprint != fingerprint(input)) return null
+
+        return runCatching {
+            val draft = HeuristicDraft(
+                amountUsd = payload.amountUsd?.let(::BigDecimal),
+                merchant = payload.merchant,
+                description = payload.description,
+                type = payload.type,
+                expenseCategory = payload.expenseCategory,
+                incomeCategory = payload.incomeCategory,
+                tags = payload.tags,
+                userLocalDate = payload.userLocalDate?.let(LocalDate::parse),
+                account = payload.account,
+                splitOverallChargedUsd = payload.splitOverallChargedUsd?.let(::BigDecimal),
+                confidences = payload.confidences.mapKeys { FieldKey.valueOf(it.key) }
+            )
+            StagedParsingOrchestrator.Stage1Snapshot(
+                heuristicDraft = draft,
+                targetFields = payload.targetFields.map(FieldKey::valueOf),
+                stage1DurationMs = payload.stage1DurationMs
+            )
+        }.getOrNull()
+    }
+
+    private fun fingerprint(input: CliInput): String {
+        val digest = MessageDigest.getInstance("SHA-256")
+        digest.update(input.utterance.toByteArray(Charsets.UTF_8))
+        digest.update(0)
+        digest.update(contextAdapter.toJson(input.context ?: CliContext()).toByteArray(Charsets.UTF_8))
+        return digest.digest().joinToString(separator = "") { "%02x".format(it) }
+    }
+
+    @JsonClass(generateAdapter = true)
+    data class SnapshotPayload(
+        val version: Int,
+        val fingerprint: String,
+        val amountUsd: String? = null,
+        val merchant: String? = null,
+        val description: String? = null,
+        val type: String? = null,
+        val expenseCategory: String? = null,
+        val incomeCategory: String? = null,
+        val tags: List<String> = emptyList(),
+        val userLocalDate: String? = null,
+        val account: String? = null,
+        val splitOverallChargedUsd: String? = null,
+        val confidences: Map<String, Float> = emptyMap(),
+        @Json(name = "targetFields")
+        val targetFields: List<String> = emptyList(),
+        @Json(name = "stage1DurationMs")
+        val stage1DurationMs: Long = 0L
+    )
+}
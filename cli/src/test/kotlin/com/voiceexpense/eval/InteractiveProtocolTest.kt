@@ -0,0 +1,74 @@
+package com.voiceexpense.eval
+
+import com.google.common.truth.Truth.assertThat
+import com.squareup.moshi.Moshi
+import com.squareup.moshi.Types
+import org.junit.Test
+import java.io.BufferedReader
+import java.io.ByteArrayOutputStream
+import java.io.InputStreamReader
+import java.io.PipedInputStream
+import java.io.PipedOutputStream
+import java.io.PrintStream
+import java.io.StringReader
+import java.util.concurrent.TimeUnit
+import kotlin.concurrent.thread
+
+class InteractiveProtocolTest {
+
+    private val messageAdapter = Moshi.Builder().build().adapter<Map<String, Any?>>(
+        Types.newParameterizedType(Map::class.java, String::class.java, Any::class.java)
+    )
+
+    @Test
+    fun interactiveSession_answersEachPromptBeforeCompleting() {
+        val toCli = PipedOutputStream()
+        val cliStdin = BufferedReader(InputStreamReader(PipedInputStream(toCli), Charsets.UTF_8))
+        val fromCli = PipedInputStream()
+        val cliStdout = PrintStream(PipedOutputStream(fromCli), true, "UTF-8")
+        val session = thread(name = "interactive-cli") {
+            try {
+                runInteractive(cliStdin, cliStdout)
+            } finally {
+                cliStdout.close()
+            }
+        }
+
+        val replies = PrintStream(toCli, true, "UTF-8")
+        val lines = BufferedReader(InputStreamReader(fromCli, Charsets.UTF_8))
+        replies.println("""{"utterance":"Spent 20 dollars","context":{"defaultDate":"2025-01-15"}}""")
+        val promptedFields = mutableListOf<Any?>()
+        var final: Map<String, Any?>
+        while (true) {
+            val line = lines.readLine() ?: error("CLI closed stdout before the complete line")
+            val message = messageAdapter.fromJson(line)!!
+            if (message["status"] != "prompt") {
+                final = message
+                break
+            }
+            assertThat(message["prompt"] as String).isNotEmpty()
+            promptedFields += message["field"]
+            // Each prompt is answered only after it arrives, as the Python side does.
+            replies.println("""{"response":"{\"merchant\":\"Starbucks\",\"description\":\"Coffee\"}"}""")
+        }
+        session.join(TimeUnit.SECONDS.toMillis(30))
+
+        assertThat(session.isAlive).isFalse()
+        assertThat(promptedFields).contains("merchant")
+        assertThat(final["status"]).isEqualTo("complete")
+        assertThat(final["method"]).isEqualTo("AI")
+        assertThat((final["parsed"] as Map<*, *>)["merchant"]).isEqualTo("Starbucks")
+        assertThat(lines.readLine()).isNull()
+    }
+
+    @Test
+    fun interactiveSession_withEmptyInput_reportsError() {
+        val output = ByteArrayOutputStream()
+
+        runInteractive(BufferedReader(StringReader("")), PrintStream(output, true, "UTF-8"))
+
+        val message = messageAdapter.fromJson(output.toString("UTF-8").trim())!!
+        assertThat(message["status"]).isEqualTo("error")
+        assertThat(message["code"]).isEqualTo("EMPTY_INPUT")
+    }
+}
@@ -0,0 +1,76 @@
+package com.voiceexpense.eval
+
+import com.google.common.truth.Truth.assertThat
+import com.voiceexpense.ai.parsing.heuristic.FieldKey
+import com.voiceexpense.ai.parsing.heuristic.HeuristicDraft
+import com.voiceexpense.ai.parsing.hybrid.StagedParsingOrchestrator
+import org.junit.Test
+import java.math.BigDecimal
+import java.time.LocalDate
+
+class Stage1SnapshotCodecTest {
+
+    private val input = CliInput(
+        utterance = "Spent 12.50 at Blue Bottle on coffee",
+        context = CliContext(
+            allowedExpenseCategories = listOf("Dining", "Groceries"),
+            defaultDate = "2025-01-15"
+        )
+    )
+
+    private val snapshot = StagedParsingOrchestrator.Stage1Snapshot(
+        heuristicDraft = HeuristicDraft(
+            amountUsd = BigDecimal("12.50"),
+            merchant = "Blue Bottle",
+            description = null,
+            type = "Expense",
+            expenseCategory = "Dining",
+            tags = listOf("coffee"),
+            userLocalDate = LocalDate.of(2025, 1, 15),
+            splitOverallChargedUsd = BigDecimal("25.00"),
+            confidences = mapOf(
+                FieldKey.AMOUNT_USD to 0.95f,
+                FieldKey.MERCHANT to 0.6f,
+                FieldKey.DESCRIPTION to 0.1f
+            )
+        ),
+        targetFields = listOf(FieldKey.DESCRIPTION, FieldKey.MERCHANT),
+        stage1DurationMs = 7L
+    )
+
+    @Test
+    fun decode_roundTripsEncodedSnapshot() {
+        val token = Stage1SnapshotCodec.encode(snapshot, input)
+
+        val restored = Stage1SnapshotCodec.decode(token, input)
+
+        assertThat(restored).isEqualTo(snapshot)
+    }
+
+    @Test
+    fun decode_rejectsTokenForDifferentUtterance() {
+        val token = Stage1SnapshotCodec.encode(snapshot, input)
+
+        val restored = Stage1SnapshotCodec.decode(token, input.copy(utterance = "Spent 13 at Blue Bottle"))
+
+        assertThat(restored).isNull()
+    }
+
+    @Test
+    fun decode_rejectsTokenForDifferentContext() {
+        val token = Stage1SnapshotCodec.encode(snapshot, input)
+
+        val restored = Stage1SnapshotCodec.decode(
+            token,
+            input.copy(context = input.context?.copy(allowedExpenseCategories = listOf("Dining")))
+        )
+
+        assertThat(restored).isNull()
+    }
+
+    @Test
+    fun decode_rejectsMalformedToken() {
+        assertThat(Stage1SnapshotCodec.decode("not a token", input)).isNull()
+        assertThat(Stage1SnapshotCodec.decode("", input)).isNull()
+    }
+}
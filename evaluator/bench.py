@@ -0,0 +1,339 @@
+"""Micro-benchmarks of the evaluator's hot paths at several suite sizes.
+
+Each operation runs on synthetic data of every size, timed best-of-``--repeat``. A
+separate ``tracemalloc`` pass measures its peak allocation, so tracing does not
+inflate the times. The operations are:
+- ``load_test_cases``: parse a markdown suite,
+- ``cli_payloads``: ``build_cli_payload`` plus JSON encoding for every case,
+- ``compare_results`` and ``compute_metrics``,
+- ``compute_metrics_reference``: the list-based metrics, for comparison with ``compute_metrics``,
+- ``results_markdown``, ``summary_markdown`` and ``debug_markdown``,
+- ``write_reports``: ``write_markdown_reports``, streaming all three files to disk.
+
+Results are checked against ``bench_baselines.json``. An operation fails when it is
+slower than its baseline by more than ``--time-tolerance`` or allocates more than
+``--memory-tolerance``. Timings are machine-specific, so refresh the baselines with
+``--update-baselines`` on the machine that runs the check.
+
+    python bench.py                       # 1k/10k/100k cases, compare with baselines
+    python bench.py --cases 1000 --ops compare_results compute_metrics
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Mapping, MutableMapping, Optional, Sequence
+
+import evaluate
+from evaluate import PromptExchange, TestComparison, TestExecutionResult
+from generation_stats import TokenStats
+from timing import WALL_PHASES
+
+BASELINES_FILE = Path(__file__).resolve().with_name("bench_baselines.json")
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_TIME_TOLERANCE_PCT = 50.0
+DEFAULT_MEMORY_TOLERANCE_PCT = 10.0
+# Sub-millisecond operations swing by more than any sensible tolerance.
+MIN_TIME_DELTA_MS = 1.0
+PROMPT_FILLER = "Guideline: answer with the value only; prefer the allowed options when they fit.\n" * 6
+
+
+@dataclass
+class BenchData:
+    """Inputs shared by the operations at one suite size."""
+
+    suite_path: Path
+    cases: List[evaluate.TestCase]
+    context: Mapping[str, Any]
+    executions: List[TestExecutionResult]
+    comparisons: List[TestComparison]
+    metrics: evaluate.EvaluationMetrics
+
+
+@dataclass
+class Measurement:
+    operation: str
+    cases: int
+    ms: float
+    peak_kib: float
+
+
+def op_load_test_cases(data: BenchData) -> Any:
+    return evaluate.load_test_cases(data.suite_path)
+
+
+def op_cli_payloads(data: BenchData) -> Any:
+    return [
+        json.dumps(
+            evaluate.build_cli_payload(case.utterance, evaluate._build_case_context(case, data.context)),
+            ensure_ascii=False,
+        )
+        for case in data.cases
+    ]
+
+
+def op_compare_results(data: BenchData) -> Any:
+    return evaluate.compare_results(data.executions)
+
+
+def op_compute_metrics(data: BenchData) -> Any:
+    return evaluate.compute_metrics(data.comparisons)
+
+
+def op_compute_metrics_reference(data: BenchData) -> Any:
+    return evaluate.compute_metrics_reference(data.comparisons)
+
+
+def op_results_markdown(data: BenchData) -> Any:
+    return evaluate.build_results_markdown(data.comparisons)
+
+
+def op_summary_markdown(data: BenchData) -> Any:
+    return evaluate.build_summary_markdown(data.metrics)
+
+
+def op_debug_markdown(data: BenchData) -> Any:
+    return evaluate.build_debug_markdown(data.comparisons)
+
+
+def op_write_reports(data: BenchData) -> Any:
+    return evaluate.write_markdown_reports(
+        data.comparisons, data.metrics, output_dir=data.suite_path.parent, timestamp="bench"
+    )
+
+
+OPERATIONS: Mapping[str, Callable[[BenchData], Any]] = {
+    "load_test_cases": op_load_test_cases,
+    "cli_payloads": op_cli_payloads,
+    "compare_results": op_compare_results,
+    "compute_metrics": op_compute_metrics,
+    "compute_metrics_reference": op_compute_metrics_reference,
+    "results_markdown": op_results_markdown,
+    "summary_markdown": op_summary_markdown,
+    "debug_markdown": op_debug_markdown,
+    "write_reports": op_write_reports,
+}
+
+
+def build_data(count: int, directory: Path, *, seed: int = 0) -> BenchData:
+    """Synthetic suite file, cases and scored executions for ``count`` cases."""
+
+    from columnar import synthetic_executions
+    from synthetic import (
+        DEFAULT_ACCOUNTS,
+        DEFAULT_EXPENSE_CATEGORIES,
+        DEFAULT_INCOME_CATEGORIES,
+        DEFAULT_MERCHANTS,
+        DEFAULT_TAGS,
+        write_markdown,
+    )
+
+    executions = synthetic_executions(count, seed=seed)
+    add_prompts(executions, seed=seed)
+    suite_path = directory / f"suite_{count}.md"
+    with suite_path.open("w", encoding="utf-8") as handle:
+        write_markdown((execution.case for execution in executions), handle)
+    comparisons = evaluate.compare_results(executions)
+    return BenchData(
+        suite_path=suite_path,
+        cases=[execution.case for execution in executions],
+        context={
+            "allowedExpenseCategories": list(DEFAULT_EXPENSE_CATEGORIES),
+            "allowedIncomeCategories": list(DEFAULT_INCOME_CATEGORIES),
+            "allowedTags": list(DEFAULT_TAGS),
+            "allowedAccounts": list(DEFAULT_ACCOUNTS),
+            "recentMerchants": list(DEFAULT_MERCHANTS),
+            "knownAccounts": list(DEFAULT_ACCOUNTS),
+        },
+        executions=executions,
+        comparisons=comparisons,
+        metrics=evaluate.compute_metrics(comparisons),
+    )
+
+
+def add_prompts(executions: Sequence[TestExecutionResult], *, seed: int = 0) -> None:
+    """Give AI cases prompts, token stats and wall-clock phases like a real run's."""
+
+    rng = random.Random(seed + 1)
+    for execution in executions:
+        execution.timings = {key: rng.lognormvariate(1, 1) for key, _ in WALL_PHASES}
+        if execution.method != "ai":
+            continue
+        for field_name in rng.sample(("merchant", "description", "expenseCategory", "tags"), rng.randint(1, 3)):
+            prompt = f"Input: {execution.case.utterance}\nField: {field_name}\n{PROMPT_FILLER}"
+            value = (execution.parsed or {}).get(field_name)
+            execution.prompts.append(
+                PromptExchange(
+                    field=field_name,
+                    prompt=prompt,
+                    response=str(value) if value is not None else None,
+                    generation_ms=rng.lognormvariate(4, 0.5),
+                    tokens=TokenStats(
+                        prompt_tokens=len(prompt) // 4,
+                        generated_tokens=rng.randint(1, 12),
+                        padding_tokens=rng.randint(0, 40),
+                        prefill_ms=rng.lognormvariate(3, 0.3),
+                        decode_ms=rng.lognormvariate(4, 0.3),
+                    ),
+                )
+            )
+
+
+def measure(operation: str, data: BenchData, *, repeat: int) -> Measurement:
+    function = OPERATIONS[operation]
+    best = math.inf
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function(data)
+        best = min(best, time.perf_counter() - start)
+        del result
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        result = function(data)
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return Measurement(operation, len(data.cases), best * 1000, max(0, peak - base) / 1024)
+
+
+def load_baselines(path: Path) -> MutableMapping[str, Any]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_baselines(path: Path, measurements: Sequence[Measurement], previous: Mapping[str, Any]) -> None:
+    """Store ``measurements`` over ``previous``, keeping sizes and operations not re-run."""
+
+    results: MutableMapping[str, MutableMapping[str, Any]] = {
+        operation: dict(sizes) for operation, sizes in (previous.get("results") or {}).items()
+    }
+    for item in measurements:
+        results.setdefault(item.operation, {})[str(item.cases)] = {
+            "ms": round(item.ms, 3),
+            "peak_kib": round(item.peak_kib, 1),
+        }
+    payload = {
+        "machine": platform.platform(),
+        "python": platform.python_version(),
+        "recorded": time.strftime("%Y-%m-%d"),
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def check(
+    item: Measurement,
+    baselines: Mapping[str, Any],
+    *,
+    time_tolerance: float,
+    memory_tolerance: float,
+) -> tuple[str, List[str]]:
+    """Change against the baseline as table text, plus any threshold violations."""
+
+    baseline = ((baselines.get("results") or {}).get(item.operation) or {}).get(str(item.cases))
+    if not baseline:
+        return "no baseline", []
+    problems = []
+    time_change = item.ms / baseline["ms"] - 1 if baseline.get("ms") else 0.0
+    memory_change = item.peak_kib / baseline["peak_kib"] - 1 if baseline.get("peak_kib") else 0.0
+    if time_change * 100 > time_tolerance and item.ms - baseline["ms"] >= MIN_TIME_DELTA_MS:
+        problems.append(f"{item.operation} @ {item.cases}: time {time_change * 100:+.0f}%")
+    if memory_change * 100 > memory_tolerance:
+        problems.append(f"{item.operation} @ {item.cases}: memory {memory_change * 100:+.0f}%")
+    return f"{time_change * 100:+.0f}% time, {memory_change * 100:+.0f}% memory", problems
+
+
+def parse_bench_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the evaluator's hot paths on synthetic suites.")
+    parser.add_argument("--cases", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Suite sizes to run.")
+    parser.add_argument("--ops", nargs="+", choices=list(OPERATIONS), help="Operations to run (default: all).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per operation; the fastest is reported.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data.")
+    parser.add_argument("--baselines", type=Path, default=BASELINES_FILE, help="Baseline file to check against.")
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=DEFAULT_TIME_TOLERANCE_PCT,
+        metavar="PCT",
+        help=f"Allowed slowdown over the baseline (default: {DEFAULT_TIME_TOLERANCE_PCT:g}).",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=DEFAULT_MEMORY_TOLERANCE_PCT,
+        metavar="PCT",
+        help=f"Allowed growth of peak allocation over the baseline (default: {DEFAULT_MEMORY_TOLERANCE_PCT:g}).",
+    )
+    parser.add_argument(
+        "--update-baselines",
+        action="store_true",
+        help="Write this run's numbers to the baseline file instead of checking them.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:  # pragma: no cover - CLI entrypoint
+    args = parse_bench_args(argv)
+    if any(count < 1 for count in args.cases) or args.repeat < 1:
+        print("Error: --cases and --repeat must be positive.", file=sys.stderr)
+        raise SystemExit(3)
+    try:
+        baselines = load_baselines(args.baselines)
+    except (OSError, ValueError) as exc:
+        print(f"Error: could not read baselines: {exc}", file=sys.stderr)
+        raise SystemExit(3) from exc
+
+    operations = args.ops or list(OPERATIONS)
+    measurements: List[Measurement] = []
+    problems: List[str] = []
+    print("| Operation | Cases | Time | Per case | Peak alloc | Per case | vs. baseline |")
+    print("| --- | --- | --- | --- | --- | --- | --- |")
+    with tempfile.TemporaryDirectory(prefix="evaluator-bench-") as directory:
+        for count in args.cases:
+            data = build_data(count, Path(directory), seed=args.seed)
+            for operation in operations:
+                item = measure(operation, data, repeat=args.repeat)
+                measurements.append(item)
+                verdict, failed = check(
+                    item,
+                    baselines,
+                    time_tolerance=args.time_tolerance,
+                    memory_tolerance=args.memory_tolerance,
+                )
+                problems.extend(failed)
+                print(
+                    f"| {operation} | {count} | {item.ms:,.1f} ms | {item.ms * 1000 / count:,.1f} µs "
+                    f"| {item.peak_kib:,.0f} KiB | {item.peak_kib * 1024 / count:,.0f} B "
+                    f"| {'❌ ' if failed else ''}{verdict} |",
+                    flush=True,
+                )
+            del data
+
+    if args.update_baselines:
+        write_baselines(args.baselines, measurements, baselines)
+        print(f"Baselines written to: {args.baselines}")
+        raise SystemExit(0)
+    if problems:
+        print("Slower or larger than baseline: " + "; ".join(problems), file=sys.stderr)
+        raise SystemExit(6)
+    raise SystemExit(0)
+
+
+if __name__ == "__main__":
+    main()
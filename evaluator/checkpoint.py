@@ -0,0 +1,108 @@
+"""Append-only JSONL run log used for checkpointing and ``--resume``."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Collection, Iterator, Mapping, MutableMapping, Optional, TextIO, Tuple
+
+DEFAULT_FSYNC_EVERY = 16
+DEFAULT_FSYNC_SECONDS = 5.0
+
+
+class CheckpointLog:
+    """Write one JSON record per line, flushing each and fsyncing in batches.
+
+    Every record is flushed to the OS immediately so other processes can tail the log.
+    ``os.fsync`` runs every ``fsync_every`` records or ``fsync_seconds``, whichever
+    comes first, and again on close. A crash therefore loses at most one batch to power
+    failure and nothing to a Python exception.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        fsync_every: int = DEFAULT_FSYNC_EVERY,
+        fsync_seconds: float = DEFAULT_FSYNC_SECONDS,
+    ) -> None:
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_seconds = fsync_seconds
+        path.parent.mkdir(parents=True, exist_ok=True)
+        torn_tail = _ends_mid_line(path)
+        self._handle: Optional[TextIO] = path.open("a", encoding="utf-8")
+        if torn_tail:
+            # Terminate a partial line from a crashed run so the next record stays parseable.
+            self._handle.write("\n")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, record: Mapping[str, Any]) -> None:
+        if self._handle is None:
+            raise ValueError(f"Checkpoint log {self.path} is closed.")
+        self._handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._handle.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_seconds:
+            self.sync()
+
+    def sync(self) -> None:
+        if self._handle is None or not self._unsynced:
+            return
+        os.fsync(self._handle.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._handle is None:
+            return
+        self.sync()
+        self._handle.close()
+        self._handle = None
+
+    def __enter__(self) -> "CheckpointLog":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def _ends_mid_line(path: Path) -> bool:
+    if not path.exists() or path.stat().st_size == 0:
+        return False
+    with path.open("rb") as handle:
+        handle.seek(-1, os.SEEK_END)
+        return handle.read(1) != b"\n"
+
+
+def read_records(path: Path, *, lines: Optional[Collection[int]] = None) -> Iterator[MutableMapping[str, Any]]:
+    """Yield records from a log, skipping a torn final line left by a crash.
+
+    With ``lines`` only those (0-based) line numbers are decoded; the rest are skipped
+    without parsing.
+    """
+
+    for _, record in read_numbered_records(path, lines=lines):
+        yield record
+
+
+def read_numbered_records(
+    path: Path, *, lines: Optional[Collection[int]] = None
+) -> Iterator[Tuple[int, MutableMapping[str, Any]]]:
+    """Like ``read_records``, yielding ``(line number, record)`` pairs."""
+
+    with path.open("r", encoding="utf-8") as handle:
+        for number, line in enumerate(handle):
+            if lines is not None and number not in lines:
+                continue
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, MutableMapping):
+                yield number, record
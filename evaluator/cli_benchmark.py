@@ -0,0 +1,194 @@
+"""``--cli-benchmark``: JIT-warm parser throughput from the CLI's ``--benchmark`` mode.
+
+Per-case CLI timings mostly measure JVM start-up. This launches the jar once with the
+run's utterances, contexts and the model responses the run actually produced. The CLI
+warms up, then times ``prepareStage1`` and ``runStagedRefinement`` in-process over many
+iterations. The result (ns/op, bytes allocated per op and allocation rate per stage)
+is written to ``<timestamp>_cli_benchmark.md`` and recorded in the run history next to
+accuracy.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Mapping, MutableMapping, Optional, Sequence
+
+import evaluate
+from evaluate import CliInvocationError, TestExecutionResult
+from timing import run_process
+
+BENCHMARK_FLAG = "--benchmark"
+BENCHMARK_TIMEOUT_SECONDS = 1800
+STAGE_LABELS = {
+    "stage1": "Stage 1 (prepareStage1)",
+    "stage2": "Stage 2 (runStagedRefinement)",
+}
+
+
+@dataclass
+class StageBenchmark:
+    operations: int
+    ns_per_op: float
+    best_ns_per_op: float
+    bytes_per_op: Optional[float]
+    alloc_mb_per_s: Optional[float]
+    gc_count: int
+    gc_ms: int
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> "StageBenchmark":
+        return cls(
+            operations=int(data.get("operations") or 0),
+            ns_per_op=float(data.get("ns_per_op") or 0.0),
+            best_ns_per_op=float(data.get("best_ns_per_op") or 0.0),
+            bytes_per_op=data.get("bytes_per_op"),
+            alloc_mb_per_s=data.get("alloc_mb_per_s"),
+            gc_count=int(data.get("gc_count") or 0),
+            gc_ms=int(data.get("gc_ms") or 0),
+        )
+
+
+@dataclass
+class CliBenchmark:
+    """One ``--benchmark`` run of the CLI over a set of cases."""
+
+    cases: int
+    warmup_iterations: int
+    iterations: int
+    stages: MutableMapping[str, StageBenchmark]
+    jvm: Mapping[str, Any]
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> "CliBenchmark":
+        return cls(
+            cases=int(data.get("cases") or 0),
+            warmup_iterations=int(data.get("warmup_iterations") or 0),
+            iterations=int(data.get("iterations") or 0),
+            stages={name: StageBenchmark.from_json(stage) for name, stage in (data.get("stages") or {}).items()},
+            jvm=data.get("jvm") or {},
+        )
+
+
+def benchmark_payload(
+    executions: Sequence[TestExecutionResult],
+    *,
+    base_context: Mapping[str, Any],
+    prompt_mode: str,
+    iterations: int,
+    warmup: int,
+) -> MutableMapping[str, Any]:
+    """The CLI's ``BenchmarkInput``: each case with its context and the run's model responses."""
+
+    cases: List[MutableMapping[str, Any]] = []
+    for execution in executions:
+        case: MutableMapping[str, Any] = {
+            "utterance": execution.case.utterance,
+            "context": evaluate._build_case_context(execution.case, base_context),
+        }
+        responses = {exchange.field: exchange.response for exchange in execution.prompts if exchange.response}
+        if responses:
+            case["model_responses"] = responses
+        cases.append(case)
+    payload: MutableMapping[str, Any] = {"cases": cases, "warmup_iterations": warmup, "iterations": iterations}
+    if prompt_mode != evaluate.PROMPT_MODE_PER_FIELD:
+        payload["prompt_mode"] = prompt_mode
+    return payload
+
+
+def run_cli_benchmark(
+    executions: Sequence[TestExecutionResult],
+    *,
+    base_context: Mapping[str, Any],
+    prompt_mode: str,
+    iterations: int,
+    warmup: int,
+    jar_path: Optional[Path] = None,
+    java_cmd: Sequence[str] = evaluate.DEFAULT_JAVA_CMD,
+    timeout_seconds: int = BENCHMARK_TIMEOUT_SECONDS,
+) -> CliBenchmark:
+    payload = benchmark_payload(
+        executions,
+        base_context=base_context,
+        prompt_mode=prompt_mode,
+        iterations=iterations,
+        warmup=warmup,
+    )
+    args = (*java_cmd, "-jar", str(jar_path or evaluate.find_cli_jar()), BENCHMARK_FLAG)
+    try:
+        completed = run_process(args, json.dumps(payload, ensure_ascii=False), timeout=timeout_seconds)
+    except subprocess.TimeoutExpired as exc:
+        raise CliInvocationError(f"CLI benchmark timed out after {timeout_seconds} seconds") from exc
+    except FileNotFoundError as exc:  # pragma: no cover - environment issue
+        raise CliInvocationError(f"Failed to launch CLI process: {args[0]!r} not found") from exc
+    stdout = completed.stdout.strip()
+    if completed.returncode != 0 or not stdout:
+        raise CliInvocationError(
+            f"CLI benchmark exited with code {completed.returncode}",
+            stdout=stdout,
+            stderr=completed.stderr.strip(),
+        )
+    try:
+        data = json.loads(stdout.splitlines()[-1])
+    except ValueError as exc:
+        raise CliInvocationError("Failed to parse CLI benchmark output", stdout=stdout) from exc
+    if data.get("status") != "benchmark":
+        raise CliInvocationError(
+            f"CLI benchmark failed: {data.get('code', 'error')}: {data.get('message', stdout)}",
+            stdout=stdout,
+        )
+    return CliBenchmark.from_json(data)
+
+
+def build_cli_benchmark_markdown(results: Mapping[str, CliBenchmark]) -> str:
+    lines: List[str] = ["# CLI Parser Benchmark", ""]
+    for mode, result in results.items():
+        jvm = " ".join(str(part) for part in (result.jvm.get("vm") or "JVM", result.jvm.get("version")) if part)
+        lines.append(f"## {mode}" if len(results) > 1 else f"Prompt mode: {mode}")
+        lines.append("")
+        lines.append(
+            f"{result.cases} case(s), {result.warmup_iterations} warm-up and {result.iterations} measured "
+            f"iteration(s) on {jvm} ({result.jvm.get('available_processors', '?')} CPUs)."
+        )
+        lines.append("")
+        lines.append("| Stage | Ops | Mean | Best iteration | Allocated / op | Allocation rate | GCs (ms) |")
+        lines.append("| --- | --- | --- | --- | --- | --- | --- |")
+        for name, stage in result.stages.items():
+            lines.append(
+                f"| {STAGE_LABELS.get(name, name)} | {stage.operations} | {format_ns(stage.ns_per_op)} "
+                f"| {format_ns(stage.best_ns_per_op)} | {format_bytes(stage.bytes_per_op)} "
+                f"| {f'{stage.alloc_mb_per_s:,.1f} MB/s' if stage.alloc_mb_per_s is not None else 'n/a'} "
+                f"| {stage.gc_count} ({stage.gc_ms}) |"
+            )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_cli_benchmark(results: Mapping[str, CliBenchmark], output_dir: Path) -> Path:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_cli_benchmark.md"
+    path.write_text(build_cli_benchmark_markdown(results), encoding="utf-8")
+    return path
+
+
+def format_ns(value: Optional[float]) -> str:
+    if value is None:
+        return "n/a"
+    if value >= 1_000_000:
+        return f"{value / 1_000_000:,.2f} ms/op"
+    if value >= 1_000:
+        return f"{value / 1_000:,.1f} µs/op"
+    return f"{value:,.0f} ns/op"
+
+
+def format_bytes(value: Optional[float]) -> str:
+    if value is None:
+        return "n/a"
+    if value >= 1024 * 1024:
+        return f"{value / (1024 * 1024):,.2f} MiB"
+    if value >= 1024:
+        return f"{value / 1024:,.1f} KiB"
+    return f"{value:,.0f} B"
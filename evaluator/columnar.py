@@ -0,0 +1,370 @@
+"""Columnar comparison and metrics over a pandas results frame.
+
+``results_frame`` lays executions out one row per case, with the expected and actual
+value of every compared field as a column. ``compare_frame`` canonicalizes and matches
+whole columns at once, using the same rules as ``evaluate.compare_field``:
+- decimal tolerance,
+- casefolded strings,
+- sorted tag sets,
+- ISO dates.
+Per-field accuracy, metrics and slices by method or expected type are then single
+passes over the frame.
+
+Run ``python columnar.py --cases 100000`` to benchmark against the per-row path. It
+also checks that both paths agree.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+import time
+from typing import Any, Callable, Iterable, List, Mapping, MutableMapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import evaluate
+from evaluate import FIELD_SPECS, EvaluationMetrics, TestExecutionResult
+from stats import ExactSum, QuantileSketch
+from generation_stats import TokenAggregator
+from timing import PhaseAggregator
+
+# Float differences of exact two-place amounts can land a hair above the tolerance.
+DECIMAL_TOLERANCE = float(evaluate.DECIMAL_TOLERANCE) + 1e-9
+ISO_DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+TAG_SEPARATOR = "\x1f"
+
+
+def results_frame(executions: Iterable[TestExecutionResult]) -> pd.DataFrame:
+    """One row per execution with raw ``<field>_expected``/``<field>_actual`` columns."""
+
+    columns: MutableMapping[str, List[Any]] = {
+        "id": [],
+        "status": [],
+        "method": [],
+        "expected_type": [],
+        "ai_calls": [],
+        "timings": [],
+        "prompts": [],
+    }
+    for stat in evaluate.LATENCY_STATS:
+        columns[stat] = []
+    for name, *_ in FIELD_SPECS:
+        columns[f"{name}_expected"] = []
+        columns[f"{name}_actual"] = []
+
+    for execution in executions:
+        case = execution.case
+        parsed = execution.parsed or {}
+        columns["id"].append(case.identifier)
+        columns["status"].append(execution.status)
+        columns["method"].append(execution.method)
+        columns["expected_type"].append(case.expected_type)
+        columns["ai_calls"].append(execution.ai_calls)
+        columns["timings"].append(execution.timings)
+        columns["prompts"].append(execution.prompts)
+        stats = execution.stats if isinstance(execution.stats, Mapping) else {}
+        for stat in evaluate.LATENCY_STATS:
+            value = stats.get(stat)
+            columns[stat].append(float(value) if isinstance(value, (int, float)) else math.nan)
+        for name, expected, actual, _, _ in FIELD_SPECS:
+            columns[f"{name}_expected"].append(expected(case))
+            columns[f"{name}_actual"].append(actual(parsed))
+
+    frame = pd.DataFrame({key: pd.Series(values, dtype=object) for key, values in columns.items()})
+    frame["ai_calls"] = frame["ai_calls"].astype("int64")
+    for stat in evaluate.LATENCY_STATS:
+        frame[stat] = frame[stat].astype("float64")
+    return frame
+
+
+def canonical_strings(values: pd.Series) -> pd.Series:
+    """Stripped, casefolded text; blank and missing values become NA."""
+
+    text = values.astype("string").str.strip()
+    return text.mask(text == "").str.casefold()
+
+
+def canonical_decimals(values: pd.Series) -> pd.Series:
+    """Numeric value as float64; missing or unparseable values become NaN."""
+
+    text = values.astype("string").str.strip()
+    return pd.to_numeric(text.mask(text == ""), errors="coerce").astype("float64")
+
+
+def canonical_dates(values: pd.Series) -> pd.Series:
+    """Calendar dates as datetime64; anything that is not ``YYYY-MM-DD`` becomes NaT."""
+
+    text = values.astype("string").str.strip()
+    text = text.where(text.str.fullmatch(ISO_DATE_PATTERN).fillna(False).astype(bool))
+    return pd.to_datetime(text, format="%Y-%m-%d", errors="coerce")
+
+
+def canonical_tags(values: pd.Series) -> pd.Series:
+    """Sorted, casefolded tag set joined into one string; ``None`` stays NA."""
+
+    return values.map(_tag_key, na_action="ignore").astype("string")
+
+
+def _tag_key(value: Any) -> Optional[str]:
+    tags = evaluate.coerce_tags(value)
+    if tags is None:
+        return None
+    return TAG_SEPARATOR.join(sorted(tag.casefold() for tag in tags))
+
+
+CANONICALIZERS: Mapping[str, Callable[[pd.Series], pd.Series]] = {
+    "decimal": canonical_decimals,
+    "string": canonical_strings,
+    "date": canonical_dates,
+    "tags": canonical_tags,
+}
+
+
+def match_columns(expected: pd.Series, actual: pd.Series, kind: str) -> pd.Series:
+    """Vectorized ``evaluate.values_match`` over canonical columns."""
+
+    expected_missing = expected.isna().to_numpy()
+    actual_missing = actual.isna().to_numpy()
+    absent_ok = actual_missing
+    if kind == "tags":
+        # An empty tag set counts as "no tags" when nothing was expected.
+        absent_ok = actual_missing | (actual.fillna("") == "").to_numpy(dtype=bool)
+    if kind == "decimal":
+        difference = np.abs(actual.to_numpy(dtype="float64") - expected.to_numpy(dtype="float64"))
+        equal = difference <= DECIMAL_TOLERANCE
+    else:
+        equal = (actual == expected).fillna(False).to_numpy(dtype=bool)
+    both_present = ~expected_missing & ~actual_missing
+    return pd.Series(
+        np.where(expected_missing, absent_ok, both_present & equal),
+        index=expected.index,
+    )
+
+
+def compare_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Add ``<field>_match`` and ``<field>_scored`` columns plus ``overall_match``.
+
+    A field is scored when a value was expected, which mirrors the per-row metrics.
+    Informational fields are matched but never affect ``overall_match``.
+    """
+
+    overall = (frame["status"] == "complete").to_numpy(dtype=bool)
+    for name, _, _, kind, informational in FIELD_SPECS:
+        raw_expected = frame[f"{name}_expected"]
+        canonicalize = CANONICALIZERS[kind]
+        match = match_columns(canonicalize(raw_expected), canonicalize(frame[f"{name}_actual"]), kind)
+        scored = raw_expected.notna()
+        frame[f"{name}_match"] = match
+        frame[f"{name}_scored"] = scored
+        if not informational:
+            overall = overall & (match | ~scored).to_numpy(dtype=bool)
+    frame["overall_match"] = overall
+    return frame
+
+
+def frame_metrics(frame: pd.DataFrame) -> EvaluationMetrics:
+    """``EvaluationMetrics`` from a compared frame, equal to ``evaluate.compute_metrics``."""
+
+    total = len(frame)
+    passed = int(frame["overall_match"].sum())
+    per_field_accuracy: MutableMapping[str, Optional[float]] = {}
+    field_samples: MutableMapping[str, int] = {}
+    for name, *_ in FIELD_SPECS:
+        scored = frame[f"{name}_scored"]
+        samples = int(scored.sum())
+        matches = int((frame[f"{name}_match"] & scored).sum())
+        per_field_accuracy[name] = (matches / samples) if samples else None
+        field_samples[name] = samples
+
+    averages: MutableMapping[str, Optional[float]] = {}
+    latency_percentiles: MutableMapping[str, MutableMapping[str, Optional[float]]] = {}
+    for stat in evaluate.LATENCY_STATS:
+        values = frame[stat].dropna().to_numpy()
+        # math.fsum rounds once, exactly like the aggregator's ExactSum.
+        averages[stat] = (math.fsum(values) / len(values)) if len(values) else None
+        if len(values):
+            sketch = latency_sketch(values)
+            latency_percentiles[stat] = {label: sketch.quantile(q) for label, q in evaluate.LATENCY_QUANTILES}
+
+    # Phase timings and prompt token stats are sparse nested values; they stream through
+    # the same aggregators as the per-row path.
+    phases = PhaseAggregator()
+    for identifier, timings in zip(frame["id"], frame["timings"]):
+        phases.add(identifier, timings)
+    tokens = TokenAggregator()
+    generations = 0
+    generation_ms = ExactSum()
+    for prompts in frame["prompts"]:
+        for exchange in prompts:
+            tokens.add(exchange.field, exchange.tokens)
+            if exchange.response is not None:
+                generations += 1
+                if exchange.generation_ms is not None:
+                    generation_ms.add(exchange.generation_ms)
+
+    return EvaluationMetrics(
+        total_tests=total,
+        passed_tests=passed,
+        per_field_accuracy=per_field_accuracy,
+        overall_accuracy=(passed / total) if total else None,
+        ai_usage_count=int((frame["ai_calls"] > 0).sum()),
+        total_ai_calls=int(frame["ai_calls"].sum()),
+        field_samples=field_samples,
+        average_total_ms=averages["total_ms"],
+        average_stage0_ms=averages["stage0_ms"],
+        average_stage1_ms=averages["stage1_ms"],
+        latency_percentiles=latency_percentiles,
+        phases=phases.phases(),
+        slowest_cases=phases.slowest_cases(),
+        tokens=tokens.summary(),
+        generations=generations,
+        generation_ms=generation_ms.total if generation_ms.count else None,
+        average_generation_ms=generation_ms.mean,
+    )
+
+
+def latency_sketch(values: np.ndarray) -> QuantileSketch:
+    """Bucket a latency column in one numpy pass; same result as ``QuantileSketch.extend``."""
+
+    sketch = QuantileSketch()
+    positive = values[values > 0]
+    keys, counts = np.unique(np.ceil(np.log(positive) / sketch.log_gamma).astype("int64"), return_counts=True)
+    sketch.add_bucket_counts(
+        dict(zip(keys.tolist(), counts.tolist())),
+        zero_count=int(len(values) - len(positive)),
+        minimum=float(values.min()),
+        maximum=float(values.max()),
+    )
+    return sketch
+
+
+def accuracy_by(frame: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Case count, overall accuracy and per-field accuracy for each value of ``column``.
+
+    Slice on ``method`` or ``expected_type``, or on any column added to the frame.
+    Per-field accuracy only counts scored rows, as in the summary report.
+    """
+
+    keys = frame[column].fillna("n/a")
+    data = {"overall": frame["overall_match"].astype("float64")}
+    for name, *_ in FIELD_SPECS:
+        scored = frame[f"{name}_scored"].astype(bool)
+        data[f"{name}_hits"] = (frame[f"{name}_match"] & scored).astype("int64")
+        data[f"{name}_samples"] = scored.astype("int64")
+    grouped = pd.DataFrame(data).groupby(keys, sort=True)
+    sums = grouped.sum()
+    result = pd.DataFrame({"cases": grouped.size(), "overall_accuracy": grouped["overall"].mean()})
+    for name, *_ in FIELD_SPECS:
+        samples = sums[f"{name}_samples"]
+        result[name] = (sums[f"{name}_hits"] / samples).where(samples > 0)
+    return result
+
+
+def synthetic_executions(count: int, *, seed: int = 0) -> List[TestExecutionResult]:
+    """Synthetic cases with plausibly noisy parser output, for benchmarking."""
+
+    from synthetic import SuiteGenerator
+
+    rng = random.Random(seed)
+    executions: List[TestExecutionResult] = []
+    for case in SuiteGenerator({}, seed=seed).generate(count):
+        parsed: MutableMapping[str, Any] = {
+            "amountUsd": float(case.expected_amount) if case.expected_amount is not None else None,
+            "merchant": case.expected_merchant,
+            "description": None,
+            "type": case.expected_type,
+            "expenseCategory": case.expected_category if case.expected_type == "Expense" else None,
+            "incomeCategory": case.expected_category if case.expected_type == "Income" else None,
+            "tags": list(case.expected_tags),
+            "userLocalDate": case.expected_date.isoformat() if case.expected_date else None,
+            "account": case.expected_account,
+            "splitOverallChargedUsd": (
+                str(case.expected_split_overall) if case.expected_split_overall is not None else None
+            ),
+        }
+        if rng.random() < 0.1 and parsed["amountUsd"] is not None:
+            parsed["amountUsd"] = round(parsed["amountUsd"] + rng.choice((0.01, 0.02, -1)), 2)
+        if rng.random() < 0.1 and parsed["merchant"]:
+            parsed["merchant"] = parsed["merchant"].upper()
+        if rng.random() < 0.1:
+            parsed["tags"] = parsed["tags"][::-1] + (["extra"] if rng.random() < 0.5 else [])
+        if rng.random() < 0.05:
+            parsed["userLocalDate"] = "not a date"
+        status = "complete" if rng.random() > 0.02 else "cli_error"
+        executions.append(
+            TestExecutionResult(
+                case=case,
+                status=status,
+                parsed=parsed if status == "complete" else None,
+                method=rng.choice(("heuristic", "ai")),
+                prompts=[],
+                stats={"total_ms": rng.lognormvariate(5, 0.6), "stage0_ms": rng.random() * 5},
+                heuristic_results=None,
+                heuristic_stats=None,
+                errors=[],
+                ai_calls=rng.randint(0, 3),
+            )
+        )
+    return executions
+
+
+def benchmark(count: int, *, seed: int = 0, repeat: int = 3) -> Mapping[str, float]:
+    """Time the per-row and columnar paths on ``count`` cases and check they agree."""
+
+    executions = synthetic_executions(count, seed=seed)
+    timings: MutableMapping[str, float] = {}
+
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        row_metrics = evaluate.compute_metrics(evaluate.compare_results(executions))
+        best = min(best, time.perf_counter() - start)
+    timings["rows"] = best
+
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frame = results_frame(executions)
+        build = time.perf_counter() - start
+        column_metrics = frame_metrics(compare_frame(frame))
+        elapsed = time.perf_counter() - start
+        if elapsed < best:
+            best = elapsed
+            timings["columnar_build"] = build
+    timings["columnar"] = best
+
+    if row_metrics != column_metrics:
+        raise AssertionError(f"Columnar metrics differ from the per-row path:\n{row_metrics}\n{column_metrics}")
+    return timings
+
+
+def parse_benchmark_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark columnar against per-row comparison and metrics.")
+    parser.add_argument("--cases", type=int, nargs="+", default=[1000, 10000, 100000], help="Suite sizes to time.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic suite.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the fastest is reported.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:  # pragma: no cover - CLI entrypoint
+    args = parse_benchmark_args(argv)
+    print("| Cases | Per-row | Columnar (frame build) | Speed-up |")
+    print("| --- | --- | --- | --- |")
+    for count in args.cases:
+        try:
+            timings = benchmark(count, seed=args.seed, repeat=args.repeat)
+        except AssertionError as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            raise SystemExit(3) from exc
+        print(
+            f"| {count} | {timings['rows'] * 1000:.1f} ms | {timings['columnar'] * 1000:.1f} ms "
+            f"({timings['columnar_build'] * 1000:.1f} ms) | {timings['rows'] / timings['columnar']:.1f}x |"
+        )
+
+
+if __name__ == "__main__":
+    main()
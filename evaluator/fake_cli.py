@@ -0,0 +1,239 @@
+"""Stand-in for the Kotlin CLI jar, selected with ``evaluate.py --fake-cli``.
+
+Reads the same JSON payload and writes the same ``needs_ai``, ``complete`` and
+interactive ``prompt`` messages as ``CliMain.kt``. It sleeps instead of parsing.
+Whether a case needs AI, and for which fields, depends only on the utterance, so two
+runs see identical work. Usage (the evaluator builds this command itself)::
+
+    python fake_cli.py --latency stage1_ms=20,startup_ms=300 -jar fake-cli.jar [--interactive | --benchmark]
+
+``--benchmark`` does not sleep through its iterations: it reports ``stage1_ms`` and
+``stage2_ms`` as the per-operation cost of each stage.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import re
+import sys
+import time
+from datetime import date
+from typing import Any, List, Mapping, MutableMapping, Optional
+
+from fakes import FAKE_CLI_DEFAULTS, parse_spec
+
+AI_FIELDS = ("merchant", "description", "expenseCategory", "tags")
+PROMPT_MODE_COALESCED = "coalesced"
+AMOUNT_PATTERN = re.compile(r"\$?(\d+(?:\.\d{1,2})?)")
+GUIDELINE = "Guideline: answer with the value only, no explanation; use the allowed options when given.\n"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", default="", help="key=value,... overrides of the simulated timings.")
+    parser.add_argument("-jar", dest="jar", help="Ignored; accepted so the evaluator can call this like java.")
+    parser.add_argument("--interactive", action="store_true")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args(argv)
+    try:
+        latency = parse_spec(args.latency, FAKE_CLI_DEFAULTS)
+    except ValueError as exc:
+        emit({"status": "error", "code": "INVALID_ARGS", "message": str(exc)})
+        return
+    sleep_ms(latency["startup_ms"])
+    if args.benchmark:
+        run_benchmark(sys.stdin.read(), latency)
+        return
+
+    first_line = sys.stdin.readline() if args.interactive else sys.stdin.read()
+    if not first_line.strip():
+        emit({"status": "error", "code": "EMPTY_INPUT", "message": "No input provided on stdin"})
+        return
+    try:
+        payload = json.loads(first_line)
+        utterance = str(payload["utterance"])
+    except (ValueError, KeyError, TypeError):
+        emit({"status": "error", "code": "INVALID_JSON", "message": "Unable to decode CLI input"})
+        return
+
+    case = FakeCase(utterance, payload, latency)
+    if args.interactive:
+        run_interactive(case)
+    else:
+        run_batch(case, payload)
+
+
+class FakeCase:
+    """The simulated parse of one utterance."""
+
+    def __init__(self, utterance: str, payload: Mapping[str, Any], latency: Mapping[str, float]) -> None:
+        self.utterance = utterance
+        self.latency = latency
+        self.context = payload.get("context") if isinstance(payload.get("context"), Mapping) else {}
+        self.digest = hashlib.sha256(utterance.encode("utf-8")).digest()
+        self.coalesced = payload.get("prompt_mode") == PROMPT_MODE_COALESCED
+        needs_ai = int.from_bytes(self.digest[:2], "big") / 0xFFFF < latency["ai_share"]
+        field_count = 1 + self.digest[2] % max(1, int(latency["max_fields"])) if needs_ai else 0
+        start = self.digest[3] % len(AI_FIELDS)
+        self.fields = [AI_FIELDS[(start + offset) % len(AI_FIELDS)] for offset in range(min(field_count, len(AI_FIELDS)))]
+
+    @property
+    def snapshot(self) -> str:
+        return base64.urlsafe_b64encode(self.digest[:12]).decode("ascii")
+
+    def prompts(self) -> List[MutableMapping[str, str]]:
+        if not self.fields:
+            return []
+        if self.coalesced:
+            keys = ",".join(self.fields)
+            return [{"field": keys, "prompt": self._prompt(f"Keys: {', '.join(self.fields)}")}]
+        return [{"field": field, "prompt": self._prompt(f"Field: {field}")} for field in self.fields]
+
+    def _prompt(self, header: str) -> str:
+        body = f"Input: {self.utterance}\n{header}\n"
+        filler = max(0, int(self.latency["prompt_chars"]) - len(body))
+        return body + (GUIDELINE * (filler // len(GUIDELINE) + 1))[:filler]
+
+    def heuristics(self) -> MutableMapping[str, Any]:
+        match = AMOUNT_PATTERN.search(self.utterance)
+        return {
+            "amountUsd": float(match.group(1)) if match else None,
+            "merchant": None,
+            "description": None,
+            "type": "Expense",
+            "expenseCategory": None,
+            "incomeCategory": None,
+            "tags": [],
+            "account": None,
+            "confidence": 0.5,
+        }
+
+    def complete(self, responses: Mapping[str, str], *, restored: bool) -> MutableMapping[str, Any]:
+        parsed = self.heuristics()
+        for key, response in responses.items():
+            fields = key.split(",")
+            values: Mapping[str, Any] = {}
+            if len(fields) > 1:
+                try:
+                    decoded = json.loads(response)
+                    values = decoded if isinstance(decoded, Mapping) else {}
+                except ValueError:
+                    values = {}
+            else:
+                values = {key: response}
+            for field in fields:
+                value = values.get(field)
+                if value is not None:
+                    parsed[field] = [value] if field == "tags" and isinstance(value, str) else value
+        parsed.update(
+            {
+                "userLocalDate": self.context.get("defaultDate") or date.today().isoformat(),
+                "splitOverallChargedUsd": None,
+            }
+        )
+        stage0 = 0 if restored else round(self.latency["stage1_ms"])
+        stage1 = round(self.latency["stage2_ms"]) if self.fields else None
+        return {
+            "status": "complete",
+            "parsed": parsed,
+            "method": "AI" if self.fields else "HEURISTIC",
+            "stats": {
+                "stage0_ms": stage0,
+                "stage1_ms": stage1,
+                "total_ms": stage0 + (stage1 or 0),
+                "stage1_restored": restored,
+            },
+        }
+
+
+def run_batch(case: FakeCase, payload: Mapping[str, Any]) -> None:
+    responses = payload.get("model_responses")
+    restored = bool(responses) and payload.get("stage1_snapshot") == case.snapshot
+    if not restored:
+        sleep_ms(case.latency["stage1_ms"])
+    if not responses and case.fields:
+        emit(
+            {
+                "status": "needs_ai",
+                "heuristic_results": case.heuristics(),
+                "prompts_needed": case.prompts(),
+                "stats": {"stage0_ms": round(case.latency["stage1_ms"]), "total_ms": round(case.latency["stage1_ms"])},
+                "stage1_snapshot": case.snapshot,
+            }
+        )
+        return
+    if case.fields:
+        sleep_ms(case.latency["stage2_ms"])
+    emit(case.complete(responses or {}, restored=restored))
+
+
+def run_interactive(case: FakeCase) -> None:
+    sleep_ms(case.latency["stage1_ms"])
+    responses: MutableMapping[str, str] = {}
+    for request in case.prompts():
+        emit({"status": "prompt", **request})
+        line = sys.stdin.readline()
+        if not line:
+            emit({"status": "error", "code": "PARSER_ERROR", "message": f"stdin closed before a response for {request['field']}"})
+            return
+        reply = json.loads(line)
+        if reply.get("response") is not None:
+            responses[request["field"]] = reply["response"]
+    if case.fields:
+        sleep_ms(case.latency["stage2_ms"])
+    output = case.complete(responses, restored=False)
+    output["heuristic_results"] = case.heuristics()
+    emit(output)
+
+
+def run_benchmark(text: str, latency: Mapping[str, float]) -> None:
+    try:
+        payload = json.loads(text)
+        cases = payload.get("cases") or [{"utterance": u} for u in payload.get("utterances") or []]
+    except (ValueError, AttributeError):
+        emit({"status": "error", "code": "INVALID_JSON", "message": "Unable to decode benchmark input"})
+        return
+    if not cases:
+        emit({"status": "error", "code": "INVALID_JSON", "message": "Benchmark input has no cases"})
+        return
+    warmup = int(payload.get("warmup_iterations", 5))
+    iterations = max(1, int(payload.get("iterations", 20)))
+    needs_ai = sum(1 for case in cases if FakeCase(str(case.get("utterance", "")), case, latency).fields)
+    stage_ms = {"stage1": latency["stage1_ms"], "stage2": latency["stage2_ms"] * needs_ai / len(cases)}
+    emit(
+        {
+            "status": "benchmark",
+            "cases": len(cases),
+            "warmup_iterations": warmup,
+            "iterations": iterations,
+            "stages": {
+                name: {
+                    "operations": iterations * len(cases),
+                    "ns_per_op": milliseconds * 1e6,
+                    "best_ns_per_op": milliseconds * 1e6,
+                    "bytes_per_op": None,
+                    "alloc_mb_per_s": None,
+                    "gc_count": 0,
+                    "gc_ms": 0,
+                }
+                for name, milliseconds in stage_ms.items()
+            },
+            "jvm": {"version": "", "vm": "fake-cli", "available_processors": 1},
+        }
+    )
+
+
+def emit(message: Mapping[str, Any]) -> None:
+    print(json.dumps(message, ensure_ascii=False), flush=True)
+
+
+def sleep_ms(milliseconds: float) -> None:
+    if milliseconds > 0:
+        time.sleep(milliseconds / 1000)
+
+
+if __name__ == "__main__":
+    main()
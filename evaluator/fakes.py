@@ -0,0 +1,171 @@
+"""Deterministic stand-ins for the model and the Kotlin CLI (``--fake-model``, ``--fake-cli``).
+
+With both fakes an evaluation needs neither a GPU, a downloaded model nor Java. The
+orchestrator's own costs are then what gets measured: scheduling, batching, the
+stage-1 cache, checkpointing and reporting. Latency is simulated with sleeps from a
+``key=value,...`` spec, so a benchmark can model a slow CLI or a slow decoder and
+still be repeatable offline.
+
+``FakeModelInference`` has the same interface as ``models.ModelInference``. The fake CLI
+is ``fake_cli.py``. It speaks the jar's stdin/stdout contract (``needs_ai``/``complete``,
+``--interactive`` prompt lines, ``stage1_snapshot``) and is launched in place of
+``java -jar``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Mapping, MutableMapping, Optional, Tuple
+
+from generation_stats import TokenStats, batch_token_stats
+
+FAKE_CLI_SCRIPT = Path(__file__).resolve().with_name("fake_cli.py")
+# Placeholder jar argument; the fake CLI ignores it.
+FAKE_CLI_JAR = Path("fake-cli.jar")
+# Prompt/response length to token count; roughly what Gemma's tokenizer gives for English.
+CHARS_PER_TOKEN = 4
+ANSWER_WORDS = ("Starbucks", "Groceries", "Dining", "Coffee with a client", "Transport", "Costco")
+
+# Milliseconds per prompt token (prefill) and per decode step, plus a one-off load time.
+FAKE_MODEL_DEFAULTS: Mapping[str, float] = {"prefill_ms": 0.05, "decode_ms": 2.0, "load_ms": 0.0}
+# Milliseconds for JVM start-up and each parser stage; the share of cases that need AI,
+# how many fields they ask for at most, and the length of each prompt.
+FAKE_CLI_DEFAULTS: Mapping[str, float] = {
+    "startup_ms": 0.0,
+    "stage1_ms": 5.0,
+    "stage2_ms": 5.0,
+    "ai_share": 0.8,
+    "max_fields": 3,
+    "prompt_chars": 1500,
+}
+
+
+def parse_spec(text: Optional[str], defaults: Mapping[str, float]) -> MutableMapping[str, float]:
+    """``defaults`` overridden by a ``key=value,...`` spec; unknown keys are an error."""
+
+    values = dict(defaults)
+    for item in (text or "").split(","):
+        if not item.strip():
+            continue
+        key, separator, value = item.partition("=")
+        key = key.strip()
+        if not separator or key not in defaults:
+            raise ValueError(f"Expected key=value with key in {', '.join(defaults)}, got {item.strip()!r}")
+        try:
+            values[key] = float(value)
+        except ValueError as exc:
+            raise ValueError(f"{key} must be a number, got {value.strip()!r}") from exc
+        if values[key] < 0:
+            raise ValueError(f"{key} must not be negative, got {value.strip()!r}")
+    return values
+
+
+def fake_cli_command(spec: Optional[str]) -> tuple[str, ...]:
+    """Command that stands in for ``java``; the evaluator appends ``-jar <jar>`` as usual."""
+
+    return (sys.executable, str(FAKE_CLI_SCRIPT), "--latency", spec or "")
+
+
+def token_count(text: str) -> int:
+    return max(1, -(-len(text) // CHARS_PER_TOKEN))
+
+
+def fake_answer(prompt: str) -> str:
+    """Deterministic answer: a JSON object for prompts listing ``Keys:``, else a short phrase."""
+
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    keys = next(
+        (line[len("Keys:") :].split(",") for line in prompt.splitlines() if line.startswith("Keys:")),
+        None,
+    )
+    if keys is None:
+        return ANSWER_WORDS[digest[0] % len(ANSWER_WORDS)]
+    return json.dumps(
+        {key.strip(): ANSWER_WORDS[digest[offset % len(digest)] % len(ANSWER_WORDS)] for offset, key in enumerate(keys)}
+    )
+
+
+class FakeModelInference:
+    """``ModelInference`` look-alike with simulated, token-proportional latency.
+
+    A batch sleeps ``prefill_ms`` per prompt token across the batch, then ``decode_ms``
+    per decode step for its longest answer. Batching therefore pays off the way it
+    does on a real accelerator. Answers depend only on the prompt.
+    """
+
+    def __init__(self, model_name: str, *, spec: Optional[str] = None) -> None:
+        self.model_name = model_name
+        latency = parse_spec(spec, FAKE_MODEL_DEFAULTS)
+        self.prefill_ms = latency["prefill_ms"]
+        self.decode_ms = latency["decode_ms"]
+        self.max_new_tokens: Optional[int] = None
+        _sleep_ms(latency["load_ms"])
+
+    def configure(self, *, max_new_tokens: Optional[int] = None, num_threads: Optional[int] = None) -> None:
+        if max_new_tokens is not None:
+            self.max_new_tokens = max_new_tokens
+
+    def close(self) -> None:
+        return None
+
+    def generate(self, prompt: str, *, system_prompt: Optional[str] = None) -> str:
+        return self.generate_batch([prompt], system_prompt=system_prompt)[0]
+
+    def generate_batch(self, prompts: List[str], *, system_prompt: Optional[str] = None) -> List[str]:
+        responses, _ = self.generate_batch_with_stats(prompts, system_prompt=system_prompt)
+        return responses
+
+    def generate_batch_with_stats(
+        self,
+        prompts: List[str],
+        *,
+        system_prompt: Optional[str] = None,
+    ) -> Tuple[List[str], List[TokenStats]]:
+        responses = [fake_answer(prompt) for prompt in prompts]
+        prompt_tokens = [token_count((system_prompt or "") + prompt) for prompt in prompts]
+        generated = [self._answer_tokens(response) for response in responses]
+        prefill_ms = self.prefill_ms * sum(prompt_tokens)
+        decode_ms = self.decode_ms * max(0, max(generated, default=0) - 1)
+        _sleep_ms(prefill_ms + decode_ms)
+        stats = batch_token_stats(
+            prompt_tokens,
+            generated,
+            slots_per_sequence=max(prompt_tokens, default=0) + max(generated, default=0),
+            prefill_ms=prefill_ms,
+            decode_ms=decode_ms,
+        )
+        return responses, stats
+
+    def generate_streaming(self, prompt: str, *, system_prompt: Optional[str] = None) -> Tuple[str, TokenStats]:
+        started = time.perf_counter()
+        response = fake_answer(prompt)
+        prompt_tokens = token_count((system_prompt or "") + prompt)
+        generated = self._answer_tokens(response)
+        _sleep_ms(self.prefill_ms * prompt_tokens)
+        token_times = [time.perf_counter()]
+        for _ in range(generated - 1):
+            _sleep_ms(self.decode_ms)
+            token_times.append(time.perf_counter())
+        first_token_ms = (token_times[0] - started) * 1000
+        return response, TokenStats(
+            prompt_tokens=prompt_tokens,
+            generated_tokens=generated,
+            padding_tokens=0,
+            prefill_ms=first_token_ms,
+            decode_ms=(token_times[-1] - token_times[0]) * 1000,
+            first_token_ms=first_token_ms,
+            inter_token_ms=[(later - earlier) * 1000 for earlier, later in zip(token_times, token_times[1:])],
+        )
+
+    def _answer_tokens(self, response: str) -> int:
+        tokens = token_count(response)
+        return min(tokens, self.max_new_tokens) if self.max_new_tokens else tokens
+
+
+def _sleep_ms(milliseconds: float) -> None:
+    if milliseconds > 0:
+        time.sleep(milliseconds / 1000)
@@ -0,0 +1,278 @@
+"""Token accounting for generation: per-sequence stats and their per-field summary.
+
+``ModelInference`` reports a ``TokenStats`` for every prompt it answers. The batch's
+prefill time (prompt forward pass up to the first new token) and decode time (the
+remaining steps) are shared out across its sequences in proportion to their prompt and
+generated tokens. Summing the stats over any set of prompts therefore gives exact
+throughput: prefill tokens/s and decode tokens/s track on-device latency far better
+than desktop wall time does.
+
+Prompts generated one at a time through ``ModelInference.generate_streaming`` also carry
+time to first token and the gaps between later tokens, which is how a user on the
+phone experiences parse latency.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, List, Mapping, MutableMapping, Optional, Sequence
+
+from stats import ExactSum, QuantileSketch
+from timing import PHASE_QUANTILES, PhaseSummary
+
+
+@dataclass
+class TokenStats:
+    """Token counts of one generated sequence and its share of the batch's time."""
+
+    prompt_tokens: int
+    generated_tokens: int
+    # Batch slots this sequence occupied without a prompt or generated token in them.
+    padding_tokens: int
+    prefill_ms: Optional[float] = None
+    decode_ms: Optional[float] = None
+    # Streaming measurements (batch size 1 only): call start to first token, then the
+    # gap before each later token.
+    first_token_ms: Optional[float] = None
+    inter_token_ms: Optional[List[float]] = None
+
+    def to_json(self) -> MutableMapping[str, Any]:
+        data: MutableMapping[str, Any] = {
+            "prompt_tokens": self.prompt_tokens,
+            "generated_tokens": self.generated_tokens,
+            "padding_tokens": self.padding_tokens,
+            "prefill_ms": self.prefill_ms,
+            "decode_ms": self.decode_ms,
+        }
+        if self.first_token_ms is not None:
+            data["first_token_ms"] = self.first_token_ms
+            data["inter_token_ms"] = list(self.inter_token_ms or [])
+        return data
+
+    @classmethod
+    def from_json(cls, data: Optional[Mapping[str, Any]]) -> Optional["TokenStats"]:
+        if not data:
+            return None
+        return cls(
+            prompt_tokens=int(data.get("prompt_tokens") or 0),
+            generated_tokens=int(data.get("generated_tokens") or 0),
+            padding_tokens=int(data.get("padding_tokens") or 0),
+            prefill_ms=data.get("prefill_ms"),
+            decode_ms=data.get("decode_ms"),
+            first_token_ms=data.get("first_token_ms"),
+            inter_token_ms=data.get("inter_token_ms"),
+        )
+
+
+def batch_token_stats(
+    prompt_tokens: Sequence[int],
+    generated_tokens: Sequence[int],
+    *,
+    slots_per_sequence: int,
+    prefill_ms: Optional[float],
+    decode_ms: Optional[float],
+) -> List[TokenStats]:
+    """Per-sequence stats for one batch, sharing its prefill and decode time out by tokens."""
+
+    total_prompt = sum(prompt_tokens)
+    total_generated = sum(generated_tokens)
+    count = len(prompt_tokens)
+    stats: List[TokenStats] = []
+    for prompt, generated in zip(prompt_tokens, generated_tokens):
+        stats.append(
+            TokenStats(
+                prompt_tokens=prompt,
+                generated_tokens=generated,
+                padding_tokens=max(0, slots_per_sequence - prompt - generated),
+                prefill_ms=_share(prefill_ms, prompt, total_prompt, count),
+                decode_ms=_share(decode_ms, generated, total_generated, count),
+            )
+        )
+    return stats
+
+
+def _share(total_ms: Optional[float], part: int, whole: int, count: int) -> Optional[float]:
+    if total_ms is None or not count:
+        return None
+    return total_ms * part / whole if whole else total_ms / count
+
+
+class Distribution:
+    """Exact sum, maximum and approximate quantiles of a stream of milliseconds."""
+
+    def __init__(self) -> None:
+        self.total = ExactSum()
+        self.sketch = QuantileSketch()
+        self.maximum: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        self.total.add(value)
+        self.sketch.add(value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def merge(self, other: "Distribution") -> None:
+        self.total.merge(other.total)
+        self.sketch.merge(other.sketch)
+        if other.maximum is not None:
+            self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+
+    def summary(self) -> Optional[PhaseSummary]:
+        if not self.total.count or self.maximum is None:
+            return None
+        quantiles = {label: self.sketch.quantile(q) for label, q in PHASE_QUANTILES}
+        return PhaseSummary(
+            count=self.total.count,
+            total=self.total.total,
+            mean=self.total.mean or 0.0,
+            p50=quantiles["p50"],
+            p90=quantiles["p90"],
+            p99=quantiles["p99"],
+            maximum=self.maximum,
+        )
+
+
+@dataclass
+class FieldTokens:
+    """Token usage of the prompts for one field (or coalesced field group)."""
+
+    prompts: int
+    mean_prompt_tokens: float
+    mean_generated_tokens: float
+    max_generated_tokens: int
+    first_token: Optional[PhaseSummary] = None
+    inter_token: Optional[PhaseSummary] = None
+
+    @property
+    def estimated_response_ms(self) -> Optional[float]:
+        """Mean time to first token plus the mean answer length at the mean token gap."""
+
+        if self.first_token is None:
+            return None
+        gap = self.inter_token.mean if self.inter_token else 0.0
+        return self.first_token.mean + max(0.0, self.mean_generated_tokens - 1) * gap
+
+
+@dataclass
+class TokenSummary:
+    """Token totals over a run's measured prompts."""
+
+    prompts: int
+    prompt_tokens: int
+    generated_tokens: int
+    padding_tokens: int
+    prefill_ms: float
+    decode_ms: float
+    per_field: MutableMapping[str, FieldTokens]
+    first_token: Optional[PhaseSummary] = None
+    inter_token: Optional[PhaseSummary] = None
+
+    @property
+    def prefill_tokens_per_second(self) -> Optional[float]:
+        return self.prompt_tokens / (self.prefill_ms / 1000) if self.prefill_ms > 0 else None
+
+    @property
+    def decode_tokens_per_second(self) -> Optional[float]:
+        return self.generated_tokens / (self.decode_ms / 1000) if self.decode_ms > 0 else None
+
+    @property
+    def padding_share(self) -> Optional[float]:
+        slots = self.prompt_tokens + self.generated_tokens + self.padding_tokens
+        return self.padding_tokens / slots if slots else None
+
+
+class TokenAggregator:
+    """Streaming token totals, overall and per field; mergeable across shards."""
+
+    def __init__(self) -> None:
+        self.prompts = 0
+        self.prompt_tokens = 0
+        self.generated_tokens = 0
+        self.padding_tokens = 0
+        self.prefill_ms = ExactSum()
+        self.decode_ms = ExactSum()
+        # field -> [prompts, prompt tokens, generated tokens, max generated]
+        self.per_field: MutableMapping[str, List[int]] = {}
+        self.first_token = Distribution()
+        self.inter_token = Distribution()
+        self.field_first_token: MutableMapping[str, Distribution] = {}
+        self.field_inter_token: MutableMapping[str, Distribution] = {}
+
+    def add(self, field: str, stats: Optional[TokenStats]) -> None:
+        if stats is None:
+            return
+        self.prompts += 1
+        self.prompt_tokens += stats.prompt_tokens
+        self.generated_tokens += stats.generated_tokens
+        self.padding_tokens += stats.padding_tokens
+        if stats.prefill_ms is not None:
+            self.prefill_ms.add(stats.prefill_ms)
+        if stats.decode_ms is not None:
+            self.decode_ms.add(stats.decode_ms)
+        bucket = self.per_field.setdefault(field, [0, 0, 0, 0])
+        bucket[0] += 1
+        bucket[1] += stats.prompt_tokens
+        bucket[2] += stats.generated_tokens
+        bucket[3] = max(bucket[3], stats.generated_tokens)
+        if stats.first_token_ms is not None:
+            self.first_token.add(stats.first_token_ms)
+            self.field_first_token.setdefault(field, Distribution()).add(stats.first_token_ms)
+            gaps = self.field_inter_token.setdefault(field, Distribution())
+            for gap in stats.inter_token_ms or ():
+                self.inter_token.add(gap)
+                gaps.add(gap)
+
+    def merge(self, other: "TokenAggregator") -> None:
+        self.prompts += other.prompts
+        self.prompt_tokens += other.prompt_tokens
+        self.generated_tokens += other.generated_tokens
+        self.padding_tokens += other.padding_tokens
+        self.prefill_ms.merge(other.prefill_ms)
+        self.decode_ms.merge(other.decode_ms)
+        for field, (prompts, prompt_tokens, generated, longest) in other.per_field.items():
+            bucket = self.per_field.setdefault(field, [0, 0, 0, 0])
+            bucket[0] += prompts
+            bucket[1] += prompt_tokens
+            bucket[2] += generated
+            bucket[3] = max(bucket[3], longest)
+        self.first_token.merge(other.first_token)
+        self.inter_token.merge(other.inter_token)
+        for mine, theirs in (
+            (self.field_first_token, other.field_first_token),
+            (self.field_inter_token, other.field_inter_token),
+        ):
+            for field, distribution in theirs.items():
+                mine.setdefault(field, Distribution()).merge(distribution)
+
+    def summary(self) -> Optional[TokenSummary]:
+        if not self.prompts:
+            return None
+        return TokenSummary(
+            prompts=self.prompts,
+            prompt_tokens=self.prompt_tokens,
+            generated_tokens=self.generated_tokens,
+            padding_tokens=self.padding_tokens,
+            prefill_ms=self.prefill_ms.total,
+            decode_ms=self.decode_ms.total,
+            per_field={
+                field: FieldTokens(
+                    prompts=prompts,
+                    mean_prompt_tokens=prompt_tokens / prompts,
+                    mean_generated_tokens=generated / prompts,
+                    max_generated_tokens=longest,
+                    first_token=self._field_summary(self.field_first_token, field),
+                    inter_token=self._field_summary(self.field_inter_token, field),
+                )
+                for field, (prompts, prompt_tokens, generated, longest) in sorted(self.per_field.items())
+            },
+            first_token=self.first_token.summary(),
+            inter_token=self.inter_token.summary(),
+        )
+
+    @staticmethod
+    def _field_summary(distributions: Mapping[str, Distribution], field: str) -> Optional[PhaseSummary]:
+        distribution = distributions.get(field)
+        return distribution.summary() if distribution is not None else None
+
+
+def tokens_per_second(tokens: int, milliseconds: Optional[float]) -> Optional[float]:
+    return tokens / (milliseconds / 1000) if milliseconds else None
@@ -0,0 +1,549 @@
+"""Run history in SQLite and the ``evaluate.py history`` subcommand.
+
+Every reported run is appended to ``<results-dir>/history.sqlite``:
+- ``runs``: one row per model and prompt mode, with the jar hash, git commit, host,
+  generation settings and headline metrics.
+- ``run_fields``: per-field accuracy of each run, so field trends never touch case rows.
+- ``cases`` and ``case_fields``: per-case status, timings and field matches.
+- ``cli_benchmarks``: per-stage parser throughput from ``--cli-benchmark``, when run.
+
+Case tables are ``WITHOUT ROWID`` and keyed by test ID first. The history of one test
+is then a single index range, however many runs and cases the store holds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import platform
+import sqlite3
+import subprocess
+import sys
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+import evaluate
+from cli_benchmark import CliBenchmark, format_ns
+from timing import wall_ms
+
+HISTORY_FILE = "history.sqlite"
+SCHEMA_VERSION = 2
+DEFAULT_LIMIT = 20
+HASH_CHUNK_BYTES = 1 << 20
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        run_id TEXT,
+        recorded_at TEXT NOT NULL,
+        model TEXT NOT NULL,
+        prompt_mode TEXT NOT NULL,
+        jar_path TEXT,
+        jar_sha256 TEXT,
+        git_commit TEXT,
+        host TEXT,
+        settings TEXT,
+        cases INTEGER NOT NULL,
+        passed INTEGER NOT NULL,
+        overall_accuracy REAL,
+        wall_p50_ms REAL,
+        wall_p90_ms REAL,
+        total_p50_ms REAL,
+        prefill_tokens_per_s REAL,
+        decode_tokens_per_s REAL,
+        ai_calls INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS runs_model_mode ON runs (model, prompt_mode, id)",
+    """
+    CREATE TABLE IF NOT EXISTS run_fields (
+        field TEXT NOT NULL,
+        run INTEGER NOT NULL REFERENCES runs (id),
+        samples INTEGER NOT NULL,
+        accuracy REAL,
+        PRIMARY KEY (field, run)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cases (
+        case_id TEXT NOT NULL,
+        run INTEGER NOT NULL REFERENCES runs (id),
+        status TEXT NOT NULL,
+        passed INTEGER NOT NULL,
+        method TEXT,
+        ai_calls INTEGER NOT NULL,
+        wall_ms REAL,
+        total_ms REAL,
+        generation_ms REAL,
+        timings TEXT,
+        PRIMARY KEY (case_id, run)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS case_fields (
+        case_id TEXT NOT NULL,
+        run INTEGER NOT NULL REFERENCES runs (id),
+        field TEXT NOT NULL,
+        matched INTEGER NOT NULL,
+        expected TEXT,
+        actual TEXT,
+        PRIMARY KEY (case_id, run, field)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cli_benchmarks (
+        run INTEGER NOT NULL REFERENCES runs (id),
+        stage TEXT NOT NULL,
+        cases INTEGER NOT NULL,
+        iterations INTEGER NOT NULL,
+        ns_per_op REAL,
+        best_ns_per_op REAL,
+        bytes_per_op REAL,
+        alloc_mb_per_s REAL,
+        gc_count INTEGER,
+        gc_ms INTEGER,
+        PRIMARY KEY (run, stage)
+    ) WITHOUT ROWID
+    """,
+)
+
+
+@dataclass
+class RunHistory:
+    """Where to record reported runs, and the metadata shared by all of them."""
+
+    path: Path
+    run_id: Optional[str] = None
+    jar_path: Optional[Path] = None
+    settings: MutableMapping[str, Any] = field(default_factory=dict)
+    # CLI parser benchmarks by prompt mode; recorded against every run in that mode.
+    cli_benchmarks: MutableMapping[str, CliBenchmark] = field(default_factory=dict)
+
+    def record(
+        self,
+        runs: Iterable[Tuple[str, str, Iterable["evaluate.TestComparison"], "evaluate.EvaluationMetrics"]],
+    ) -> int:
+        """Append ``(model, prompt mode, comparisons, metrics)`` runs in one transaction.
+
+        Each run's ``comparisons`` are iterated once.
+        """
+
+        jar_sha256 = file_sha256(self.jar_path) if self.jar_path else None
+        commit = git_commit()
+        host = platform.node() or None
+        recorded_at = datetime.now().isoformat(timespec="seconds")
+        count = 0
+        with closing(connect(self.path)) as connection, connection:
+            for model_name, mode, comparisons, metrics in runs:
+                settings = self.settings.get(model_name, self.settings.get("*", {}))
+                run = _insert_run(
+                    connection,
+                    (
+                        self.run_id,
+                        recorded_at,
+                        model_name,
+                        mode,
+                        str(self.jar_path) if self.jar_path else None,
+                        jar_sha256,
+                        commit,
+                        host,
+                        json.dumps(settings, sort_keys=True, default=str),
+                    ),
+                    metrics,
+                )
+                connection.executemany(
+                    "INSERT INTO run_fields (field, run, samples, accuracy) VALUES (?, ?, ?, ?)",
+                    [
+                        (name, run, metrics.field_samples.get(name, 0), accuracy)
+                        for name, accuracy in metrics.per_field_accuracy.items()
+                    ],
+                )
+                # One pass over the comparisons, so a run streamed from its log is read once.
+                for comparison in comparisons:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO cases (case_id, run, status, passed, method, ai_calls, wall_ms, "
+                        "total_ms, generation_ms, timings) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        _case_row(run, comparison),
+                    )
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO case_fields (case_id, run, field, matched, expected, actual) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                comparison.execution.case.identifier,
+                                run,
+                                result.field,
+                                int(result.match),
+                                _text(result.expected),
+                                _text(result.actual),
+                            )
+                            for result in comparison.field_results
+                            if not result.informational
+                        ],
+                    )
+                benchmark = self.cli_benchmarks.get(mode)
+                if benchmark is not None:
+                    connection.executemany(
+                        "INSERT INTO cli_benchmarks (run, stage, cases, iterations, ns_per_op, best_ns_per_op, "
+                        "bytes_per_op, alloc_mb_per_s, gc_count, gc_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                run,
+                                name,
+                                benchmark.cases,
+                                benchmark.iterations,
+                                stage.ns_per_op,
+                                stage.best_ns_per_op,
+                                stage.bytes_per_op,
+                                stage.alloc_mb_per_s,
+                                stage.gc_count,
+                                stage.gc_ms,
+                            )
+                            for name, stage in benchmark.stages.items()
+                        ],
+                    )
+                count += 1
+        return count
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) a history store."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        connection.close()
+        raise ValueError(f"{path} was written by a newer evaluator (schema {version}).")
+    if version < SCHEMA_VERSION:
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return connection
+
+
+def _insert_run(connection: sqlite3.Connection, metadata: Tuple, metrics: "evaluate.EvaluationMetrics") -> int:
+    wall = metrics.phases.get(evaluate.WALL_KEY)
+    total = metrics.latency_percentiles.get("total_ms", {})
+    tokens = metrics.tokens
+    cursor = connection.execute(
+        "INSERT INTO runs (run_id, recorded_at, model, prompt_mode, jar_path, jar_sha256, git_commit, host, "
+        "settings, cases, passed, overall_accuracy, wall_p50_ms, wall_p90_ms, total_p50_ms, "
+        "prefill_tokens_per_s, decode_tokens_per_s, ai_calls) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            *metadata,
+            metrics.total_tests,
+            metrics.passed_tests,
+            metrics.overall_accuracy,
+            wall.p50 if wall else None,
+            wall.p90 if wall else None,
+            total.get("p50"),
+            tokens.prefill_tokens_per_second if tokens else None,
+            tokens.decode_tokens_per_second if tokens else None,
+            metrics.total_ai_calls,
+        ),
+    )
+    return int(cursor.lastrowid)
+
+
+def _case_row(run: int, comparison: "evaluate.TestComparison") -> Tuple:
+    execution = comparison.execution
+    total_ms = execution.stats.get("total_ms") if isinstance(execution.stats, Mapping) else None
+    return (
+        execution.case.identifier,
+        run,
+        execution.status,
+        int(comparison.overall_match),
+        execution.method,
+        execution.ai_calls,
+        wall_ms(execution.timings),
+        float(total_ms) if isinstance(total_ms, (int, float)) else None,
+        execution.timings.get("generation_ms"),
+        json.dumps(execution.timings, sort_keys=True) if execution.timings else None,
+    )
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def file_sha256(path: Path) -> Optional[str]:
+    try:
+        digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def git_commit() -> Optional[str]:
+    """HEAD of the repository the evaluator runs from, with ``+dirty`` for local changes."""
+
+    try:
+        head = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=evaluate.PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+        if head.returncode != 0:
+            return None
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=evaluate.PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return head.stdout.strip() + ("+dirty" if dirty.stdout.strip() else "")
+
+
+def case_trend(
+    connection: sqlite3.Connection,
+    case_id: str,
+    *,
+    model: Optional[str] = None,
+    prompt_mode: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+) -> List[sqlite3.Row]:
+    """The latest ``limit`` results for one test ID, newest first."""
+
+    where, params = _run_filters(model, prompt_mode)
+    return connection.execute(
+        "SELECT runs.id, runs.run_id, runs.recorded_at, runs.model, runs.prompt_mode, runs.git_commit, "
+        "cases.status, cases.passed, cases.method, cases.ai_calls, cases.wall_ms, cases.total_ms, "
+        "cases.generation_ms, "
+        "(SELECT group_concat(field, ',') FROM case_fields "
+        " WHERE case_fields.case_id = cases.case_id AND case_fields.run = cases.run AND NOT matched) AS mismatched "
+        f"FROM cases JOIN runs ON runs.id = cases.run WHERE cases.case_id = ?{where} "
+        "ORDER BY cases.run DESC LIMIT ?",
+        (case_id, *params, limit),
+    ).fetchall()
+
+
+def latest_ai_use(connection: sqlite3.Connection, case_ids: Iterable[str]) -> MutableMapping[str, bool]:
+    """Whether each test's most recent recorded result made AI calls; unseen tests are left out."""
+
+    used: MutableMapping[str, bool] = {}
+    for case_id in case_ids:
+        row = connection.execute(
+            "SELECT ai_calls FROM cases WHERE case_id = ? ORDER BY run DESC LIMIT 1", (case_id,)
+        ).fetchone()
+        if row is not None:
+            used[case_id] = row[0] > 0
+    return used
+
+
+def field_trend(
+    connection: sqlite3.Connection,
+    field_name: str,
+    *,
+    model: Optional[str] = None,
+    prompt_mode: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+) -> List[sqlite3.Row]:
+    """The latest ``limit`` accuracies of one field, newest first."""
+
+    where, params = _run_filters(model, prompt_mode)
+    return connection.execute(
+        "SELECT runs.id, runs.run_id, runs.recorded_at, runs.model, runs.prompt_mode, runs.git_commit, "
+        "run_fields.samples, run_fields.accuracy, runs.wall_p50_ms, runs.wall_p90_ms "
+        f"FROM run_fields JOIN runs ON runs.id = run_fields.run WHERE run_fields.field = ?{where} "
+        "ORDER BY run_fields.run DESC LIMIT ?",
+        (field_name, *params, limit),
+    ).fetchall()
+
+
+def run_trend(
+    connection: sqlite3.Connection,
+    *,
+    model: Optional[str] = None,
+    prompt_mode: Optional[str] = None,
+    limit: int = DEFAULT_LIMIT,
+) -> List[sqlite3.Row]:
+    """The latest ``limit`` runs, newest first."""
+
+    where, params = _run_filters(model, prompt_mode)
+    return connection.execute(
+        "SELECT id, run_id, recorded_at, model, prompt_mode, git_commit, jar_sha256, cases, passed, "
+        "overall_accuracy, wall_p50_ms, wall_p90_ms, decode_tokens_per_s, "
+        "(SELECT ns_per_op FROM cli_benchmarks WHERE run = runs.id AND stage = 'stage1') AS stage1_ns, "
+        "(SELECT ns_per_op FROM cli_benchmarks WHERE run = runs.id AND stage = 'stage2') AS stage2_ns "
+        f"FROM runs WHERE 1 = 1{where} ORDER BY id DESC LIMIT ?",
+        (*params, limit),
+    ).fetchall()
+
+
+def _run_filters(model: Optional[str], prompt_mode: Optional[str]) -> Tuple[str, List[str]]:
+    clauses, params = [], []
+    if model:
+        clauses.append("runs.model = ?")
+        params.append(model)
+    if prompt_mode:
+        clauses.append("runs.prompt_mode = ?")
+        params.append(prompt_mode)
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+
+TREND_HEADERS = {
+    "case": "| Run | Recorded | Model | Mode | Commit | Result | Method | AI calls | Wall | CLI total | Mismatched |",
+    "field": "| Run | Recorded | Model | Mode | Commit | Accuracy | Samples | Wall p50 | Wall p90 |",
+    "run": "| Run | Recorded | Model | Mode | Commit | Jar | Passed | Accuracy | Wall p50 | Wall p90 | Decode | Stage 1 | Stage 2 |",
+}
+
+
+def build_trend_table(rows: Sequence[sqlite3.Row], *, kind: str) -> List[str]:
+    """Markdown table of trend rows (newest first) plus a first-to-latest summary line."""
+
+    header = TREND_HEADERS[kind]
+    lines = [header, "|" + " --- |" * (header.count("|") - 1)]
+    for row in rows:
+        cells = [
+            _run_name(row),
+            row["recorded_at"],
+            evaluate.model_label(row["model"]),
+            row["prompt_mode"],
+            _commit(row["git_commit"]),
+        ]
+        if kind == "case":
+            cells += [
+                f"{'✓' if row['passed'] else '✗'} {row['status']}",
+                row["method"] or "—",
+                str(row["ai_calls"]),
+                evaluate.format_ms(row["wall_ms"]),
+                evaluate.format_ms(row["total_ms"]),
+                row["mismatched"] or "—",
+            ]
+        elif kind == "field":
+            cells += [
+                _percent(row["accuracy"]),
+                str(row["samples"]),
+                evaluate.format_ms(row["wall_p50_ms"]),
+                evaluate.format_ms(row["wall_p90_ms"]),
+            ]
+        else:
+            cells += [
+                (row["jar_sha256"] or "—")[:10],
+                f"{row['passed']}/{row['cases']}",
+                _percent(row["overall_accuracy"]),
+                evaluate.format_ms(row["wall_p50_ms"]),
+                evaluate.format_ms(row["wall_p90_ms"]),
+                evaluate.format_token_rate(row["decode_tokens_per_s"]),
+                format_ns(row["stage1_ns"]) if row["stage1_ns"] is not None else "—",
+                format_ns(row["stage2_ns"]) if row["stage2_ns"] is not None else "—",
+            ]
+        lines.append("| " + " | ".join(cells) + " |")
+    summary = _trend_summary(rows, kind=kind)
+    if summary:
+        lines.extend(["", summary])
+    return lines
+
+
+def _trend_summary(rows: Sequence[sqlite3.Row], *, kind: str) -> Optional[str]:
+    if len(rows) < 2:
+        return None
+    oldest, newest = rows[-1], rows[0]
+    if kind == "case":
+        passes = sum(row["passed"] for row in rows)
+        return (
+            f"Passed {passes} of the last {len(rows)} runs. Wall time {evaluate.format_ms(oldest['wall_ms'])} → "
+            f"{evaluate.format_ms(newest['wall_ms'])}."
+        )
+    accuracy = "accuracy" if kind == "field" else "overall_accuracy"
+    return (
+        f"Over the last {len(rows)} runs: accuracy {_percent(oldest[accuracy])} → {_percent(newest[accuracy])}, "
+        f"wall p50 {evaluate.format_ms(oldest['wall_p50_ms'])} → {evaluate.format_ms(newest['wall_p50_ms'])}."
+    )
+
+
+def _run_name(row: sqlite3.Row) -> str:
+    return row["run_id"] or f"#{row['id']}"
+
+
+def _commit(commit: Optional[str]) -> str:
+    if not commit:
+        return "—"
+    return commit[:10] + ("+dirty" if commit.endswith("+dirty") else "")
+
+
+def _percent(value: Optional[float]) -> str:
+    return f"{value * 100:.1f}%" if value is not None else "n/a"
+
+
+def parse_history_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="evaluate.py history",
+        description="Show accuracy and latency trends across recorded runs.",
+    )
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--test", metavar="ID", help="Show the results of one test case across runs.")
+    target.add_argument(
+        "--field",
+        choices=evaluate.FIELD_ORDER,
+        help="Show the accuracy of one field across runs.",
+    )
+    parser.add_argument("--model", help="Only runs of this model.")
+    parser.add_argument("--prompt-mode", choices=evaluate.PROMPT_MODES, help="Only runs in this prompt mode.")
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_LIMIT,
+        help=f"Number of most recent runs to show (default: {DEFAULT_LIMIT}).",
+    )
+    parser.add_argument(
+        "--results-dir",
+        type=Path,
+        help="Results directory holding history.sqlite (defaults to evaluator/results).",
+    )
+    parser.add_argument("--db", type=Path, help="History store to read (overrides --results-dir).")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover - CLI entrypoint
+    args = parse_history_args(argv)
+    path = args.db or (args.results_dir or evaluate.RESULTS_DIR) / HISTORY_FILE
+    if not path.exists():
+        print(f"Error: run history not found: {path}", file=sys.stderr)
+        raise SystemExit(2)
+    try:
+        with closing(connect(path)) as connection:
+            connection.row_factory = sqlite3.Row
+            filters = {"model": args.model, "prompt_mode": args.prompt_mode, "limit": max(1, args.limit)}
+            if args.test:
+                title, kind = f"Test {args.test}", "case"
+                rows = case_trend(connection, args.test, **filters)
+            elif args.field:
+                title, kind = f"Field {evaluate.FIELD_LABELS[args.field]}", "field"
+                rows = field_trend(connection, args.field, **filters)
+            else:
+                title, kind = "Runs", "run"
+                rows = run_trend(connection, **filters)
+    except (sqlite3.Error, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(3) from exc
+
+    if not rows:
+        print("No recorded runs match.", file=sys.stderr)
+        raise SystemExit(4)
+    print(f"# {title} — {len(rows)} most recent run(s)")
+    print()
+    print("\n".join(build_trend_table(rows, kind=kind)))
+    raise SystemExit(0)
@@ -0,0 +1,307 @@
+"""Live Prometheus metrics for ``--metrics-port``.
+
+A small in-process registry exposed on ``http://127.0.0.1:<port>/metrics`` in the
+Prometheus text format (0.0.4), so a long run can be scraped or just ``curl``ed while it
+is in progress. Only the standard library is used. The recording helpers at the bottom
+do nothing unless the endpoint was started, so instrumented code calls them
+unconditionally.
+"""
+
+from __future__ import annotations
+
+import bisect
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, MutableMapping, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+CLI_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CHUNK_LATENCY_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def _samples(self) -> List[str]:  # pragma: no cover - overridden
+        return []
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]) -> None:
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format_value(total_sum)}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class LiveMetrics:
+    """Every metric the evaluator publishes while a run is in progress."""
+
+    def __init__(self) -> None:
+        self.cases = Counter("evaluator_cases_completed_total", "Cases finished, by run and final status.")
+        self.cli_in_flight = Gauge("evaluator_cli_calls_in_flight", "CLI processes currently running.")
+        self.cli_latency = Histogram(
+            "evaluator_cli_call_seconds", "Wall time of one CLI call, spawn to exit.", CLI_LATENCY_BUCKETS
+        )
+        self.prompts = Counter("evaluator_prompts_generated_total", "Prompts answered by the model.")
+        self.tokens = Counter("evaluator_generated_tokens_total", "New tokens produced by the model.")
+        self.chunk_latency = Histogram(
+            "evaluator_generation_chunk_seconds", "Wall time of one generation call.", CHUNK_LATENCY_BUCKETS
+        )
+        self.tokens_per_second = Gauge(
+            "evaluator_generation_tokens_per_second", "Generated tokens per second in the most recent chunk."
+        )
+        self.prompts_per_second = Gauge(
+            "evaluator_generation_prompts_per_second", "Prompts per second in the most recent chunk."
+        )
+        self.cache = Counter(
+            "evaluator_cache_requests_total",
+            "Work served from earlier results (checkpoint log, shared stage-1 outcomes), by hit or miss.",
+        )
+        self.rss = Gauge("evaluator_process_resident_memory_bytes", "Resident set size of the evaluator process.")
+        self.started = Gauge("evaluator_start_time_seconds", "Unix time the run started.")
+        self.started.set(time.time())
+        self._all: List[_Metric] = [
+            self.cases,
+            self.cli_in_flight,
+            self.cli_latency,
+            self.prompts,
+            self.tokens,
+            self.chunk_latency,
+            self.tokens_per_second,
+            self.prompts_per_second,
+            self.cache,
+            self.rss,
+            self.started,
+        ]
+        self.cli_in_flight.set(0)
+
+    def render(self) -> str:
+        rss = process_rss_bytes()
+        if rss is not None:
+            self.rss.set(rss)
+        lines: List[str] = []
+        for metric in self._all:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve ``metrics.render()`` on localhost from a daemon thread."""
+
+    def __init__(self, metrics: LiveMetrics, *, port: int, host: str = "127.0.0.1") -> None:
+        handler = _handler_for(metrics)
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _handler_for(metrics: LiveMetrics) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            # Scrapes would otherwise interleave with the tqdm progress bars.
+            return
+
+    return Handler
+
+
+def process_rss_bytes() -> Optional[float]:
+    """Current RSS from /proc on Linux, else the peak from getrusage."""
+
+    try:
+        with open("/proc/self/status", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return float(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return float(peak if sys.platform == "darwin" else peak * 1024)
+    except (ImportError, OSError):  # pragma: no cover - Windows
+        return None
+
+
+def _label_key(labels: MutableMapping[str, str]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_active: Optional[LiveMetrics] = None
+_server: Optional[MetricsServer] = None
+
+
+def start(port: int) -> str:
+    """Start publishing on ``port`` (0 picks a free one) and return the endpoint URL."""
+
+    global _active, _server
+    stop()
+    _active = LiveMetrics()
+    _server = MetricsServer(_active, port=port)
+    _server.start()
+    return _server.url
+
+
+def stop() -> None:
+    global _active, _server
+    if _server is not None:
+        _server.close()
+    _active, _server = None, None
+
+
+@contextmanager
+def cli_call() -> Iterator[None]:
+    """Track one CLI process: in-flight while running, then its latency."""
+
+    metrics = _active
+    if metrics is None:
+        yield
+        return
+    metrics.cli_in_flight.inc()
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.cli_in_flight.inc(-1)
+        metrics.cli_latency.observe(time.perf_counter() - start_time)
+
+
+def case_completed(status: str, *, model: str, prompt_mode: str) -> None:
+    if _active is not None:
+        _active.cases.inc(status=status, model=model, prompt_mode=prompt_mode)
+
+
+def generation(prompts: int, seconds: float, *, tokens: Optional[int] = None) -> None:
+    """Record one generation call of ``prompts`` prompts that took ``seconds``."""
+
+    if _active is None:
+        return
+    _active.prompts.inc(prompts)
+    _active.chunk_latency.observe(seconds)
+    if seconds > 0:
+        _active.prompts_per_second.set(prompts / seconds)
+    if tokens is not None:
+        _active.tokens.inc(tokens)
+        if seconds > 0:
+            _active.tokens_per_second.set(tokens / seconds)
+
+
+def cache_lookup(cache: str, *, hits: int = 0, misses: int = 0) -> None:
+    if _active is None:
+        return
+    if hits:
+        _active.cache.inc(hits, cache=cache, result="hit")
+    if misses:
+        _active.cache.inc(misses, cache=cache, result="miss")
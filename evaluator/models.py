@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, MutableMapping, Optional
+import gc
+import time
+from dataclasses import dataclass, replace
+from typing import List, MutableMapping, Optional, Tuple
+
+from generation_stats import TokenStats, batch_token_stats
 
 try:
     import torch
@@ -11,7 +15,8 @@ except ImportError as exc:  # pragma: no cover - surfaced during runtime
     raise RuntimeError("torch is required. Install via requirements.txt.") from exc
 
 try:
-    from transformers import AutoModelForCausalLM, AutoTokenizer
+    from transformers import AutoModelForCausalLM, AutoTokenizer, StoppingCriteria, StoppingCriteriaList
+    from transformers.generation.streamers import BaseStreamer
 except ImportError as exc:  # pragma: no cover - surfaced during runtime
     raise RuntimeError("transformers is required. Install via requirements.txt.") from exc
 
@@ -41,6 +46,35 @@ class ModelSettings:
         return model_name
 
 
+class StepClock(StoppingCriteria):
+    """Never stops generation; records when each new token step completes."""
+
+    def __init__(self) -> None:
+        self.steps: List[float] = []
+
+    def __call__(self, input_ids: "torch.LongTensor", scores: object, **kwargs: object) -> "torch.BoolTensor":
+        self.steps.append(time.perf_counter())
+        return torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+
+
+class TokenTimingStreamer(BaseStreamer):
+    """Streamer that records when each new token arrives, like on-device async callbacks."""
+
+    def __init__(self) -> None:
+        self.token_times: List[float] = []
+        self._prompt_seen = False
+
+    def put(self, value: "torch.Tensor") -> None:
+        # generate() first hands the streamer the prompt, then one token per step.
+        if not self._prompt_seen:
+            self._prompt_seen = True
+            return
+        self.token_times.append(time.perf_counter())
+
+    def end(self) -> None:
+        pass
+
+
 class ModelInference:
     """Wrapper that loads Gemma chat models with 8-bit quantization."""
 
@@ -84,6 +118,25 @@ class ModelInference:
             self.model = self.model.to(self.device)
         self.model.eval()
 
+    def configure(
+        self,
+        *,
+        max_new_tokens: Optional[int] = None,
+        num_threads: Optional[int] = None,
+    ) -> None:
+        """Adjust generation limits and CPU threads without reloading the model."""
+        if max_new_tokens is not None:
+            self.settings = replace(self.settings, max_new_tokens=max_new_tokens)
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
+
+    def close(self) -> None:
+        """Release the model weights so another model can be loaded in the same process."""
+        self.model = None
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
     def generate(self, prompt: str, *, system_prompt: Optional[str] = None) -> str:
         """Generate a deterministic response for the supplied prompt."""
         responses = self.generate_batch([prompt], system_prompt=system_prompt)
@@ -96,8 +149,44 @@ class ModelInference:
         system_prompt: Optional[str] = None,
     ) -> List[str]:
         """Generate deterministic responses for a batch of prompts."""
+        responses, _ = self.generate_batch_with_stats(prompts, system_prompt=system_prompt)
+        return responses
+
+    def generate_batch_with_stats(
+        self,
+        prompts: List[str],
+        *,
+        system_prompt: Optional[str] = None,
+    ) -> Tuple[List[str], List[TokenStats]]:
+        """Like ``generate_batch``, also returning token counts and timing per sequence."""
+        return self._generate(prompts, system_prompt=system_prompt)
+
+    def generate_streaming(self, prompt: str, *, system_prompt: Optional[str] = None) -> Tuple[str, TokenStats]:
+        """Generate one prompt at batch size 1, timing each token as it streams out.
+
+        Mirrors the on-device ``LlmInference`` path: the returned stats carry the time
+        from the call to the first token (templating and tokenization included) and
+        the gap before every later token.
+        """
+        started = time.perf_counter()
+        streamer = TokenTimingStreamer()
+        responses, stats = self._generate([prompt], system_prompt=system_prompt, streamer=streamer)
+        token_stats = stats[0]
+        times = streamer.token_times
+        if times:
+            token_stats.first_token_ms = (times[0] - started) * 1000
+            token_stats.inter_token_ms = [(later - earlier) * 1000 for earlier, later in zip(times, times[1:])]
+        return responses[0], token_stats
+
+    def _generate(
+        self,
+        prompts: List[str],
+        *,
+        system_prompt: Optional[str],
+        streamer: Optional[BaseStreamer] = None,
+    ) -> Tuple[List[str], List[TokenStats]]:
         if not prompts:
-            return []
+            return [], []
 
         chats = [self._build_messages(prompt, system_prompt) for prompt in prompts]
         templates = [
@@ -119,6 +208,8 @@ class ModelInference:
         attention = inputs.get("attention_mask")
         if attention is not None:
             prompt_lengths = attention.sum(dim=1).tolist()
+        clock = StepClock()
+        started = time.perf_counter()
         with torch.inference_mode():
             generation = self.model.generate(
                 **inputs,
@@ -126,20 +217,36 @@ class ModelInference:
                 temperature=self.settings.temperature,
                 do_sample=False,
                 pad_token_id=self.tokenizer.eos_token_id,
+                stopping_criteria=StoppingCriteriaList([clock]),
+                streamer=streamer,
             )
+        finished = time.perf_counter()
         responses: List[str] = []
         input_ids = inputs["input_ids"]
+        generated_counts: List[int] = []
+        filler = {self.tokenizer.eos_token_id, self.tokenizer.pad_token_id}
         for index, sequence in enumerate(generation):
             prompt_length = prompt_lengths[index] if prompt_lengths else input_ids.shape[1]
             if prompt_length > sequence.shape[-1]:
                 prompt_length = sequence.shape[-1]
             output_tokens = sequence[prompt_length:]
+            new_tokens = sequence[input_ids.shape[1]:].tolist()
+            generated_counts.append(sum(1 for token in new_tokens if token not in filler))
             decoded = self.tokenizer.decode(
                 output_tokens,
                 skip_special_tokens=True,
             )
             responses.append(decoded.strip())
-        return responses
+        # Prefill ends when the first new token exists; every later step is decode.
+        first_token = clock.steps[0] if clock.steps else finished
+        stats = batch_token_stats(
+            prompt_lengths or [input_ids.shape[1]] * len(prompts),
+            generated_counts,
+            slots_per_sequence=generation.shape[-1],
+            prefill_ms=(first_token - started) * 1000,
+            decode_ms=(finished - first_token) * 1000,
+        )
+        return responses, stats
 
     def _build_messages(
         self,
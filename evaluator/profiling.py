@@ -0,0 +1,183 @@
+"""``--profile`` support: cProfile over the orchestrator, torch profiler over sampled chunks.
+
+Profiles land in the results directory next to the markdown reports:
+- ``<timestamp>_profile.pstats``: the raw cProfile data, for ``snakeviz`` or ``pstats``.
+- ``<timestamp>_profile.md``: ranked hot-function tables, plus the torch operator
+  table for each profiled generation chunk.
+- ``<timestamp>_torch_chunk<N>.json``: Chrome traces of the profiled chunks.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import os
+import pstats
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, List, MutableMapping, Optional, Tuple
+
+HOT_FUNCTION_ROWS = 30
+TORCH_TABLE_ROWS = 25
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class RunProfiler:
+    """Collect an orchestrator profile and optional per-chunk torch profiles for one run.
+
+    ``generation_chunks`` chunks are profiled with ``torch.profiler``. The first chunk
+    is skipped as warm-up (CUDA context, kernel autotuning) when later chunks exist to
+    sample.
+    """
+
+    def __init__(self, output_dir: Path, *, generation_chunks: int = 0) -> None:
+        self.output_dir = output_dir
+        self.prefix = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.generation_chunks = max(0, generation_chunks)
+        self._profile = cProfile.Profile()
+        self._chunks_seen = 0
+        self._torch_tables: List[Tuple[int, int, str]] = []
+        self._torch_traces: List[Path] = []
+        self._torch_note: Optional[str] = None
+
+    def start(self) -> None:
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+
+    def instrument(self, model: Any) -> Any:
+        """Route the model's batch generation through the torch profiler for sampled chunks.
+
+        ``generate_batch_with_stats`` is wrapped when the model has it, since the
+        evaluator calls it in preference to ``generate_batch``.
+        """
+
+        if not self.generation_chunks:
+            return model
+        method = "generate_batch_with_stats" if hasattr(model, "generate_batch_with_stats") else "generate_batch"
+        generate_batch = getattr(model, method)
+
+        def profiled_generate_batch(prompts: List[str], **kwargs: Any) -> Any:
+            self._chunks_seen += 1
+            chunk = self._chunks_seen
+            if not self._should_profile(chunk):
+                return generate_batch(prompts, **kwargs)
+            return self._profile_chunk(chunk, generate_batch, prompts, kwargs)
+
+        setattr(model, method, profiled_generate_batch)
+        return model
+
+    def model_factory(self, factory: Callable[[str], Any]) -> Callable[[str], Any]:
+        """Wrap ``factory`` so every model it builds is instrumented."""
+
+        return lambda model_name: self.instrument(factory(model_name))
+
+    def _should_profile(self, chunk: int) -> bool:
+        profiled = len(self._torch_tables)
+        if profiled >= self.generation_chunks or self._torch_note:
+            return False
+        return chunk > 1 or self.generation_chunks == 1
+
+    def _profile_chunk(
+        self,
+        chunk: int,
+        generate_batch: Callable[..., Any],
+        prompts: List[str],
+        kwargs: MutableMapping[str, Any],
+    ) -> Any:
+        try:
+            import torch
+            from torch.profiler import ProfilerActivity, profile
+        except ImportError:
+            self._torch_note = "torch is not installed; generation chunks were not profiled."
+            return generate_batch(prompts, **kwargs)
+
+        activities = [ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+        # The orchestrator profile would otherwise charge the torch profiler's own overhead.
+        self._profile.disable()
+        try:
+            with profile(activities=activities, record_shapes=True) as prof:
+                responses = generate_batch(prompts, **kwargs)
+        finally:
+            self._profile.enable()
+        sort_key = "self_cuda_time_total" if ProfilerActivity.CUDA in activities else "self_cpu_time_total"
+        table = prof.key_averages().table(sort_by=sort_key, row_limit=TORCH_TABLE_ROWS)
+        self._torch_tables.append((chunk, len(prompts), table))
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        trace_path = self.output_dir / f"{self.prefix}_torch_chunk{chunk}.json"
+        prof.export_chrome_trace(str(trace_path))
+        self._torch_traces.append(trace_path)
+        return responses
+
+    def write(self) -> List[Path]:
+        """Write the profile files and return their paths."""
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stats_path = self.output_dir / f"{self.prefix}_profile.pstats"
+        markdown_path = self.output_dir / f"{self.prefix}_profile.md"
+        self._profile.dump_stats(str(stats_path))
+        stats = pstats.Stats(str(stats_path))
+        markdown_path.write_text(self.build_markdown(stats, stats_path), encoding="utf-8")
+        return [markdown_path, stats_path, *self._torch_traces]
+
+    def build_markdown(self, stats: pstats.Stats, stats_path: Path) -> str:
+        lines: List[str] = ["# Evaluation Profile", ""]
+        total = getattr(stats, "total_tt", 0.0)
+        lines.append(
+            f"Total profiled time: {total:.2f}s. Raw data: `{stats_path.name}` "
+            f"(`python -m pstats {stats_path.name}` or `snakeviz {stats_path.name}`)."
+        )
+        for title, column in (("By cumulative time", 3), ("By self time", 2)):
+            lines.extend(["", f"## Hot Functions — {title}", ""])
+            lines.extend(hot_function_table(stats, column=column, limit=HOT_FUNCTION_ROWS))
+        if self._torch_tables or self._torch_note:
+            lines.extend(["", "## Generation Chunks (torch.profiler)", ""])
+            if self._torch_note:
+                lines.append(self._torch_note)
+            for (chunk, size, table), trace in zip(self._torch_tables, self._torch_traces):
+                lines.extend([f"### Chunk {chunk} ({size} prompts, trace `{trace.name}`)", ""])
+                lines.extend(["```", table.rstrip(), "```", ""])
+        lines.append("")
+        return "\n".join(lines)
+
+
+def hot_function_table(stats: pstats.Stats, *, column: int, limit: int) -> List[str]:
+    """Markdown rows for the ``limit`` functions with the largest ``column`` timing.
+
+    ``column`` indexes pstats' ``(primitive calls, calls, self time, cumulative time)``.
+    """
+
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)  # type: ignore[attr-defined]
+    rows = ["| # | Function | Calls | Self | Cumulative | Per call (cum.) |", "| --- | --- | --- | --- | --- | --- |"]
+    for rank, ((filename, line, name), (primitive, calls, self_time, cumulative, _)) in enumerate(entries[:limit], 1):
+        call_text = f"{calls}/{primitive}" if calls != primitive else str(calls)
+        per_call = cumulative / primitive if primitive else 0.0
+        location = f"{short_path(filename)}:{line}" if line else short_path(filename)
+        rows.append(
+            f"| {rank} | `{name}` {location} | {call_text} | {self_time:.3f}s | {cumulative:.3f}s | "
+            f"{per_call * 1000:.2f} ms |"
+        )
+    return rows
+
+
+def short_path(filename: str) -> str:
+    """Path relative to the repository or its site-packages root, for readable tables."""
+
+    if filename.startswith("<") or filename == "~":
+        return "(built-in)" if filename == "~" else filename
+    path = Path(filename)
+    try:
+        return str(path.resolve().relative_to(PROJECT_ROOT))
+    except ValueError:
+        pass
+    parts = path.parts
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            return os.path.join(*parts[parts.index(marker) + 1 :])
+    if sys.prefix and filename.startswith(sys.prefix):
+        return os.path.relpath(filename, sys.prefix)
+    return filename
+
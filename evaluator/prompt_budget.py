@@ -0,0 +1,354 @@
+"""Prompt token budget behind ``evaluate.py analyze-prompts``.
+
+Runs stage 1 over the suite to collect the prompts ``FocusedPromptBuilder`` emits, then
+tokenizes each one exactly as ``ModelInference`` would (chat template included). Every
+token is attributed to the prompt section it came from: system line, utterance,
+heuristic draft, option lists from ``formatOptions``/``filterTagOptions``,
+instructions, guidelines and so on. The report ranks the largest contributors overall
+and per field and, given a prefill rate, projects what each costs in prefill time. It
+shows where trimming the config or the prompt text would pay off.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import re
+import shlex
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, MutableMapping, Optional, Sequence, Tuple
+
+import evaluate
+from models import SUPPORTED_MODELS
+from stats import QuantileSketch
+
+CHAT_TEMPLATE = "Chat template"
+LAYOUT = "Blank lines"
+SYSTEM_LINE = "System line"
+UNRECOGNIZED = "Other"
+# Line prefixes FocusedPromptBuilder starts each section with. Lines without one of
+# these (multi-line instructions, heuristic summary bullets) continue the section above.
+SECTION_PREFIXES: Sequence[Tuple[str, str]] = (
+    ("Refine only the requested", SYSTEM_LINE),
+    ("Input: ", "Utterance"),
+    ("Field: ", "Field header"),
+    ("Heuristic summary:", "Heuristic draft"),
+    ("Heuristic: ", "Heuristic draft"),
+    ("Allowed values: ", "Options"),
+    ("Context: ", "Merchant context"),
+    ("Instruction: ", "Instruction"),
+    ("Return a JSON object", "Output format"),
+    ("Respond with compact JSON", "Output format"),
+    ("Guideline for ", "Guideline"),
+)
+FIELD_KEY_PATTERN = re.compile(r'\(key "([^"]+)"\)')
+GUIDELINE_PATTERN = re.compile(r"Guideline for ([^:]+):")
+OPTION_PART_PATTERN = re.compile(r"(\w+)=")
+TOP_CONTRIBUTORS = 3
+RANKED_SECTIONS = 15
+
+
+def prompt_sections(prompt: str) -> List[Tuple[int, int, str]]:
+    """Split ``prompt`` into ``(start, end, section)`` character spans covering all of it.
+
+    Per-field sections (options, instructions, guidelines) are qualified with their
+    key, e.g. ``Options (tags)``; shared option lists in multi-field prompts are split
+    per list, e.g. ``Options (recentMerchants)``.
+    """
+
+    spans: List[Tuple[int, int, str]] = []
+    current = UNRECOGNIZED
+    current_key: Optional[str] = None
+    offset = 0
+    for line in prompt.splitlines(keepends=True):
+        start, offset = offset, offset + len(line)
+        text = line.rstrip("\r\n")
+        if not text.strip():
+            spans.append((start, offset, LAYOUT))
+            continue
+        for prefix, section in SECTION_PREFIXES:
+            if text.startswith(prefix):
+                current = section
+                break
+        if current == "Field header":
+            match = FIELD_KEY_PATTERN.search(text)
+            current_key = match.group(1) if match else None
+        elif current == "Guideline":
+            match = GUIDELINE_PATTERN.match(text)
+            current_key = match.group(1).strip() if match else current_key
+        if current == "Options" and text.startswith("Allowed values: "):
+            spans.extend(_option_spans(text, start, current_key))
+            if offset > start + len(text):
+                spans.append((start + len(text), offset, _qualified("Options", current_key)))
+            continue
+        if current in ("Instruction", "Guideline") and current_key:
+            spans.append((start, offset, _qualified(current, current_key)))
+        else:
+            spans.append((start, offset, current))
+    return spans
+
+
+def _option_spans(text: str, start: int, field_key: Optional[str]) -> List[Tuple[int, int, str]]:
+    """Spans for an ``Allowed values:`` line, one per ``name=`` list when it has them."""
+
+    parts = list(OPTION_PART_PATTERN.finditer(text))
+    if not parts:
+        return [(start, start + len(text), _qualified("Options", field_key))]
+    spans = [(start, start + parts[0].start(), _qualified("Options", None))]
+    for index, part in enumerate(parts):
+        end = parts[index + 1].start() if index + 1 < len(parts) else len(text)
+        spans.append((start + part.start(), start + end, _qualified("Options", part.group(1))))
+    return spans
+
+
+def _qualified(section: str, key: Optional[str]) -> str:
+    return f"{section} ({key})" if key else section
+
+
+@dataclass
+class PromptBudget:
+    """Tokens of one prompt, by section."""
+
+    field: str
+    total: int
+    sections: MutableMapping[str, int]
+
+
+class PromptTokenizer:
+    """Count prompt tokens the way ``ModelInference`` builds its inputs."""
+
+    def __init__(self, tokenizer: Any) -> None:
+        self.tokenizer = tokenizer
+
+    def budget(self, field_name: str, prompt: str) -> PromptBudget:
+        text = self.tokenizer.apply_chat_template(
+            [{"role": "user", "content": prompt}],
+            tokenize=False,
+            add_generation_prompt=True,
+        )
+        # Chat templates may trim the message, so locate the stripped prompt.
+        core = prompt.strip()
+        found = text.find(core) if core else -1
+        prompt_start = found - (len(prompt) - len(prompt.lstrip())) if found >= 0 else -1
+        spans = prompt_sections(prompt)
+        sections: MutableMapping[str, int] = {}
+        try:
+            encoded = self.tokenizer(text, add_special_tokens=True, return_offsets_mapping=True)
+            offsets = encoded["offset_mapping"]
+        except (NotImplementedError, TypeError, ValueError, KeyError):
+            # Slow tokenizers have no offsets; count each section on its own instead.
+            return self._budget_by_section(field_name, text, prompt, spans)
+
+        starts = [span[0] for span in spans]
+        for token_start, token_end in offsets:
+            section = CHAT_TEMPLATE
+            relative = token_start - prompt_start
+            if found >= 0 and token_end > token_start and 0 <= relative < len(prompt):
+                section = spans[bisect.bisect_right(starts, relative) - 1][2]
+            sections[section] = sections.get(section, 0) + 1
+        return PromptBudget(field=field_name, total=len(offsets), sections=sections)
+
+    def _budget_by_section(
+        self,
+        field_name: str,
+        text: str,
+        prompt: str,
+        spans: Sequence[Tuple[int, int, str]],
+    ) -> PromptBudget:
+        total = len(self.tokenizer(text, add_special_tokens=True)["input_ids"])
+        sections: MutableMapping[str, int] = {}
+        for start, end, section in spans:
+            count = len(self.tokenizer(prompt[start:end], add_special_tokens=False)["input_ids"])
+            sections[section] = sections.get(section, 0) + count
+        sections[CHAT_TEMPLATE] = max(0, total - sum(sections.values()))
+        return PromptBudget(field=field_name, total=total, sections=sections)
+
+
+@dataclass
+class BudgetGroup:
+    """Token totals for a set of prompts (all prompts, or one field's)."""
+
+    prompts: int = 0
+    tokens: int = 0
+    sections: MutableMapping[str, int] = field(default_factory=dict)
+    sketch: QuantileSketch = field(default_factory=QuantileSketch)
+    longest: int = 0
+
+    def add(self, budget: PromptBudget) -> None:
+        self.prompts += 1
+        self.tokens += budget.total
+        self.sketch.add(budget.total)
+        self.longest = max(self.longest, budget.total)
+        for section, count in budget.sections.items():
+            self.sections[section] = self.sections.get(section, 0) + count
+
+    def ranked(self) -> List[Tuple[str, int]]:
+        return sorted(self.sections.items(), key=lambda item: (-item[1], item[0]))
+
+
+def analyze(budgets: Sequence[PromptBudget]) -> Tuple[BudgetGroup, MutableMapping[str, BudgetGroup]]:
+    overall = BudgetGroup()
+    per_field: MutableMapping[str, BudgetGroup] = {}
+    for budget in budgets:
+        overall.add(budget)
+        per_field.setdefault(budget.field, BudgetGroup()).add(budget)
+    return overall, dict(sorted(per_field.items()))
+
+
+def build_budget_markdown(
+    overall: BudgetGroup,
+    per_field: MutableMapping[str, BudgetGroup],
+    *,
+    model_name: str,
+    prompt_mode: str,
+    cases: int,
+    prefill_rate: Optional[float],
+) -> str:
+    def prefill(tokens: float) -> str:
+        return evaluate.format_ms(tokens / prefill_rate * 1000) if prefill_rate else "n/a"
+
+    lines: List[str] = ["# Prompt Token Budget", ""]
+    lines.append(
+        f"{overall.prompts} prompt(s) from {cases} case(s), `{prompt_mode}` mode, tokenized with the "
+        f"`{model_name}` tokenizer and chat template."
+    )
+    if prefill_rate:
+        lines.append(f"Projected prefill assumes {prefill_rate:,.0f} prompt tokens/s.")
+    else:
+        lines.append("Pass `--prefill-rate` (e.g. the summary's prefill throughput) to project prefill time.")
+
+    lines.extend(["", "## Per Field", ""])
+    lines.append(
+        "| Prompt field | Prompts | Mean tokens | p50 | p90 | Max | Projected prefill (mean) | Largest sections |"
+    )
+    lines.append("| --- | --- | --- | --- | --- | --- | --- | --- |")
+    for name, group in per_field.items():
+        mean = group.tokens / group.prompts
+        top = ", ".join(
+            f"{escape(section)} {count / group.prompts:.0f} ({count / group.tokens * 100:.0f}%)"
+            for section, count in group.ranked()[:TOP_CONTRIBUTORS]
+        )
+        p50, p90 = group.sketch.quantile(0.5), group.sketch.quantile(0.9)
+        lines.append(
+            f"| {escape(name)} | {group.prompts} | {mean:.1f} | {p50:.0f} | {p90:.0f} | {group.longest} "
+            f"| {prefill(mean)} | {top} |"
+        )
+
+    lines.extend(["", "## Largest Contributors", ""])
+    lines.append("| Section | Tokens | Share | Mean per prompt | Projected prefill per prompt |")
+    lines.append("| --- | --- | --- | --- | --- |")
+    for section, count in overall.ranked()[:RANKED_SECTIONS]:
+        per_prompt = count / overall.prompts
+        lines.append(
+            f"| {escape(section)} | {count} | {count / overall.tokens * 100:.1f}% | {per_prompt:.1f} "
+            f"| {prefill(per_prompt)} |"
+        )
+    mean = overall.tokens / overall.prompts
+    lines.append(f"| **All sections** | {overall.tokens} | 100% | {mean:.1f} | {prefill(mean)} |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def escape(text: str) -> str:
+    return evaluate.escape_markdown(text)
+
+
+def load_tokenizer(name: str) -> Any:
+    try:
+        from transformers import AutoTokenizer
+    except ImportError as exc:  # pragma: no cover - surfaced during runtime
+        raise RuntimeError("transformers is required. Install via requirements.txt.") from exc
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    return tokenizer
+
+
+def parse_budget_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="evaluate.py analyze-prompts",
+        description="Attribute prompt tokens to FocusedPromptBuilder sections and project prefill cost.",
+    )
+    parser.add_argument("--model", required=True, choices=SUPPORTED_MODELS, help="Model whose tokenizer to use.")
+    parser.add_argument("--tokenizer", help="Tokenizer name or path, if not the model's own.")
+    parser.add_argument("--jar", type=Path, help="Path to the Kotlin CLI jar.")
+    parser.add_argument("--config", type=Path, default=evaluate.CONFIG_FILE, help="Path to config.json.")
+    parser.add_argument("--test-cases", type=Path, default=evaluate.TEST_CASES_FILE, help="Markdown test cases.")
+    parser.add_argument("--test", dest="tests", action="append", help="Limit prompt collection to these IDs.")
+    parser.add_argument("--java", metavar="CMD", help="Override the java command used to launch the CLI.")
+    parser.add_argument(
+        "--prompt-mode",
+        choices=evaluate.PROMPT_MODES,
+        default=evaluate.PROMPT_MODE_PER_FIELD,
+        help="Prompt mode to collect prompts in.",
+    )
+    parser.add_argument(
+        "--prefill-rate",
+        type=float,
+        metavar="TOK_PER_S",
+        help="Prompt tokens per second used to project prefill time.",
+    )
+    parser.add_argument(
+        "--results-dir",
+        type=Path,
+        default=evaluate.RESULTS_DIR,
+        help="Directory to write the report (defaults to evaluator/results/).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover - CLI entrypoint
+    args = parse_budget_args(argv)
+    java_cmd = tuple(shlex.split(args.java)) if args.java else None
+    if args.prefill_rate is not None and args.prefill_rate <= 0:
+        print("Error: --prefill-rate must be positive.", file=sys.stderr)
+        raise SystemExit(3)
+
+    try:
+        test_cases = evaluate.select_test_cases(args.test_cases, args.tests)
+        if not test_cases:
+            print("No test cases found.", file=sys.stderr)
+            raise SystemExit(4)
+        stage_one = evaluate.run_stage_one(
+            test_cases,
+            base_context=evaluate.load_config_context(args.config),
+            jar_path=args.jar or evaluate.find_cli_jar(),
+            java_cmd=java_cmd or evaluate.DEFAULT_JAVA_CMD,
+            prompt_mode=args.prompt_mode,
+        )
+        tokenizer = PromptTokenizer(load_tokenizer(args.tokenizer or args.model))
+    except FileNotFoundError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(2) from exc
+    except (RuntimeError, OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(3) from exc
+
+    budgets = [
+        tokenizer.budget(exchange.field, exchange.prompt)
+        for _, pending in stage_one.pending
+        for exchange in pending.prompts
+    ]
+    if not budgets:
+        print("No prompts collected; the selected cases never needed AI refinement.", file=sys.stderr)
+        raise SystemExit(4)
+
+    overall, per_field = analyze(budgets)
+    report = build_budget_markdown(
+        overall,
+        per_field,
+        model_name=args.tokenizer or args.model,
+        prompt_mode=args.prompt_mode,
+        cases=len(test_cases),
+        prefill_rate=args.prefill_rate,
+    )
+    args.results_dir.mkdir(parents=True, exist_ok=True)
+    path = args.results_dir / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_prompt_budget.md"
+    path.write_text(report, encoding="utf-8")
+    print(f"{overall.prompts} prompt(s), {overall.tokens / overall.prompts:.1f} tokens on average.")
+    for section, count in overall.ranked()[:TOP_CONTRIBUTORS]:
+        print(f"  {section}: {count / overall.prompts:.1f} tokens/prompt ({count / overall.tokens * 100:.1f}%)")
+    print(f"Prompt budget written to: {path}")
@@ -0,0 +1,469 @@
+"""Performance regression gate behind ``--baseline``.
+
+A finished run is compared against a stored baseline run (its checkpoint log) on:
+- per-phase latency percentiles,
+- prefill and decode tokens/s,
+- AI calls per case.
+
+Each metric is a statistic over per-case (or per-prompt) samples. Its relative change
+gets a bootstrap confidence interval, from resampling both runs' samples. A metric
+regresses only when the change is worse than its threshold *and* the interval
+excludes zero. Ordinary run-to-run noise therefore does not fail the gate. The
+markdown diff also lists per-field accuracy deltas and the cases that started or
+stopped passing.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+import evaluate
+from evaluate import EvaluationMetrics, TestExecutionResult
+from generation_stats import TokenStats
+from timing import PHASE_LABELS, WALL_KEY, WALL_PHASES, wall_ms
+
+DEFAULT_THRESHOLD_PCT = 10.0
+DEFAULT_BOOTSTRAP = 1000
+DEFAULT_CONFIDENCE = 0.95
+LATENCY_QUANTILES = (("p50", 0.5), ("p90", 0.9))
+# Latency changes smaller than this are timer noise whatever their relative size
+# (sub-millisecond JSON encode/decode phases).
+MIN_DELTA_MS = 1.0
+# Bound the resampled matrix held in memory at once (rows x samples).
+BOOTSTRAP_CELLS = 4_000_000
+
+VERDICT_REGRESSED = "regressed"
+VERDICT_IMPROVED = "improved"
+VERDICT_UNCHANGED = "unchanged"
+VERDICT_SKIPPED = "n/a"
+
+Statistic = Callable[[np.ndarray], np.ndarray]
+Matrix = Mapping[tuple[str, str], List[TestExecutionResult]]
+LATENCY_KEYS: Sequence[Tuple[str, str]] = ((WALL_KEY, PHASE_LABELS[WALL_KEY]), ("total_ms", "CLI total time"), *WALL_PHASES)
+RATE_METRICS = ("prefill_tokens_per_s", "decode_tokens_per_s")
+COUNT_METRICS = ("ai_calls_per_case",)
+
+
+@dataclass(frozen=True)
+class GateSettings:
+    """Thresholds and bootstrap parameters for the gate."""
+
+    threshold_pct: float = DEFAULT_THRESHOLD_PCT
+    # Per-metric overrides, keyed by metric name (e.g. ``wall_ms.p90``).
+    overrides: Mapping[str, float] = field(default_factory=dict)
+    bootstrap: int = DEFAULT_BOOTSTRAP
+    confidence: float = DEFAULT_CONFIDENCE
+    seed: int = 0
+
+    def threshold_for(self, metric: str) -> float:
+        return self.overrides.get(metric, self.threshold_pct)
+
+
+@dataclass
+class MetricDelta:
+    """One metric in both runs, with the bootstrap interval of its relative change."""
+
+    name: str
+    label: str
+    baseline: Optional[float]
+    current: Optional[float]
+    change: Optional[float]
+    low: Optional[float]
+    high: Optional[float]
+    threshold_pct: float
+    higher_is_better: bool
+    verdict: str
+    unit: str = "ms"
+
+
+@dataclass
+class RunDiff:
+    """Speed and accuracy differences for one ``(model, prompt mode)`` run."""
+
+    label: str
+    baseline_cases: int
+    current_cases: int
+    shared_cases: int
+    speed: List[MetricDelta]
+    baseline_metrics: EvaluationMetrics
+    current_metrics: EvaluationMetrics
+    newly_failing: List[str]
+    newly_passing: List[str]
+
+    @property
+    def regressed(self) -> List[MetricDelta]:
+        return [delta for delta in self.speed if delta.verdict == VERDICT_REGRESSED]
+
+
+@dataclass
+class BaselineGate:
+    """A loaded baseline run and the settings to judge the current run against it."""
+
+    reference: str
+    matrix: Matrix
+    settings: GateSettings
+
+    def check(
+        self,
+        matrix: Matrix,
+        *,
+        labels: Mapping[tuple[str, str], str],
+        output_dir: Path,
+        timestamp: str,
+    ) -> Tuple[Path, List[RunDiff]]:
+        """Diff every run in ``matrix`` that has a baseline counterpart and write the report."""
+
+        diffs = [
+            diff_runs(labels.get(key, ""), executions, previous, self.settings)
+            for key, executions, previous in pair_runs(matrix, self.matrix)
+        ]
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / f"{timestamp}_regression.md"
+        path.write_text(
+            build_regression_markdown(diffs, baseline_reference=self.reference, settings=self.settings),
+            encoding="utf-8",
+        )
+        return path, diffs
+
+
+def metric_names() -> List[str]:
+    """Every metric a threshold can be set for."""
+
+    latency = [f"{key}.{name}" for key, _ in LATENCY_KEYS for name, _ in LATENCY_QUANTILES]
+    return [*latency, *RATE_METRICS, *COUNT_METRICS]
+
+
+def load_baseline(reference: str, results_dir: Path, settings: GateSettings) -> BaselineGate:
+    """Load a baseline run, given its run ID or the path to its checkpoint log."""
+
+    unknown = sorted(set(settings.overrides) - set(metric_names()))
+    if unknown:
+        raise ValueError(f"Unknown --threshold metric(s): {', '.join(unknown)}. Known: {', '.join(metric_names())}.")
+    path = Path(reference)
+    if not path.suffix:
+        path = evaluate.run_log_path(results_dir, reference)
+    _, matrix = evaluate.load_run_log(path)
+    if not any(matrix.values()):
+        raise ValueError(f"Baseline {reference} has no recorded executions.")
+    return BaselineGate(reference=reference, matrix=matrix, settings=settings)
+
+
+def pair_runs(current: Matrix, baseline: Matrix) -> List[Tuple[tuple[str, str], List[TestExecutionResult], List[TestExecutionResult]]]:
+    """Match runs by model and prompt mode; a lone run on each side is compared as-is."""
+
+    pairs = [(key, executions, baseline[key]) for key, executions in current.items() if key in baseline]
+    if not pairs and len(current) == 1 and len(baseline) == 1:
+        (key, executions), (_, previous) = next(iter(current.items())), next(iter(baseline.items()))
+        pairs = [(key, executions, previous)]
+    return pairs
+
+
+def diff_runs(
+    label: str,
+    current: Sequence[TestExecutionResult],
+    baseline: Sequence[TestExecutionResult],
+    settings: GateSettings,
+) -> RunDiff:
+    """Compare one run with its baseline, restricted to the cases both ran when they overlap."""
+
+    shared = {execution.case.identifier for execution in current} & {
+        execution.case.identifier for execution in baseline
+    }
+    if shared:
+        current_used = [execution for execution in current if execution.case.identifier in shared]
+        baseline_used = [execution for execution in baseline if execution.case.identifier in shared]
+    else:
+        current_used, baseline_used = list(current), list(baseline)
+    current_comparisons = evaluate.compare_results(current_used)
+    baseline_comparisons = evaluate.compare_results(baseline_used)
+    rng = np.random.default_rng(settings.seed)
+
+    speed: List[MetricDelta] = []
+    for name, label_text, samples in _latency_samples(current_used, baseline_used):
+        current_values, baseline_values = samples
+        for quantile_name, quantile in LATENCY_QUANTILES:
+            metric = f"{name}.{quantile_name}"
+            speed.append(
+                _compare(
+                    metric,
+                    f"{label_text} {quantile_name}",
+                    baseline_values,
+                    current_values,
+                    lambda values, q=quantile: np.quantile(values, q, axis=-1),
+                    higher_is_better=False,
+                    settings=settings,
+                    rng=rng,
+                )
+            )
+    for name, label_text, picker in (
+        ("prefill_tokens_per_s", "Prefill throughput", lambda stats: (stats.prompt_tokens, stats.prefill_ms)),
+        ("decode_tokens_per_s", "Decode throughput", lambda stats: (stats.generated_tokens, stats.decode_ms)),
+    ):
+        current_pairs = _token_pairs(current_used, picker)
+        baseline_pairs = _token_pairs(baseline_used, picker)
+        speed.append(
+            _compare(
+                name,
+                label_text,
+                baseline_pairs,
+                current_pairs,
+                _rate,
+                higher_is_better=True,
+                settings=settings,
+                rng=rng,
+                unit="tok/s",
+            )
+        )
+    speed.append(
+        _compare(
+            "ai_calls_per_case",
+            "AI calls per case",
+            np.array([execution.ai_calls for execution in baseline_used], dtype=float),
+            np.array([execution.ai_calls for execution in current_used], dtype=float),
+            lambda values: values.mean(axis=-1),
+            higher_is_better=False,
+            settings=settings,
+            rng=rng,
+            unit="calls",
+        )
+    )
+
+    baseline_passing = {comp.execution.case.identifier for comp in baseline_comparisons if comp.overall_match}
+    current_passing = {comp.execution.case.identifier for comp in current_comparisons if comp.overall_match}
+    return RunDiff(
+        label=label,
+        baseline_cases=len(baseline),
+        current_cases=len(current),
+        shared_cases=len(shared),
+        speed=speed,
+        baseline_metrics=evaluate.compute_metrics(baseline_comparisons),
+        current_metrics=evaluate.compute_metrics(current_comparisons),
+        newly_failing=sorted(baseline_passing - current_passing) if shared else [],
+        newly_passing=sorted(current_passing - baseline_passing) if shared else [],
+    )
+
+
+def _latency_samples(
+    current: Sequence[TestExecutionResult],
+    baseline: Sequence[TestExecutionResult],
+) -> List[Tuple[str, str, Tuple[np.ndarray, np.ndarray]]]:
+    """Per-case values of every latency the runs recorded: wall phases, case wall time, CLI total."""
+
+    def values(executions: Sequence[TestExecutionResult], key: str) -> np.ndarray:
+        collected: List[float] = []
+        for execution in executions:
+            if key == "total_ms":
+                value = execution.stats.get("total_ms") if isinstance(execution.stats, Mapping) else None
+            elif key == WALL_KEY:
+                value = wall_ms(execution.timings)
+            else:
+                value = execution.timings.get(key)
+            if isinstance(value, (int, float)):
+                collected.append(float(value))
+        return np.array(collected, dtype=float)
+
+    samples = []
+    for key, label in LATENCY_KEYS:
+        pair = (values(current, key), values(baseline, key))
+        if len(pair[0]) or len(pair[1]):
+            samples.append((key, label, pair))
+    return samples
+
+
+def _token_pairs(
+    executions: Sequence[TestExecutionResult],
+    picker: Callable[[TokenStats], Tuple[int, Optional[float]]],
+) -> np.ndarray:
+    rows = []
+    for execution in executions:
+        for exchange in execution.prompts:
+            if exchange.tokens is None:
+                continue
+            tokens, milliseconds = picker(exchange.tokens)
+            if milliseconds is not None:
+                rows.append((tokens, milliseconds))
+    return np.array(rows, dtype=float).reshape(-1, 2)
+
+
+def _rate(pairs: np.ndarray) -> np.ndarray:
+    """Tokens per second over the rows of ``pairs`` (``[..., n, 2]`` of tokens and ms)."""
+
+    milliseconds = pairs[..., 1].sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(milliseconds > 0, pairs[..., 0].sum(axis=-1) / (milliseconds / 1000), np.nan)
+
+
+def _compare(
+    name: str,
+    label: str,
+    baseline: np.ndarray,
+    current: np.ndarray,
+    statistic: Statistic,
+    *,
+    higher_is_better: bool,
+    settings: GateSettings,
+    rng: np.random.Generator,
+    unit: str = "ms",
+) -> MetricDelta:
+    threshold = settings.threshold_for(name)
+    if not len(baseline) or not len(current):
+        return MetricDelta(
+            name, label, None, None, None, None, None, threshold, higher_is_better, VERDICT_SKIPPED, unit
+        )
+    baseline_value = float(statistic(baseline))
+    current_value = float(statistic(current))
+    if not np.isfinite(baseline_value) or not np.isfinite(current_value) or baseline_value == 0:
+        verdict = VERDICT_UNCHANGED if baseline_value == current_value else VERDICT_SKIPPED
+        return MetricDelta(
+            name, label, baseline_value, current_value, None, None, None, threshold, higher_is_better, verdict, unit
+        )
+
+    change = current_value / baseline_value - 1
+    ratios = _bootstrap(baseline, statistic, settings.bootstrap, rng)
+    current_ratios = _bootstrap(current, statistic, settings.bootstrap, rng)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        changes = current_ratios / ratios - 1
+    changes = changes[np.isfinite(changes)]
+    alpha = (1 - settings.confidence) / 2
+    low, high = (
+        (float(np.quantile(changes, alpha)), float(np.quantile(changes, 1 - alpha))) if len(changes) else (None, None)
+    )
+
+    # Worse means slower latency / more calls, or lower throughput.
+    worse = -change if higher_is_better else change
+    worse_low = (-high if higher_is_better else low) if low is not None and high is not None else None
+    better_high = (-low if higher_is_better else high) if low is not None and high is not None else None
+    limit = threshold / 100
+    if unit == "ms" and abs(current_value - baseline_value) < MIN_DELTA_MS:
+        verdict = VERDICT_UNCHANGED
+    elif worse > limit and worse_low is not None and worse_low > 0:
+        verdict = VERDICT_REGRESSED
+    elif worse < -limit and better_high is not None and better_high < 0:
+        verdict = VERDICT_IMPROVED
+    else:
+        verdict = VERDICT_UNCHANGED
+    return MetricDelta(
+        name, label, baseline_value, current_value, change, low, high, threshold, higher_is_better, verdict, unit
+    )
+
+
+def _bootstrap(samples: np.ndarray, statistic: Statistic, rounds: int, rng: np.random.Generator) -> np.ndarray:
+    """``statistic`` over ``rounds`` resamples of ``samples`` (rows resampled with replacement)."""
+
+    count = len(samples)
+    batch = max(1, min(rounds, BOOTSTRAP_CELLS // max(1, count)))
+    results: List[np.ndarray] = []
+    remaining = rounds
+    while remaining > 0:
+        size = min(batch, remaining)
+        indices = rng.integers(0, count, size=(size, count))
+        results.append(np.asarray(statistic(samples[indices]), dtype=float))
+        remaining -= size
+    return np.concatenate(results)
+
+
+def build_regression_markdown(
+    diffs: Sequence[RunDiff],
+    *,
+    baseline_reference: str,
+    settings: GateSettings,
+) -> str:
+    lines: List[str] = ["# Regression Check", ""]
+    lines.append(
+        f"Baseline `{baseline_reference}`. A metric regresses when it is more than its threshold worse and the "
+        f"{settings.confidence * 100:.0f}% bootstrap interval ({settings.bootstrap} resamples) of the change "
+        f"excludes zero. Latency changes under {MIN_DELTA_MS:g} ms are ignored."
+    )
+    if not diffs:
+        lines.extend(["", "No run in the baseline matches this run's models and prompt modes.", ""])
+        return "\n".join(lines)
+
+    for diff in diffs:
+        lines.extend(["", f"## {diff.label}" if diff.label else "## Run", ""])
+        status = f"❌ {len(diff.regressed)} regression(s)" if diff.regressed else "✅ no regressions"
+        lines.append(
+            f"{status}. {diff.current_cases} case(s) now, {diff.baseline_cases} in the baseline, "
+            f"{diff.shared_cases} compared."
+        )
+        lines.extend(["", "### Speed", ""])
+        lines.append("| Metric | Baseline | Current | Change | CI | Threshold | Verdict |")
+        lines.append("| --- | --- | --- | --- | --- | --- | --- |")
+        for delta in diff.speed:
+            lines.append(
+                f"| {delta.label} | {_value(delta.baseline, delta.unit)} | {_value(delta.current, delta.unit)} "
+                f"| {_pct(delta.change)} | {_interval(delta)} | ±{delta.threshold_pct:g}% | {_verdict(delta)} |"
+            )
+
+        lines.extend(["", "### Accuracy", ""])
+        lines.append("| Field | Baseline | Current | Δ |")
+        lines.append("| --- | --- | --- | --- |")
+        before, after = diff.baseline_metrics, diff.current_metrics
+        lines.append(
+            f"| Overall | {_accuracy(before.overall_accuracy)} | {_accuracy(after.overall_accuracy)} "
+            f"| {_points(before.overall_accuracy, after.overall_accuracy)} |"
+        )
+        for field_name in evaluate.FIELD_ORDER:
+            old, new = before.per_field_accuracy.get(field_name), after.per_field_accuracy.get(field_name)
+            if old is None and new is None:
+                continue
+            lines.append(
+                f"| {evaluate.FIELD_LABELS[field_name]} | {_accuracy(old)} | {_accuracy(new)} | {_points(old, new)} |"
+            )
+        if diff.newly_failing:
+            lines.extend(["", "Newly failing: " + ", ".join(evaluate.escape_markdown(i) for i in diff.newly_failing)])
+        if diff.newly_passing:
+            lines.extend(["", "Newly passing: " + ", ".join(evaluate.escape_markdown(i) for i in diff.newly_passing)])
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _value(value: Optional[float], unit: str) -> str:
+    if value is None:
+        return "n/a"
+    if unit == "ms":
+        return evaluate.format_ms(value)
+    if unit == "tok/s":
+        return f"{value:,.1f} tok/s"
+    return f"{value:.2f}"
+
+
+def _pct(value: Optional[float]) -> str:
+    return f"{value * 100:+.1f}%" if value is not None else "n/a"
+
+
+def _interval(delta: MetricDelta) -> str:
+    if delta.low is None or delta.high is None:
+        return "n/a"
+    return f"{delta.low * 100:+.1f}% … {delta.high * 100:+.1f}%"
+
+
+def _verdict(delta: MetricDelta) -> str:
+    return {
+        VERDICT_REGRESSED: "❌ regressed",
+        VERDICT_IMPROVED: "⬆️ improved",
+        VERDICT_UNCHANGED: "✅",
+    }.get(delta.verdict, "—")
+
+
+def _accuracy(value: Optional[float]) -> str:
+    return f"{value * 100:.1f}%" if value is not None else "n/a"
+
+
+def _points(before: Optional[float], after: Optional[float]) -> str:
+    if before is None or after is None:
+        return "n/a"
+    return f"{(after - before) * 100:+.1f} pp"
+
+
+def parse_threshold(text: str) -> Tuple[str, float]:
+    """``METRIC=PCT`` from the command line."""
+
+    name, separator, value = text.partition("=")
+    if not separator or not name.strip():
+        raise ValueError(f"Expected METRIC=PCT, got {text!r}")
+    return name.strip(), float(value)
+
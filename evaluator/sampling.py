@@ -0,0 +1,348 @@
+"""``--sample``: stratified random sampling with early stopping for quick accuracy estimates.
+
+Test cases are grouped into strata by expected type, by which expected fields are
+present, and by whether they need AI. AI use comes from each test's most recent result
+in the run history; tests the history has not seen form their own group. Cases are
+drawn in rounds. The first round takes at least one case from every stratum. Later
+rounds go where they shrink the variance most: large strata with uncertain pass rates
+(Neyman allocation). After each round, the overall and per-field accuracy of every run
+is estimated with a stratified confidence interval. Sampling stops when every interval
+is narrower than the target, when the next round would overrun the time budget, or
+when the suite is exhausted.
+
+Estimates weight each stratum by its share of the suite and apply a finite-population
+correction, so an exhausted stratum contributes no uncertainty. The interval is a
+normal approximation. Within each stratum the pass rate is smoothed with one pass and
+one failure (Laplace), so a stratum that has passed every draw still counts as
+uncertain.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Callable, Collection, Dict, Iterable, List, Mapping, MutableMapping, Optional, Tuple
+
+import evaluate
+from evaluate import FIELD_SPECS, TestCase, TestComparison, TestExecutionResult
+
+STOP_WIDTH = "target width reached"
+STOP_EXHAUSTED = "suite exhausted"
+STOP_BUDGET = "time budget reached"
+
+
+@dataclass
+class SampleSettings:
+    ci_width: float = 0.10
+    confidence: float = 0.95
+    round_size: int = 20
+    time_budget_s: Optional[float] = None
+    seed: int = 0
+
+
+@dataclass
+class Interval:
+    estimate: Optional[float]
+    low: Optional[float]
+    high: Optional[float]
+    samples: int
+
+    @property
+    def width(self) -> float:
+        return self.high - self.low if self.low is not None and self.high is not None else math.inf
+
+
+@dataclass
+class SampleEstimate:
+    """Stratified accuracy estimates for one run, shown in its summary."""
+
+    sampled: int
+    population: int
+    strata: int
+    rounds: int
+    confidence: float
+    overall: Interval
+    fields: MutableMapping[str, Interval]
+    stop_reason: Optional[str] = None
+
+
+@dataclass
+class RunTally:
+    """Pass counts of one run so far, per stratum; estimates are computed from these."""
+
+    sampled: int = 0
+    # Stratum label -> [passed, drawn].
+    overall: MutableMapping[str, List[int]] = field(default_factory=dict)
+    # Field -> stratum label -> [matched, drawn with the field expected].
+    fields: MutableMapping[str, MutableMapping[str, List[int]]] = field(default_factory=dict)
+
+
+@dataclass
+class Stratum:
+    label: str
+    pending: List[str]
+    population: int
+    # Population counts of the cases in this stratum with each field expected.
+    field_population: MutableMapping[str, int] = field(default_factory=dict)
+    drawn: int = 0
+
+
+def stratum_label(case: TestCase, ai_use: Optional[bool]) -> str:
+    present = [
+        name
+        for name, expected, *_ in FIELD_SPECS
+        if name != "type" and (expected(case) if name == "tags" else expected(case) is not None)
+    ]
+    ai = "unseen" if ai_use is None else ("AI" if ai_use else "heuristic")
+    return f"{case.expected_type or 'no type'} / {ai} / {'+'.join(present) or 'no fields'}"
+
+
+class StratifiedSampler:
+    """Draws rounds of test IDs and estimates accuracy from what has been run so far."""
+
+    def __init__(
+        self,
+        cases: Iterable[TestCase],
+        settings: SampleSettings,
+        *,
+        ai_use: Optional[Mapping[str, bool]] = None,
+    ) -> None:
+        self.settings = settings
+        self.z = NormalDist().inv_cdf(0.5 + settings.confidence / 2)
+        self.population = 0
+        self.rounds = 0
+        self.stop_reason: Optional[str] = None
+        # Fields scored as informational; they are reported but do not gate stopping.
+        self.informational: set[str] = set()
+        self.case_strata: Dict[str, Stratum] = {}
+        self.strata: Dict[str, Stratum] = {}
+        rng = random.Random(settings.seed)
+        for case in cases:
+            label = stratum_label(case, (ai_use or {}).get(case.identifier))
+            stratum = self.strata.setdefault(label, Stratum(label, [], 0))
+            stratum.pending.append(case.identifier)
+            stratum.population += 1
+            for name, expected, *_ in FIELD_SPECS:
+                if expected(case) is not None:
+                    stratum.field_population[name] = stratum.field_population.get(name, 0) + 1
+            self.case_strata[case.identifier] = stratum
+            self.population += 1
+        for stratum in self.strata.values():
+            # Draw order is fixed by the seed, so resuming a sampled run redraws the same cases.
+            rng.shuffle(stratum.pending)
+
+    @property
+    def sampled(self) -> int:
+        return sum(stratum.drawn for stratum in self.strata.values())
+
+    def mark_drawn(self, case_ids: Collection[str]) -> None:
+        """Count cases that were already run, e.g. by an interrupted sampled run."""
+
+        ids = set(case_ids)
+        for stratum in self.strata.values():
+            remaining = [case_id for case_id in stratum.pending if case_id not in ids]
+            stratum.drawn += len(stratum.pending) - len(remaining)
+            stratum.pending = remaining
+
+    def draw(self, runs: Collection[RunTally]) -> List[str]:
+        """Next round of test IDs, allocated where they reduce the overall variance most."""
+
+        size = max(self.settings.round_size, sum(1 for s in self.strata.values() if not s.drawn and s.pending))
+        spread = self._pass_spread(runs)
+        planned = {label: stratum.drawn for label, stratum in self.strata.items()}
+        heap = [
+            (-self._gain(stratum, planned[label], spread.get(label, 0.5)), label)
+            for label, stratum in self.strata.items()
+            if stratum.pending
+        ]
+        heapq.heapify(heap)
+        picks: List[str] = []
+        while heap and len(picks) < size:
+            _, label = heapq.heappop(heap)
+            stratum = self.strata[label]
+            picks.append(stratum.pending[planned[label] - stratum.drawn])
+            planned[label] += 1
+            if planned[label] - stratum.drawn < len(stratum.pending):
+                heapq.heappush(heap, (-self._gain(stratum, planned[label], spread.get(label, 0.5)), label))
+        self.mark_drawn(picks)
+        self.rounds += 1
+        return picks
+
+    def _gain(self, stratum: Stratum, drawn: int, spread: float) -> float:
+        if drawn == 0:
+            return math.inf
+        weight = stratum.population / self.population
+        return weight * weight * spread * spread * (1 / drawn - 1 / (drawn + 1))
+
+    def _pass_spread(self, runs: Collection[RunTally]) -> Dict[str, float]:
+        """Largest smoothed pass-rate standard deviation of each stratum across runs."""
+
+        spread: Dict[str, float] = {}
+        for tally in runs:
+            for label, (passed, total) in tally.overall.items():
+                rate = (passed + 1) / (total + 2)
+                spread[label] = max(spread.get(label, 0.0), math.sqrt(rate * (1 - rate)))
+        return spread
+
+    def tally(self, comparisons: Iterable[TestComparison], into: Optional[RunTally] = None) -> RunTally:
+        """Add ``comparisons`` to the pass counts in ``into`` (a fresh tally by default)."""
+
+        tally = into if into is not None else RunTally()
+        for comparison in comparisons:
+            tally.sampled += 1
+            stratum = self.case_strata.get(comparison.execution.case.identifier)
+            if stratum is None:
+                continue
+            bucket = tally.overall.setdefault(stratum.label, [0, 0])
+            bucket[0] += int(comparison.overall_match)
+            bucket[1] += 1
+            for result in comparison.field_results:
+                if result.informational:
+                    self.informational.add(result.field)
+                if result.expected is None:
+                    continue
+                counts = tally.fields.setdefault(result.field, {}).setdefault(stratum.label, [0, 0])
+                counts[0] += int(result.match)
+                counts[1] += 1
+        return tally
+
+    def estimate(self, comparisons: Iterable[TestComparison]) -> SampleEstimate:
+        """Stratified overall and per-field accuracy, with confidence intervals, for one run."""
+
+        return self.estimate_tally(self.tally(comparisons))
+
+    def estimate_tally(self, tally: RunTally) -> SampleEstimate:
+        """``estimate`` from pass counts already gathered with ``tally``."""
+
+        fields: MutableMapping[str, Interval] = {}
+        for name, *_ in FIELD_SPECS:
+            populations = {label: stratum.field_population.get(name, 0) for label, stratum in self.strata.items()}
+            if any(populations.values()):
+                fields[name] = self._interval(tally.fields.get(name, {}), populations)
+        return SampleEstimate(
+            sampled=tally.sampled,
+            population=self.population,
+            strata=len(self.strata),
+            rounds=self.rounds,
+            confidence=self.settings.confidence,
+            overall=self._interval(tally.overall, {label: s.population for label, s in self.strata.items()}),
+            fields=fields,
+            stop_reason=self.stop_reason,
+        )
+
+    def _interval(self, counts: Mapping[str, List[int]], populations: Mapping[str, int]) -> Interval:
+        total = sum(populations.values())
+        estimate = 0.0
+        variance = 0.0
+        samples = 0
+        for label, population in populations.items():
+            if not population:
+                continue
+            matched, drawn = counts.get(label, (0, 0))
+            weight = population / total
+            if not drawn:
+                # Not sampled yet: nothing to estimate from, so the interval stays open.
+                return Interval(None, None, None, sum(n for _, n in counts.values()))
+            samples += drawn
+            estimate += weight * matched / drawn
+            rate = (matched + 1) / (drawn + 2)
+            variance += weight * weight * max(0.0, 1 - drawn / population) * rate * (1 - rate) / drawn
+        half = self.z * math.sqrt(variance)
+        return Interval(estimate, max(0.0, estimate - half), min(1.0, estimate + half), samples)
+
+    def converged(self, estimate: SampleEstimate) -> bool:
+        gated = [estimate.overall] + [
+            interval for name, interval in estimate.fields.items() if name not in self.informational
+        ]
+        return all(interval.width <= self.settings.ci_width for interval in gated)
+
+    def run(
+        self,
+        execute: Callable[[List[str]], Mapping[Tuple[str, str], Iterable[TestExecutionResult]]],
+        completed: Optional[Mapping[Tuple[str, str], Iterable[TestExecutionResult]]] = None,
+    ) -> str:
+        """Execute rounds until a stop condition holds; returns the reason.
+
+        ``execute(case_ids)`` runs one round and returns its results by ``(model,
+        prompt mode)``. ``completed`` holds results already logged by a resumed run.
+        Only pass counts are kept between rounds, not the results themselves.
+        """
+
+        runs: MutableMapping[Tuple[str, str], RunTally] = {}
+        for key, executions in (completed or {}).items():
+            drawn: List[str] = []
+            for execution in executions:
+                drawn.append(execution.case.identifier)
+                self.tally([evaluate.compare_result(execution)], into=runs.setdefault(key, RunTally()))
+            self.mark_drawn(drawn)
+        started = time.perf_counter()
+        last_round_s = 0.0
+        while True:
+            # Checked first: once every case is drawn the intervals close, which would read as converged.
+            if not any(stratum.pending for stratum in self.strata.values()):
+                self.stop_reason = STOP_EXHAUSTED
+                break
+            if runs and all(self.converged(self.estimate_tally(tally)) for tally in runs.values()):
+                self.stop_reason = STOP_WIDTH
+                break
+            budget = self.settings.time_budget_s
+            if budget is not None and self.rounds and time.perf_counter() - started + last_round_s > budget:
+                self.stop_reason = STOP_BUDGET
+                break
+            round_started = time.perf_counter()
+            batch = self.draw(list(runs.values()))
+            for key, executions in execute(batch).items():
+                self.tally(map(evaluate.compare_result, executions), into=runs.setdefault(key, RunTally()))
+            last_round_s = time.perf_counter() - round_started
+            accuracy = ", ".join(
+                format_interval(self.estimate_tally(tally).overall)
+                + (f" ({evaluate.model_label(model)}, {mode})" if len(runs) > 1 else "")
+                for (model, mode), tally in runs.items()
+            )
+            print(f"Sample round {self.rounds}: {self.sampled}/{self.population} case(s), accuracy {accuracy}")
+        return self.stop_reason
+
+
+def format_interval(interval: Interval) -> str:
+    if interval.estimate is None:
+        return "n/a"
+    if interval.low is None or interval.high is None:
+        return f"{interval.estimate * 100:.1f}%"
+    return f"{interval.estimate * 100:.1f}% [{interval.low * 100:.1f}–{interval.high * 100:.1f}%]"
+
+
+class ResidentModels:
+    """``model_factory`` that keeps each model loaded across sampling rounds.
+
+    ``run_matrix`` loads and closes its models on every call; between rounds that
+    would reload them each time. Call ``close`` once sampling is done.
+    """
+
+    def __init__(self, factory: Callable[[str], Any]) -> None:
+        self.factory = factory
+        self.models: MutableMapping[str, _ResidentModel] = {}
+
+    def __call__(self, model_name: str) -> Any:
+        if model_name not in self.models:
+            self.models[model_name] = _ResidentModel(self.factory(model_name))
+        return self.models[model_name]
+
+    def close(self) -> None:
+        for resident in self.models.values():
+            resident.model.close()
+        self.models.clear()
+
+
+class _ResidentModel:
+    def __init__(self, model: Any) -> None:
+        self.model = model
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+    def close(self) -> None:
+        """Kept open for the next round; see ``ResidentModels.close``."""
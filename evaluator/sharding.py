@@ -0,0 +1,141 @@
+"""Partial results for ``--shard`` runs and the ``evaluate.py merge`` subcommand."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Mapping, MutableMapping, Optional, Sequence
+
+import evaluate
+
+PARTIAL_VERSION = 1
+
+
+def write_partial_result(
+    matrix: Mapping[tuple[str, str], List["evaluate.TestExecutionResult"]],
+    *,
+    shard: tuple[int, int],
+    case_order: Sequence[str],
+    model_names: Sequence[str],
+    prompt_modes: Sequence[str],
+    output_dir: Optional[Path] = None,
+) -> Path:
+    """Write one shard's executions as JSON for a later merge.
+
+    ``case_order`` is the full, unsharded list of selected test IDs; merge uses it to put
+    executions back in the order a single-process run would have produced.
+    """
+
+    index, count = shard
+    payload = {
+        "version": PARTIAL_VERSION,
+        "shard": {"index": index, "count": count},
+        "case_order": list(case_order),
+        "models": list(model_names),
+        "prompt_modes": list(prompt_modes),
+        "runs": [
+            {
+                "model": model_name,
+                "prompt_mode": mode,
+                "executions": [evaluate.execution_to_json(execution) for execution in executions],
+            }
+            for (model_name, mode), executions in matrix.items()
+        ],
+    }
+    target_dir = output_dir or evaluate.RESULTS_DIR
+    target_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = target_dir / f"{timestamp}_shard{index}of{count}.json"
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+    return path
+
+
+def merge_partial_results(
+    paths: Sequence[Path],
+) -> tuple[MutableMapping[tuple[str, str], List["evaluate.TestExecutionResult"]], List[str], List[str]]:
+    """Combine shard files into one result matrix in unsharded case order.
+
+    Raises ValueError when the files disagree on the run layout, or when a shard is
+    missing or duplicated.
+    """
+
+    partials: List[Mapping[str, Any]] = []
+    for path in paths:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != PARTIAL_VERSION:
+            raise ValueError(f"{path}: unsupported partial result version {data.get('version')!r}")
+        partials.append(data)
+    if not partials:
+        raise ValueError("No partial results supplied.")
+
+    first = partials[0]
+    count = first["shard"]["count"]
+    for path, data in zip(paths, partials):
+        for key in ("case_order", "models", "prompt_modes"):
+            if data[key] != first[key]:
+                raise ValueError(f"{path}: '{key}' differs from {paths[0]}; shards come from different runs.")
+        if data["shard"]["count"] != count:
+            raise ValueError(f"{path}: shard count {data['shard']['count']} does not match {count}.")
+    indices = sorted(data["shard"]["index"] for data in partials)
+    if indices != list(range(1, count + 1)):
+        raise ValueError(f"Expected shards 1..{count} exactly once, got {indices}.")
+
+    position = {}
+    for offset, identifier in enumerate(first["case_order"]):
+        position.setdefault(identifier, offset)
+
+    matrix: MutableMapping[tuple[str, str], List[evaluate.TestExecutionResult]] = {}
+    for model_name in first["models"]:
+        for mode in first["prompt_modes"]:
+            matrix[(model_name, mode)] = []
+    for data in sorted(partials, key=lambda item: item["shard"]["index"]):
+        for run in data["runs"]:
+            matrix[(run["model"], run["prompt_mode"])].extend(
+                evaluate.execution_from_json(execution) for execution in run["executions"]
+            )
+    for executions in matrix.values():
+        executions.sort(key=lambda execution: position.get(execution.case.identifier, len(position)))
+    return matrix, list(first["models"]), list(first["prompt_modes"])
+
+
+def parse_merge_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="evaluate.py merge",
+        description="Combine --shard partial results into the usual markdown reports.",
+    )
+    parser.add_argument("partials", nargs="+", type=Path, help="Partial result files, one per shard.")
+    parser.add_argument(
+        "--results-dir",
+        type=Path,
+        default=evaluate.RESULTS_DIR,
+        help="Directory to write markdown reports (defaults to evaluator/results/).",
+    )
+    evaluate.add_report_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover - CLI entrypoint
+    args = parse_merge_args(argv)
+    try:
+        matrix, model_names, prompt_modes = merge_partial_results(args.partials)
+    except FileNotFoundError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(2) from exc
+    except (ValueError, KeyError, json.JSONDecodeError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(3) from exc
+
+    if not any(matrix.values()):
+        print("No test cases found in the partial results.", file=sys.stderr)
+        raise SystemExit(4)
+
+    evaluate.report_runs(
+        matrix,
+        model_names=model_names,
+        prompt_modes=prompt_modes,
+        results_dir=args.results_dir,
+        report_options=evaluate.report_options_from_args(args),
+    )
@@ -0,0 +1,142 @@
+"""Constant-memory accumulators for streaming evaluation metrics."""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Mapping, Optional
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+
+class ExactSum:
+    """Running float sum with no rounding error (Shewchuk's algorithm, as in ``math.fsum``).
+
+    The result does not depend on the order values were added, so totals from merged
+    shards or resumed runs agree exactly with a single pass.
+    """
+
+    def __init__(self) -> None:
+        self._partials: List[float] = []
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self._absorb(float(value))
+
+    def merge(self, other: "ExactSum") -> None:
+        for partial in other._partials:
+            self._absorb(partial)
+        self.count += other.count
+
+    def _absorb(self, x: float) -> None:
+        partials: List[float] = []
+        for y in self._partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            high = x + y
+            low = y - (high - x)
+            if low:
+                partials.append(low)
+            x = high
+        partials.append(x)
+        self._partials = partials
+
+    @property
+    def total(self) -> float:
+        return math.fsum(self._partials)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+
+class QuantileSketch:
+    """Log-bucketed histogram giving quantiles within a fixed relative error.
+
+    Positive values land in buckets whose bounds grow by ``gamma``. Any reported
+    quantile is within ``relative_accuracy`` of a true sample value. Memory depends on
+    the value range, not on how many values were added. Zero and negative values are
+    counted in a single bucket reported as 0.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        self.count += 1
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        if value <= 0:
+            self._zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+
+    @property
+    def log_gamma(self) -> float:
+        """Bucket width in log space; value ``v > 0`` lands in ``ceil(log(v) / log_gamma)``."""
+
+        return self._log_gamma
+
+    def add_bucket_counts(
+        self,
+        counts: Mapping[int, int],
+        *,
+        zero_count: int = 0,
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None,
+    ) -> None:
+        """Add values already bucketed by the caller, e.g. with vectorized numpy."""
+
+        for key, count in counts.items():
+            self._buckets[int(key)] = self._buckets.get(int(key), 0) + int(count)
+        self._zero_count += zero_count
+        self.count += sum(int(count) for count in counts.values()) + zero_count
+        for bound in (minimum, maximum):
+            if bound is not None:
+                self.minimum = bound if self.minimum is None else min(self.minimum, bound)
+                self.maximum = bound if self.maximum is None else max(self.maximum, bound)
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy.")
+        for key, count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + count
+        self._zero_count += other._zero_count
+        self.count += other.count
+        for bound in (other.minimum, other.maximum):
+            if bound is not None:
+                self.minimum = bound if self.minimum is None else min(self.minimum, bound)
+                self.maximum = bound if self.maximum is None else max(self.maximum, bound)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the value at quantile ``q`` (0-1), or ``None`` when empty."""
+
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.minimum
+        if q >= 1:
+            return self.maximum
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if rank < seen:
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.minimum), self.maximum)
+        return self.maximum
@@ -0,0 +1,112 @@
+"""Compiled SQLite test suites written by ``evaluate.py compile-suite``.
+
+A compiled suite stores the same normalized columns as the markdown table, one row per
+case, with an index on the test ID. Lookups by ID use the index instead of a scan, and
+iteration streams rows from the cursor so memory stays flat for very large suites.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Collection, Iterable, Iterator, Mapping, MutableMapping, Optional, Tuple
+
+SUITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+SUITE_COLUMNS = (
+    "id",
+    "input",
+    "amount",
+    "merchant",
+    "description",
+    "type",
+    "category",
+    "tags",
+    "date",
+    "account",
+    "split_overall",
+    "reference_date",
+)
+INSERT_BATCH_SIZE = 1000
+# SQLite's default limit on bound parameters per statement is 999 on older builds.
+LOOKUP_BATCH_SIZE = 900
+
+
+def is_compiled_suite(path: Path) -> bool:
+    return path.suffix.lower() in SUITE_SUFFIXES
+
+
+def write_suite(path: Path, rows: Iterable[Tuple[int, Mapping[str, str]]]) -> int:
+    """Write ``(line_number, row)`` pairs to a fresh suite file and return the row count."""
+
+    if path.exists():
+        path.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    columns = ", ".join(f"{column} TEXT" for column in SUITE_COLUMNS)
+    placeholders = ", ".join("?" for _ in range(len(SUITE_COLUMNS) + 1))
+    count = 0
+    with closing(sqlite3.connect(path)) as connection:
+        connection.execute(
+            f"CREATE TABLE cases (position INTEGER PRIMARY KEY, line_number INTEGER, {columns})"
+        )
+        batch = []
+        for line_number, row in rows:
+            batch.append((line_number, *(row.get(column) for column in SUITE_COLUMNS)))
+            if len(batch) >= INSERT_BATCH_SIZE:
+                connection.executemany(
+                    f"INSERT INTO cases (line_number, {', '.join(SUITE_COLUMNS)}) VALUES ({placeholders})",
+                    batch,
+                )
+                count += len(batch)
+                batch.clear()
+        if batch:
+            connection.executemany(
+                f"INSERT INTO cases (line_number, {', '.join(SUITE_COLUMNS)}) VALUES ({placeholders})",
+                batch,
+            )
+            count += len(batch)
+        connection.execute("CREATE INDEX cases_id ON cases (id)")
+        connection.commit()
+    return count
+
+
+def iter_suite_rows(
+    path: Path,
+    only_ids: Optional[Collection[str]] = None,
+) -> Iterator[Tuple[int, MutableMapping[str, str]]]:
+    """Stream ``(line_number, row)`` pairs in suite order, optionally only for ``only_ids``."""
+
+    select = f"SELECT line_number, {', '.join(SUITE_COLUMNS)} FROM cases"
+    if not path.exists():
+        raise FileNotFoundError(f"compiled suite not found: {path}")
+    with closing(sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)) as connection:
+        if only_ids is None:
+            cursor = connection.execute(f"{select} ORDER BY position")
+            for record in cursor:
+                yield _row(record)
+            return
+        # Only the matching positions are gathered; rows are then read back in suite order
+        # a batch at a time, so a long ID list does not pull every row into memory at once.
+        ids = list(dict.fromkeys(only_ids))
+        positions = []
+        for start in range(0, len(ids), LOOKUP_BATCH_SIZE):
+            chunk = ids[start : start + LOOKUP_BATCH_SIZE]
+            cursor = connection.execute(
+                f"SELECT position FROM cases WHERE id IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            )
+            positions.extend(position for (position,) in cursor)
+        positions.sort()
+        for start in range(0, len(positions), LOOKUP_BATCH_SIZE):
+            chunk = positions[start : start + LOOKUP_BATCH_SIZE]
+            cursor = connection.execute(
+                f"{select} WHERE position IN ({', '.join('?' for _ in chunk)}) ORDER BY position",
+                chunk,
+            )
+            for record in cursor.fetchall():
+                yield _row(record)
+
+
+def _row(record: Tuple) -> Tuple[int, MutableMapping[str, str]]:
+    line_number, *values = record
+    return line_number, {column: value for column, value in zip(SUITE_COLUMNS, values) if value is not None}
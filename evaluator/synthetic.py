@@ -0,0 +1,310 @@
+"""Seeded synthetic test-suite generator behind ``evaluate.py generate-suite``.
+
+Utterances are built from templates over the config vocabulary (categories, accounts,
+tags and recent merchants), so expected values are known exactly. Relative dates are
+anchored with the ``reference_date`` column, which the evaluator passes to the CLI as
+the default date.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Iterator, List, Mapping, Optional, Sequence, TextIO
+
+import evaluate
+from evaluate import TestCase
+
+DEFAULT_MERCHANTS = (
+    "Starbucks",
+    "Trader Joe's",
+    "Target",
+    "Chipotle",
+    "Shell",
+    "Whole Foods",
+    "Amazon",
+    "Costco",
+    "Walgreens",
+    "Home Depot",
+)
+DEFAULT_EXPENSE_CATEGORIES = ("Groceries", "Dining", "Transportation", "Shopping", "Utilities")
+DEFAULT_INCOME_CATEGORIES = ("Salary", "Bonus", "Interest")
+DEFAULT_ACCOUNTS = ("Chase Sapphire", "Amex Gold", "Checking")
+DEFAULT_TAGS = ("work", "travel", "family", "subscription")
+SPLITWISE_TAG = "splitwise"
+REFERENCE_START = date(2025, 1, 1)
+
+KIND_WEIGHTS = (
+    ("expense", 5),
+    ("spelled", 2),
+    ("split", 2),
+    ("income", 1),
+    ("transfer", 1),
+)
+ONES = (
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+    "ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen",
+    "seventeen", "eighteen", "nineteen",
+)
+TENS = ("", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety")
+MARKDOWN_COLUMNS = (
+    ("id", "ID"),
+    ("input", "Input"),
+    ("amount", "Amount"),
+    ("merchant", "Merchant"),
+    ("description", "Description"),
+    ("type", "Type"),
+    ("category", "Category"),
+    ("tags", "Tags"),
+    ("date", "Date"),
+    ("account", "Account"),
+    ("split_overall", "Split Overall"),
+    ("reference_date", "Reference Date"),
+)
+
+
+def number_to_words(value: int) -> str:
+    """Spell out 0-999 the way people say amounts aloud."""
+
+    if value < 20:
+        return ONES[value]
+    if value < 100:
+        tens, ones = divmod(value, 10)
+        return TENS[tens] if not ones else f"{TENS[tens]} {ONES[ones]}"
+    hundreds, rest = divmod(value, 100)
+    spoken = f"{ONES[hundreds]} hundred"
+    return spoken if not rest else f"{spoken} {number_to_words(rest)}"
+
+
+class SuiteGenerator:
+    """Produce reproducible synthetic cases for one seed and vocabulary."""
+
+    def __init__(self, context: Mapping[str, Any], *, seed: int = 0) -> None:
+        self.random = random.Random(seed)
+        self.merchants = list(context.get("recentMerchants") or DEFAULT_MERCHANTS)
+        self.expense_categories = list(context.get("allowedExpenseCategories") or DEFAULT_EXPENSE_CATEGORIES)
+        self.income_categories = list(context.get("allowedIncomeCategories") or DEFAULT_INCOME_CATEGORIES)
+        self.accounts = list(context.get("allowedAccounts") or DEFAULT_ACCOUNTS)
+        tags = list(context.get("allowedTags") or DEFAULT_TAGS)
+        self.splitwise_tag = next((tag for tag in tags if tag.casefold() == SPLITWISE_TAG), SPLITWISE_TAG)
+        self.tags = [tag for tag in tags if tag.casefold() != SPLITWISE_TAG] or list(DEFAULT_TAGS)
+        self.kinds = [kind for kind, _ in KIND_WEIGHTS]
+        self.weights = [weight for _, weight in KIND_WEIGHTS]
+
+    def generate(self, count: int, *, prefix: str = "syn") -> Iterator[TestCase]:
+        width = max(4, len(str(count)))
+        for index in range(1, count + 1):
+            kind = self.random.choices(self.kinds, self.weights)[0]
+            yield getattr(self, f"_{kind}")(f"{prefix}-{index:0{width}d}")
+
+    def _amount(self, low: int = 100, high: int = 20000) -> Decimal:
+        return Decimal(self.random.randint(low, high)) / 100
+
+    def _spoken_amount(self, amount: Decimal) -> str:
+        return self.random.choice((f"{amount}", f"${amount}", f"{amount} dollars"))
+
+    def _reference_date(self) -> date:
+        return REFERENCE_START + timedelta(days=self.random.randint(0, 364))
+
+    def _date_clause(self, reference: date) -> tuple[str, date]:
+        style = self.random.choice(("none", "today", "yesterday", "explicit"))
+        if style == "today":
+            return " today", reference
+        if style == "yesterday":
+            return " yesterday", reference - timedelta(days=1)
+        if style == "explicit":
+            spent = reference - timedelta(days=self.random.randint(2, 60))
+            return f" on {spent.strftime('%B')} {spent.day}", spent
+        return "", reference
+
+    def _tag_clause(self) -> tuple[str, List[str]]:
+        count = self.random.choice((0, 0, 1, 2))
+        chosen = self.random.sample(self.tags, min(count, len(self.tags)))
+        if not chosen:
+            return "", []
+        return f", tag it {' and '.join(chosen)}", chosen
+
+    def _account_clause(self) -> tuple[str, Optional[str]]:
+        if self.random.random() < 0.5:
+            return "", None
+        account = self.random.choice(self.accounts)
+        return self.random.choice((f" on my {account}", f" with {account}")), account
+
+    def _expense_case(self, identifier: str, amount: Decimal, spoken: str) -> TestCase:
+        merchant = self.random.choice(self.merchants)
+        category = self.random.choice(self.expense_categories)
+        reference = self._reference_date()
+        date_text, spent = self._date_clause(reference)
+        account_text, account = self._account_clause()
+        tag_text, tags = self._tag_clause()
+        verb = self.random.choice(("Spent", "Paid", "I spent"))
+        utterance = f"{verb} {spoken} at {merchant} for {category.lower()}{account_text}{date_text}{tag_text}"
+        return TestCase(
+            identifier=identifier,
+            utterance=utterance,
+            expected_amount=amount,
+            expected_merchant=merchant,
+            expected_description=None,
+            expected_type="Expense",
+            expected_category=category,
+            expected_tags=tags,
+            expected_date=spent,
+            expected_account=account,
+            expected_split_overall=None,
+            reference_date=reference,
+        )
+
+    def _expense(self, identifier: str) -> TestCase:
+        amount = self._amount()
+        return self._expense_case(identifier, amount, self._spoken_amount(amount))
+
+    def _spelled(self, identifier: str) -> TestCase:
+        dollars = self.random.randint(1, 199)
+        cents = self.random.choice((0, self.random.randint(1, 99)))
+        spoken = f"{number_to_words(dollars)} dollar{'s' if dollars != 1 else ''}"
+        if cents:
+            spoken += f" and {number_to_words(cents)} cent{'s' if cents != 1 else ''}"
+        return self._expense_case(identifier, Decimal(dollars * 100 + cents) / 100, spoken)
+
+    def _split(self, identifier: str) -> TestCase:
+        merchant = self.random.choice(self.merchants)
+        category = self.random.choice(self.expense_categories)
+        overall = self._amount(2000, 30000)
+        people = self.random.randint(2, 4)
+        share = (overall / people).quantize(Decimal("0.01"))
+        reference = self._reference_date()
+        date_text, spent = self._date_clause(reference)
+        utterance = self.random.choice(
+            (
+                f"Split {overall} overall at {merchant} for {category.lower()}{date_text}, my share is {share}",
+                f"Splitwise {category.lower()} at {merchant}{date_text}, {overall} total charged, I owe {share}",
+            )
+        )
+        return TestCase(
+            identifier=identifier,
+            utterance=utterance,
+            expected_amount=share,
+            expected_merchant=merchant,
+            expected_description=None,
+            expected_type="Expense",
+            expected_category=category,
+            expected_tags=[self.splitwise_tag],
+            expected_date=spent,
+            expected_account=None,
+            expected_split_overall=overall,
+            reference_date=reference,
+        )
+
+    def _income(self, identifier: str) -> TestCase:
+        amount = self._amount(10000, 500000)
+        category = self.random.choice(self.income_categories)
+        reference = self._reference_date()
+        date_text, received = self._date_clause(reference)
+        account_text, account = self._account_clause()
+        utterance = self.random.choice(
+            (
+                f"Got a {category.lower()} deposit of {self._spoken_amount(amount)}{account_text}{date_text}",
+                f"Income {self._spoken_amount(amount)} {category.lower()}{account_text}{date_text}",
+            )
+        )
+        return TestCase(
+            identifier=identifier,
+            utterance=utterance,
+            expected_amount=amount,
+            expected_merchant=None,
+            expected_description=None,
+            expected_type="Income",
+            expected_category=category,
+            expected_tags=[],
+            expected_date=received,
+            expected_account=account,
+            expected_split_overall=None,
+            reference_date=reference,
+        )
+
+    def _transfer(self, identifier: str) -> TestCase:
+        amount = self._amount(1000, 200000)
+        source, target = self.random.sample(self.accounts, 2) if len(self.accounts) > 1 else (self.accounts[0],) * 2
+        reference = self._reference_date()
+        date_text, moved = self._date_clause(reference)
+        utterance = f"Transferred {self._spoken_amount(amount)} from {source} to {target}{date_text}"
+        return TestCase(
+            identifier=identifier,
+            utterance=utterance,
+            expected_amount=amount,
+            expected_merchant=None,
+            expected_description=None,
+            expected_type="Transfer",
+            expected_category=None,
+            expected_tags=[],
+            expected_date=moved,
+            expected_account=None,
+            expected_split_overall=None,
+            reference_date=reference,
+        )
+
+
+def write_jsonl(cases: Iterator[TestCase], handle: TextIO) -> int:
+    count = 0
+    for case in cases:
+        handle.write(json.dumps(evaluate.test_case_to_row(case), ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_markdown(cases: Iterator[TestCase], handle: TextIO) -> int:
+    handle.write("| " + " | ".join(label for _, label in MARKDOWN_COLUMNS) + " |\n")
+    handle.write("|" + "---|" * len(MARKDOWN_COLUMNS) + "\n")
+    count = 0
+    for case in cases:
+        row = evaluate.test_case_to_row(case)
+        cells = [row.get(key, "").replace("|", "/") for key, _ in MARKDOWN_COLUMNS]
+        handle.write("| " + " | ".join(cells) + " |\n")
+        count += 1
+    return count
+
+
+def parse_generate_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="evaluate.py generate-suite",
+        description="Generate a reproducible synthetic test suite from the config vocabulary.",
+    )
+    parser.add_argument("--count", type=int, required=True, help="Number of cases to generate.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed yields the same suite.")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="Suite file to write; .jsonl for JSON lines, anything else for a markdown table.",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=evaluate.CONFIG_FILE,
+        help="config.json supplying categories, accounts and tags (built-in defaults when absent).",
+    )
+    parser.add_argument("--prefix", default="syn", help="Prefix for generated test IDs.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:  # pragma: no cover - CLI entrypoint
+    args = parse_generate_args(argv)
+    if args.count < 1:
+        print("Error: --count must be positive.", file=sys.stderr)
+        raise SystemExit(3)
+
+    generator = SuiteGenerator(evaluate.load_config_context(args.config), seed=args.seed)
+    cases = generator.generate(args.count, prefix=args.prefix)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open("w", encoding="utf-8", newline="\n") as handle:
+        if args.output.suffix.lower() == ".jsonl":
+            written = write_jsonl(cases, handle)
+        else:
+            written = write_markdown(cases, handle)
+    print(f"Wrote {written} synthetic case(s) to {args.output}")
+    raise SystemExit(0)
@@ -0,0 +1,6 @@
+"""The evaluator modules import each other as top-level modules; put them on the path."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,85 @@
+from dataclasses import replace
+
+import columnar
+import evaluate
+from checkpoint import CheckpointLog, read_records
+
+MODEL = "google/gemma-3-1b-it"
+PER_FIELD = evaluate.PROMPT_MODE_PER_FIELD
+COALESCED = evaluate.PROMPT_MODE_COALESCED
+
+
+def execution_record(execution, mode=PER_FIELD, status=None):
+    if status is not None:
+        execution = replace(execution, status=status)
+    return {
+        "type": "execution",
+        "model": MODEL,
+        "prompt_mode": mode,
+        "execution": evaluate.execution_to_json(execution),
+    }
+
+
+def test_torn_tail_is_skipped_and_terminated(tmp_path):
+    path = tmp_path / "run.jsonl"
+    with CheckpointLog(path) as log:
+        log.append({"type": "run", "run_id": "r1"})
+        log.append({"n": 1})
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write('{"n": 2, "torn')  # a crash mid-write
+
+    assert [record.get("n") for record in read_records(path)] == [None, 1]
+
+    with CheckpointLog(path) as log:
+        log.append({"n": 3})
+    assert [record.get("n") for record in read_records(path)] == [None, 1, 3]
+
+
+def test_read_records_decodes_only_requested_lines(tmp_path):
+    path = tmp_path / "run.jsonl"
+    with CheckpointLog(path, fsync_every=1) as log:
+        for number in range(5):
+            log.append({"n": number})
+    assert [record["n"] for record in read_records(path, lines={1, 3})] == [1, 3]
+
+
+def test_read_run_log_keeps_the_latest_record_per_case(tmp_path):
+    first, second, third = columnar.synthetic_executions(3)
+    path = tmp_path / "run.jsonl"
+    with CheckpointLog(path) as log:
+        log.append({"type": "run", "models": [MODEL], "prompt_modes": [PER_FIELD], "case_order": []})
+        log.append(execution_record(first, status="model_error"))
+        log.append(execution_record(second))
+        log.append(execution_record(first, status="complete"))  # retried on resume
+        log.append(execution_record(third, status="model_error"))
+
+    header, runs = evaluate.read_run_log(path)
+
+    assert header["models"] == [MODEL]
+    run = runs[(MODEL, PER_FIELD)]
+    assert len(run) == 3
+    assert [(e.case.identifier, e.status) for e in run] == [
+        (second.case.identifier, second.status),
+        (first.case.identifier, "complete"),
+        (third.case.identifier, "model_error"),
+    ]
+    assert [e.case.identifier for e in run.executions({first.case.identifier})] == [first.case.identifier]
+
+
+def test_completed_case_ids_retries_model_errors_and_needs_every_run(tmp_path):
+    first, second, third = columnar.synthetic_executions(3)
+    path = tmp_path / "run.jsonl"
+    with CheckpointLog(path) as log:
+        log.append({"type": "run", "models": [MODEL], "prompt_modes": [PER_FIELD, COALESCED]})
+        for execution in (first, second, third):
+            log.append(execution_record(execution, PER_FIELD, status="complete"))
+        log.append(execution_record(first, COALESCED, status="complete"))
+        log.append(execution_record(second, COALESCED, status="model_error"))
+
+    _, runs = evaluate.read_run_log(path)
+
+    # second failed on the model in one mode, third never ran in it.
+    assert evaluate.completed_case_ids(runs, [MODEL], [PER_FIELD, COALESCED]) == {first.case.identifier}
+    assert evaluate.completed_case_ids(runs, [MODEL], [PER_FIELD]) == {
+        execution.case.identifier for execution in (first, second, third)
+    }
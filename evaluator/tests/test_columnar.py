@@ -0,0 +1,59 @@
+from dataclasses import replace
+
+import pytest
+
+import bench
+import columnar
+import evaluate
+from evaluate import FIELD_SPECS
+
+
+def edge_cases(base):
+    """Parser outputs that exercise each matching rule at its boundary."""
+
+    def variant(suffix, **parsed):
+        return replace(
+            base,
+            case=replace(base.case, identifier=f"{base.case.identifier}-{suffix}"),
+            parsed={**(base.parsed or {}), **parsed},
+            status="complete",
+        )
+
+    amount = float(base.case.expected_amount or 0)
+    return [
+        variant("amount-text", amountUsd=f"{amount:.2f}"),
+        variant("amount-cent", amountUsd=round(amount + 0.01, 2)),
+        variant("amount-over", amountUsd=round(amount + 0.02, 2)),
+        variant("merchant-case", merchant=f"  {(base.case.expected_merchant or '').upper()} "),
+        variant("tags-reordered", tags=list(reversed(base.case.expected_tags))),
+        variant("tags-text", tags=", ".join(base.case.expected_tags)),
+        variant("date-bad", userLocalDate="yesterday"),
+        variant("nulls", merchant=None, tags=None, account=None),
+        replace(base, case=replace(base.case, identifier=f"{base.case.identifier}-error"), status="cli_error"),
+    ]
+
+
+@pytest.fixture(scope="module")
+def executions():
+    executions = columnar.synthetic_executions(2000, seed=6)
+    bench.add_prompts(executions, seed=6)
+    passing = next(execution for execution in executions if evaluate.compare_result(execution).overall_match)
+    return executions + edge_cases(passing)
+
+
+def test_compare_frame_agrees_with_compare_result(executions):
+    frame = columnar.compare_frame(columnar.results_frame(executions))
+    comparisons = evaluate.compare_results(executions)
+
+    assert frame["overall_match"].tolist() == [comparison.overall_match for comparison in comparisons]
+    for name, *_ in FIELD_SPECS:
+        results = [
+            next(result for result in comparison.field_results if result.field == name) for comparison in comparisons
+        ]
+        assert frame[f"{name}_match"].tolist() == [result.match for result in results], name
+        assert frame[f"{name}_scored"].tolist() == [result.expected is not None for result in results], name
+
+
+def test_frame_metrics_equal_compute_metrics(executions):
+    frame = columnar.compare_frame(columnar.results_frame(executions))
+    assert columnar.frame_metrics(frame) == evaluate.compute_metrics(evaluate.compare_results(executions))
@@ -0,0 +1,93 @@
+import math
+import random
+
+import pytest
+
+import bench
+import columnar
+import evaluate
+from stats import DEFAULT_RELATIVE_ACCURACY, ExactSum, QuantileSketch
+
+COUNT_FIELDS = (
+    "total_tests",
+    "passed_tests",
+    "per_field_accuracy",
+    "overall_accuracy",
+    "ai_usage_count",
+    "total_ai_calls",
+    "field_samples",
+    "generations",
+)
+
+
+@pytest.fixture(scope="module")
+def comparisons():
+    executions = columnar.synthetic_executions(3000, seed=4)
+    bench.add_prompts(executions, seed=4)
+    return evaluate.compare_results(executions)
+
+
+def test_aggregator_counts_match_the_reference(comparisons):
+    streamed = evaluate.compute_metrics(iter(comparisons))
+    reference = evaluate.compute_metrics_reference(comparisons)
+
+    for name in COUNT_FIELDS:
+        assert getattr(streamed, name) == getattr(reference, name), name
+    assert 0 < streamed.passed_tests < streamed.total_tests
+    for name in ("average_total_ms", "average_stage0_ms", "generation_ms", "average_generation_ms"):
+        assert getattr(streamed, name) == pytest.approx(getattr(reference, name), rel=1e-12), name
+
+
+def test_aggregator_does_not_depend_on_arrival_order(comparisons):
+    shuffled = list(comparisons)
+    random.Random(1).shuffle(shuffled)
+    forward = evaluate.compute_metrics(comparisons)
+    backward = evaluate.compute_metrics(shuffled)
+    assert forward.average_total_ms == backward.average_total_ms
+    assert forward.latency_percentiles == backward.latency_percentiles
+
+
+def test_merged_shard_aggregators_equal_one_pass(comparisons):
+    left = evaluate.MetricsAggregator().extend(comparisons[:1000])
+    left.merge(evaluate.MetricsAggregator().extend(comparisons[1000:]))
+    merged, single = left.result(), evaluate.compute_metrics(comparisons)
+    for name in COUNT_FIELDS + ("average_total_ms", "latency_percentiles"):
+        assert getattr(merged, name) == getattr(single, name), name
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [random.Random(2).lognormvariate(5, 1.5) for _ in range(20000)],
+        [random.Random(3).uniform(0.001, 1e6) for _ in range(5000)],
+        [float(value) for value in range(1, 1001)],
+    ],
+    ids=["lognormal", "wide-uniform", "integers"],
+)
+def test_quantile_sketch_stays_within_its_relative_error(values):
+    sketch = QuantileSketch()
+    sketch.extend(values)
+    ordered = sorted(values)
+    for q in (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999):
+        true = ordered[math.floor(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - true) <= DEFAULT_RELATIVE_ACCURACY * true * (1 + 1e-9), q
+    assert sketch.quantile(0) == ordered[0]
+    assert sketch.quantile(1) == ordered[-1]
+
+
+def test_quantile_sketch_counts_zero_and_negative_values_as_zero():
+    sketch = QuantileSketch()
+    sketch.extend([-3.0, 0.0, 5.0, 5.0])
+    assert sketch.quantile(0.25) == 0.0
+    assert sketch.quantile(0.9) == pytest.approx(5.0, rel=DEFAULT_RELATIVE_ACCURACY)
+    assert sketch.quantile(0) == -3.0
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_exact_sum_is_correctly_rounded():
+    values = [1e16, 1.0, -1e16] * 1000 + [0.1] * 10
+    total = ExactSum()
+    for value in values:
+        total.add(value)
+    assert total.total == math.fsum(values)
+    assert total.mean == math.fsum(values) / len(values)
@@ -0,0 +1,46 @@
+import random
+
+import columnar
+import evaluate
+
+
+class RecordingStreams:
+    def __init__(self):
+        self.written = []
+        self.closed = False
+
+    def add(self, comparison):
+        self.written.append(comparison.execution.case.identifier)
+
+    def close(self):
+        self.closed = True
+
+
+def test_report_writes_cases_in_suite_order_whatever_order_they_finish():
+    executions = columnar.synthetic_executions(200, seed=9)
+    suite_order = [execution.case.identifier for execution in executions]
+    finished = list(executions[:-20])  # the last cases never ran, e.g. outside a sample
+    random.Random(4).shuffle(finished)
+    order = {identifier: position for position, identifier in enumerate(suite_order)}
+    streams = RecordingStreams()
+
+    with evaluate.RunReport("", streams, order) as report:
+        for execution in finished:
+            report.add(execution)
+
+    assert streams.closed
+    assert streams.written == suite_order[:-20]
+    failing = [c.execution.case.identifier for c in evaluate.compare_results(executions[:-20]) if not c.overall_match]
+    assert report.failing == failing
+    assert report.aggregator.result() == evaluate.compute_metrics(evaluate.compare_results(executions[:-20]))
+
+
+def test_report_without_an_order_writes_cases_as_they_finish():
+    executions = columnar.synthetic_executions(20, seed=9)[::-1]
+    streams = RecordingStreams()
+
+    with evaluate.RunReport("", streams) as report:
+        for execution in executions:
+            report.add(execution)
+
+    assert streams.written == [execution.case.identifier for execution in executions]
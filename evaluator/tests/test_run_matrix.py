@@ -0,0 +1,60 @@
+import pytest
+
+import evaluate
+from fakes import FAKE_CLI_JAR, FakeModelInference, fake_cli_command
+from synthetic import SuiteGenerator, write_markdown
+
+MODELS = ["google/gemma-3-1b-it", "google/gemma-3n-E2B-it"]
+CASES = 12
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    """``run_matrix`` over a small synthetic suite with the fake CLI and model, in chunks of 5."""
+
+    suite = tmp_path / "cases.md"
+    with suite.open("w", encoding="utf-8") as handle:
+        write_markdown(SuiteGenerator({}, seed=5).generate(CASES), handle)
+    monkeypatch.setattr(evaluate, "STAGE_CHUNK_SIZE", 5)
+
+    def run(**kwargs):
+        kwargs.setdefault("model_names", MODELS[:1])
+        return evaluate.run_matrix(
+            test_cases_path=suite,
+            config_path=tmp_path / "no-config.json",
+            jar_path=FAKE_CLI_JAR,
+            java_cmd=fake_cli_command("stage1_ms=0,stage2_ms=0"),
+            model_factory=lambda name: FakeModelInference(name, spec="prefill_ms=0,decode_ms=0"),
+            **kwargs,
+        )
+
+    return run
+
+
+def test_results_are_returned_without_a_callback(run):
+    runs = run()
+    assert list(runs) == [(MODELS[0], evaluate.PROMPT_MODE_PER_FIELD)]
+    assert len(runs[(MODELS[0], evaluate.PROMPT_MODE_PER_FIELD)]) == CASES
+
+
+def test_streamed_results_are_not_also_collected(run):
+    seen = []
+    runs = run(
+        model_names=MODELS,
+        prompt_modes=evaluate.PROMPT_MODES,
+        on_result=lambda model, mode, result: seen.append((model, mode, result.case.identifier)),
+    )
+    assert runs == {}
+    assert len(seen) == len(MODELS) * len(evaluate.PROMPT_MODES) * CASES
+    assert len(set(seen)) == len(seen)
+
+
+def test_keep_results_returns_what_the_callback_saw(run):
+    seen = {}
+    runs = run(
+        model_names=MODELS,
+        on_result=lambda model, mode, result: seen.setdefault((model, mode), []).append(result),
+        keep_results=True,
+    )
+    assert runs == seen
+    assert sorted(runs) == [(model, evaluate.PROMPT_MODE_PER_FIELD) for model in MODELS]
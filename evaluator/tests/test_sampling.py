@@ -0,0 +1,102 @@
+import pytest
+
+import columnar
+import evaluate
+from sampling import (
+    STOP_BUDGET,
+    STOP_EXHAUSTED,
+    STOP_WIDTH,
+    SampleSettings,
+    StratifiedSampler,
+)
+
+KEY = ("google/gemma-3-1b-it", evaluate.PROMPT_MODE_PER_FIELD)
+
+
+@pytest.fixture(scope="module")
+def suite():
+    """Synthetic cases and their noisy results, by case ID."""
+
+    executions = columnar.synthetic_executions(1500, seed=8)
+    return [execution.case for execution in executions], {e.case.identifier: e for e in executions}
+
+
+def executor(results, calls):
+    def execute(case_ids):
+        calls.append(list(case_ids))
+        return {KEY: [results[case_id] for case_id in case_ids]}
+
+    return execute
+
+
+def test_small_suite_is_exhausted_and_estimated_exactly(suite):
+    cases, results = suite
+    cases = cases[:40]
+    calls = []
+    sampler = StratifiedSampler(cases, SampleSettings(ci_width=0.0, round_size=10))
+
+    assert sampler.run(executor(results, calls)) == STOP_EXHAUSTED
+
+    drawn = [case_id for batch in calls for case_id in batch]
+    assert sorted(drawn) == sorted(case.identifier for case in cases)
+    estimate = sampler.estimate(evaluate.compare_result(results[case.identifier]) for case in cases)
+    passed = sum(evaluate.compare_result(results[case.identifier]).overall_match for case in cases)
+    # Every stratum is fully drawn, so the finite-population correction closes the interval.
+    assert estimate.overall.estimate == pytest.approx(passed / len(cases))
+    assert estimate.overall.width == pytest.approx(0.0)
+    assert estimate.stop_reason == STOP_EXHAUSTED
+
+
+def test_wide_target_stops_before_the_suite_is_exhausted(suite):
+    cases, results = suite
+    sampler = StratifiedSampler(cases, SampleSettings(ci_width=0.5, round_size=50))
+
+    assert sampler.run(executor(results, [])) == STOP_WIDTH
+    assert 0 < sampler.sampled < sampler.population
+
+
+def test_spent_time_budget_stops_after_the_first_round(suite):
+    cases, results = suite
+    calls = []
+    sampler = StratifiedSampler(cases, SampleSettings(ci_width=0.0, round_size=20, time_budget_s=0))
+
+    assert sampler.run(executor(results, calls)) == STOP_BUDGET
+    assert len(calls) == sampler.rounds == 1
+
+
+def test_first_round_draws_from_every_stratum(suite):
+    cases, _ = suite
+    sampler = StratifiedSampler(cases, SampleSettings(round_size=1))
+
+    picks = sampler.draw([])
+
+    assert len(sampler.strata) > 1
+    assert {sampler.case_strata[case_id].label for case_id in picks} == set(sampler.strata)
+    assert len(set(picks)) == len(picks)
+
+
+def test_tally_accumulates_to_the_same_estimate(suite):
+    cases, results = suite
+    sampler = StratifiedSampler(cases, SampleSettings())
+    comparisons = [evaluate.compare_result(results[case_id]) for case_id in sampler.draw([]) + sampler.draw([])]
+
+    tally = sampler.tally(comparisons[:7])
+    sampler.tally(comparisons[7:], into=tally)
+
+    assert tally.sampled == len(comparisons)
+    assert sampler.estimate_tally(tally) == sampler.estimate(comparisons)
+
+
+def test_resumed_run_does_not_redraw_completed_cases(suite):
+    cases, results = suite
+    cases = cases[:60]
+    settings = SampleSettings(ci_width=0.0, round_size=15, seed=3)
+    completed = [results[case_id] for case_id in StratifiedSampler(cases, settings).draw([])]
+    calls = []
+    sampler = StratifiedSampler(cases, settings)
+
+    assert sampler.run(executor(results, calls), completed={KEY: completed}) == STOP_EXHAUSTED
+
+    drawn = [case_id for batch in calls for case_id in batch]
+    assert not {execution.case.identifier for execution in completed} & set(drawn)
+    assert len(drawn) + len(completed) == len(cases)
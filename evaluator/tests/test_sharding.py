@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+import columnar
+import evaluate
+from sharding import merge_partial_results, write_partial_result
+
+MODEL = "google/gemma-3-1b-it"
+MODE = evaluate.PROMPT_MODE_PER_FIELD
+
+
+def write_shards(tmp_path, executions, count, *, indices=None):
+    case_order = [execution.case.identifier for execution in executions]
+    rng = random.Random(0)
+    paths = []
+    for index in indices or range(1, count + 1):
+        owned = [e for e in executions if evaluate.shard_of(e.case.identifier, count) == index]
+        # Shards log cases in completion order; merge must not depend on it.
+        rng.shuffle(owned)
+        paths.append(
+            write_partial_result(
+                {(MODEL, MODE): owned},
+                shard=(index, count),
+                case_order=case_order,
+                model_names=[MODEL],
+                prompt_modes=[MODE],
+                output_dir=tmp_path / f"shard{len(paths)}",
+            )
+        )
+    return paths
+
+
+def test_shard_of_is_stable_across_processes():
+    # Pinned values: every machine and every interpreter must agree on the partition.
+    pinned = {"t1": 3, "t2": 1, "coffee-01": 1, "syn-0001": 4, "syn-0002": 3}
+    assert {identifier: evaluate.shard_of(identifier, 4) for identifier in pinned} == pinned
+
+
+def test_shard_of_partitions_every_id_once():
+    ids = [f"case-{number}" for number in range(500)]
+    shards = [evaluate.shard_of(identifier, 3) for identifier in ids]
+    assert set(shards) == {1, 2, 3}
+    assert all(evaluate.shard_of(identifier, 1) == 1 for identifier in ids)
+
+
+def test_merge_restores_unsharded_case_order(tmp_path):
+    executions = columnar.synthetic_executions(40, seed=1)
+    paths = write_shards(tmp_path, executions, 3)
+
+    matrix, model_names, prompt_modes = merge_partial_results(list(reversed(paths)))
+
+    assert model_names == [MODEL] and prompt_modes == [MODE]
+    merged = matrix[(MODEL, MODE)]
+    assert [e.case.identifier for e in merged] == [e.case.identifier for e in executions]
+    assert [e.status for e in merged] == [e.status for e in executions]
+
+
+def test_merge_rejects_a_missing_shard(tmp_path):
+    paths = write_shards(tmp_path, columnar.synthetic_executions(20), 3, indices=[1, 3])
+    with pytest.raises(ValueError, match="exactly once"):
+        merge_partial_results(paths)
+
+
+def test_merge_rejects_a_duplicated_shard(tmp_path):
+    paths = write_shards(tmp_path, columnar.synthetic_executions(20), 2, indices=[1, 2, 2])
+    with pytest.raises(ValueError, match="exactly once"):
+        merge_partial_results(paths)
+
+
+def test_merge_rejects_shards_from_different_runs(tmp_path):
+    first = write_shards(tmp_path / "a", columnar.synthetic_executions(20, seed=1), 2, indices=[1])
+    second = write_shards(tmp_path / "b", columnar.synthetic_executions(21, seed=1), 2, indices=[2])
+    with pytest.raises(ValueError, match="different runs"):
+        merge_partial_results(first + second)
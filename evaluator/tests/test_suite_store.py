@@ -0,0 +1,87 @@
+import random
+
+import evaluate
+from suite_store import LOOKUP_BATCH_SIZE, iter_suite_rows, write_suite
+from synthetic import SuiteGenerator
+
+
+def compiled_suite(tmp_path, count):
+    cases = list(SuiteGenerator({}, seed=2).generate(count))
+    path = tmp_path / "suite.sqlite"
+    written = write_suite(path, ((number, evaluate.test_case_to_row(case)) for number, case in enumerate(cases, 1)))
+    assert written == count
+    return path, cases
+
+
+def test_compiled_suite_round_trips_every_case(tmp_path):
+    path, cases = compiled_suite(tmp_path, 50)
+    assert list(evaluate.iter_test_cases(path)) == cases
+
+
+def test_lookup_by_more_ids_than_one_batch_keeps_suite_order(tmp_path):
+    path, cases = compiled_suite(tmp_path, 2500)
+    wanted = [case.identifier for case in cases[::2]]
+    assert len(wanted) > LOOKUP_BATCH_SIZE
+    random.Random(0).shuffle(wanted)
+
+    found = list(evaluate.iter_test_cases(path, set(wanted) | {"not-in-suite"}))
+
+    assert found == cases[::2]
+
+
+def test_lookup_ignores_repeated_ids(tmp_path):
+    path, cases = compiled_suite(tmp_path, 10)
+    ids = [cases[3].identifier, cases[1].identifier, cases[3].identifier]
+    assert [line for line, _ in iter_suite_rows(path, ids)] == [2, 4]
+
+
+def test_selected_cases_stream_in_chunks_and_report_missing_ids(tmp_path, capsys):
+    path, cases = compiled_suite(tmp_path, 25)
+    ids = [case.identifier for case in cases[:12]] + ["missing-id"]
+
+    chunks = list(evaluate.iter_chunks(evaluate.iter_selected_cases(path, ids), 5))
+
+    assert [len(chunk) for chunk in chunks] == [5, 5, 2]
+    assert [case for chunk in chunks for case in chunk] == cases[:12]
+    assert "missing-id" in capsys.readouterr().err
+
+
+def test_stage_one_outcome_survives_the_spool():
+    case, other = SuiteGenerator({}, seed=3).generate(2)
+    first_response = evaluate.CliResponse(
+        data={"status": "needs_ai", "stage1_snapshot": "abc"},
+        stdout="{}",
+        stderr="",
+        returncode=0,
+        timings={"cli_ms": 12.5},
+    )
+    pending = evaluate.PendingStageTwo(
+        case=case,
+        context={"accounts": ["Checking"]},
+        first_response=first_response,
+        prompts=[evaluate.PromptExchange(field="merchant", prompt="Merchant?")],
+        heuristic_results={"amountUsd": 4.5},
+        heuristic_stats=None,
+        stage1_snapshot="abc",
+    )
+    finished = evaluate.TestExecutionResult(
+        case=other,
+        status="complete",
+        parsed={"merchant": "Cafe"},
+        method="heuristic",
+        prompts=[],
+        stats={},
+        heuristic_results=None,
+        heuristic_stats=None,
+        errors=[],
+        ai_calls=0,
+    )
+    outcome = evaluate.StageOneOutcome(results=[None, finished], pending=[(0, pending)])
+
+    with evaluate.StageOneSpool() as spool:
+        spool.append(outcome)
+        spool.append(outcome)
+        replayed = list(spool)
+        assert list(spool) == replayed
+
+    assert replayed == [outcome, outcome]
@@ -0,0 +1,343 @@
+"""Per-case wall-clock phases, CLI child resource usage, and their streaming summary.
+
+``run_process`` stands in for ``subprocess.run`` around the CLI. It times process spawn
+and the child's run separately. On POSIX it also reaps the child with ``os.wait4``, so
+that child's own CPU time and peak RSS are recorded.
+``PhaseAggregator`` folds per-case timings into percentiles and a slowest-cases list
+with bounded memory.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+from stats import ExactSum, QuantileSketch
+
+# Wall-clock phases of one case, in the order they happen. They do not overlap, so
+# their sum is the case's measured wall time.
+WALL_PHASES: Sequence[Tuple[str, str]] = (
+    ("stage1_encode_ms", "Stage 1 JSON encode"),
+    ("stage1_spawn_ms", "Stage 1 process spawn"),
+    ("stage1_cli_ms", "Stage 1 CLI run"),
+    ("stage1_decode_ms", "Stage 1 JSON decode"),
+    ("queue_wait_ms", "Queue wait"),
+    ("generation_ms", "Generation"),
+    ("stage2_encode_ms", "Stage 2 JSON encode"),
+    ("stage2_spawn_ms", "Stage 2 process spawn"),
+    ("stage2_cli_ms", "Stage 2 CLI run"),
+    ("stage2_decode_ms", "Stage 2 JSON decode"),
+)
+# Subsets of a wall phase or non-time resources, summarized but not part of wall time.
+DETAIL_STATS: Sequence[Tuple[str, str]] = (
+    ("stage1_startup_ms", "Stage 1 JVM start + I/O"),
+    ("stage2_startup_ms", "Stage 2 JVM start + I/O"),
+    ("cli_cpu_ms", "CLI CPU time (user + sys)"),
+    ("cli_max_rss_kb", "CLI max RSS"),
+)
+WALL_KEY = "wall_ms"
+PHASE_QUANTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+SLOWEST_CASES = 10
+WAIT_POLL_SECONDS = 0.002
+RSS_POLL_SECONDS = 0.01
+
+
+@dataclass
+class ProcessRun:
+    """Captured output and measurements of one child process."""
+
+    args: Sequence[str]
+    returncode: int
+    stdout: str
+    stderr: str
+    spawn_ms: float
+    run_ms: float
+    cpu_ms: Optional[float] = None
+    max_rss_kb: Optional[float] = None
+
+
+def run_process(args: Sequence[str], input_text: str, *, timeout: float) -> ProcessRun:
+    """Run ``args`` with ``input_text`` on stdin, like ``subprocess.run`` with pipes.
+
+    Raises ``subprocess.TimeoutExpired`` (after killing the child) and
+    ``FileNotFoundError`` as ``subprocess.run`` would. CPU time and max RSS are
+    ``None`` on platforms without ``os.wait4``.
+    """
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        args,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+    )
+    spawned = time.perf_counter()
+    deadline = spawned + timeout
+
+    if not hasattr(os, "wait4"):  # pragma: no cover - Windows
+        try:
+            stdout, stderr = process.communicate(input_text, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            stdout, stderr = process.communicate()
+            raise subprocess.TimeoutExpired(args, timeout, output=stdout, stderr=stderr)
+        return ProcessRun(
+            args=args,
+            returncode=process.returncode,
+            stdout=stdout,
+            stderr=stderr,
+            spawn_ms=(spawned - start) * 1000,
+            run_ms=(time.perf_counter() - spawned) * 1000,
+        )
+
+    # Pump the pipes ourselves so the child is still unreaped when they close, which
+    # lets wait4 return its rusage instead of Popen.wait discarding it.
+    captured: MutableMapping[str, str] = {}
+    pumps = [
+        threading.Thread(target=_feed, args=(process, input_text), daemon=True),
+        threading.Thread(target=_drain, args=(process.stdout, captured, "stdout"), daemon=True),
+        threading.Thread(target=_drain, args=(process.stderr, captured, "stderr"), daemon=True),
+    ]
+    for pump in pumps:
+        pump.start()
+    peak_rss_kb = None
+    while pumps[1].is_alive() and time.perf_counter() < deadline:
+        peak_rss_kb = peak_rss_from_proc(process.pid) or peak_rss_kb
+        pumps[1].join(min(RSS_POLL_SECONDS, max(0.0, deadline - time.perf_counter())))
+    for pump in pumps:
+        pump.join(max(0.0, deadline - time.perf_counter()))
+    if any(pump.is_alive() for pump in pumps):
+        process.kill()
+        for pump in pumps:
+            pump.join()
+        wait_with_usage(process)
+        raise subprocess.TimeoutExpired(
+            args,
+            timeout,
+            output=captured.get("stdout", ""),
+            stderr=captured.get("stderr", ""),
+        )
+
+    returncode, cpu_ms, max_rss_kb = wait_with_usage(process, timeout=max(0.0, deadline - time.perf_counter()))
+    finished = time.perf_counter()
+    return ProcessRun(
+        args=args,
+        returncode=returncode,
+        stdout=captured.get("stdout", ""),
+        stderr=captured.get("stderr", ""),
+        spawn_ms=(spawned - start) * 1000,
+        run_ms=(finished - spawned) * 1000,
+        cpu_ms=cpu_ms,
+        max_rss_kb=peak_rss_kb if peak_rss_kb is not None else max_rss_kb,
+    )
+
+
+def wait_with_usage(
+    process: "subprocess.Popen[Any]",
+    *,
+    timeout: Optional[float] = None,
+) -> Tuple[int, Optional[float], Optional[float]]:
+    """Reap ``process`` and return ``(returncode, cpu_ms, max_rss_kb)``.
+
+    Kills the child if it has not exited within ``timeout`` seconds. Falls back to
+    ``Popen.wait`` (no usage) when ``os.wait4`` is unavailable or the child was
+    already reaped elsewhere.
+    """
+
+    if not hasattr(os, "wait4") or process.returncode is not None:  # pragma: no cover - Windows
+        try:
+            return process.wait(timeout=timeout), None, None
+        except subprocess.TimeoutExpired:
+            process.kill()
+            return process.wait(), None, None
+
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    while True:
+        try:
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        except ChildProcessError:  # pragma: no cover - reaped by someone else
+            return process.wait(), None, None
+        if pid:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            process.kill()
+            deadline = None
+        time.sleep(WAIT_POLL_SECONDS)
+
+    returncode = os.waitstatus_to_exitcode(status)
+    # Tell Popen the child is gone so it does not try to wait for it again.
+    process.returncode = returncode
+    cpu_ms = (usage.ru_utime + usage.ru_stime) * 1000
+    # ru_maxrss is kilobytes on Linux but bytes on macOS.
+    max_rss_kb = usage.ru_maxrss / 1024 if sys.platform == "darwin" else float(usage.ru_maxrss)
+    return returncode, cpu_ms, max_rss_kb
+
+
+def peak_rss_from_proc(pid: int) -> Optional[float]:
+    """``VmHWM`` of a running process in kB, or ``None`` where /proc is unavailable.
+
+    On Linux a child's ``ru_maxrss`` also counts the parent's memory from before
+    ``exec``, which would report the evaluator's (model-sized) footprint for every
+    CLI call. The exec'd image's own high-water mark is read here instead.
+    """
+
+    return _proc_status_kb(pid, "VmHWM:")
+
+
+def rss_from_proc(pid: int) -> Optional[float]:
+    """Current ``VmRSS`` of a process in kB, or ``None`` where /proc is unavailable."""
+
+    return _proc_status_kb(pid, "VmRSS:")
+
+
+def reset_peak_rss() -> bool:
+    """Reset this process's ``VmHWM`` to its current RSS (Linux 4.0+); ``False`` if unsupported."""
+
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as handle:
+            handle.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def _proc_status_kb(pid: int, key: str) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith(key):
+                    return float(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def _feed(process: "subprocess.Popen[str]", input_text: str) -> None:
+    assert process.stdin is not None
+    try:
+        process.stdin.write(input_text)
+        process.stdin.close()
+    except (BrokenPipeError, OSError):
+        pass
+
+
+def _drain(stream: Any, captured: MutableMapping[str, str], key: str) -> None:
+    captured[key] = stream.read()
+    stream.close()
+
+
+def wall_ms(timings: Mapping[str, float]) -> Optional[float]:
+    """Sum of the wall phases recorded for one case, or ``None`` when none were."""
+
+    values = [timings[key] for key, _ in WALL_PHASES if key in timings]
+    return sum(values) if values else None
+
+
+@dataclass
+class PhaseSummary:
+    """Distribution of one phase across the cases that recorded it."""
+
+    count: int
+    total: float
+    mean: float
+    p50: Optional[float]
+    p90: Optional[float]
+    p99: Optional[float]
+    maximum: float
+
+
+@dataclass
+class SlowCase:
+    """One of the slowest cases, with its largest wall phase."""
+
+    identifier: str
+    wall_ms: float
+    dominant_phase: Optional[str]
+    dominant_ms: Optional[float]
+
+
+class PhaseAggregator:
+    """Streaming per-phase distributions plus the ``SLOWEST_CASES`` slowest cases."""
+
+    def __init__(self, slowest: int = SLOWEST_CASES) -> None:
+        keys = [key for key, _ in WALL_PHASES] + [key for key, _ in DETAIL_STATS] + [WALL_KEY]
+        self._sums = {key: ExactSum() for key in keys}
+        self._sketches = {key: QuantileSketch() for key in keys}
+        self._maxima: MutableMapping[str, float] = {}
+        self._slowest = slowest
+        # Min-heap of (wall_ms, -sequence, identifier, timings); ties keep the earlier case.
+        self._heap: List[Tuple[float, int, str, Mapping[str, float]]] = []
+        self._sequence = 0
+
+    def add(self, identifier: str, timings: Mapping[str, float]) -> None:
+        if not timings:
+            return
+        wall = wall_ms(timings)
+        values = dict(timings)
+        if wall is not None:
+            values[WALL_KEY] = wall
+        for key, value in values.items():
+            if key not in self._sums or not isinstance(value, (int, float)):
+                continue
+            self._sums[key].add(value)
+            self._sketches[key].add(value)
+            self._maxima[key] = max(self._maxima.get(key, value), value)
+        if wall is None:
+            return
+        self._sequence += 1
+        entry = (wall, -self._sequence, identifier, dict(timings))
+        if len(self._heap) < self._slowest:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def merge(self, other: "PhaseAggregator") -> None:
+        for key in self._sums:
+            self._sums[key].merge(other._sums[key])
+            self._sketches[key].merge(other._sketches[key])
+            if key in other._maxima:
+                self._maxima[key] = max(self._maxima.get(key, other._maxima[key]), other._maxima[key])
+        for wall, _, identifier, timings in sorted(other._heap, key=lambda entry: -entry[1]):
+            self._sequence += 1
+            entry = (wall, -self._sequence, identifier, timings)
+            if len(self._heap) < self._slowest:
+                heapq.heappush(self._heap, entry)
+            elif entry > self._heap[0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def phases(self) -> MutableMapping[str, PhaseSummary]:
+        summaries: MutableMapping[str, PhaseSummary] = {}
+        for key, total in self._sums.items():
+            if not total.count:
+                continue
+            sketch = self._sketches[key]
+            quantiles = {label: sketch.quantile(q) for label, q in PHASE_QUANTILES}
+            summaries[key] = PhaseSummary(
+                count=total.count,
+                total=total.total,
+                mean=total.mean or 0.0,
+                p50=quantiles["p50"],
+                p90=quantiles["p90"],
+                p99=quantiles["p99"],
+                maximum=self._maxima[key],
+            )
+        return summaries
+
+    def slowest_cases(self) -> List[SlowCase]:
+        cases: List[SlowCase] = []
+        for wall, _, identifier, timings in sorted(self._heap, key=lambda entry: (-entry[0], -entry[1])):
+            recorded = [(timings[key], key) for key, _ in WALL_PHASES if key in timings]
+            dominant_ms, dominant = max(recorded) if recorded else (None, None)
+            cases.append(SlowCase(identifier, wall, dominant, dominant_ms))
+        return cases
+
+
+PHASE_LABELS = dict(WALL_PHASES) | dict(DETAIL_STATS) | {WALL_KEY: "Case wall time"}
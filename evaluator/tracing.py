@@ -0,0 +1,152 @@
+"""Span recording for ``--trace``, written in the Chrome trace event format.
+
+Events are streamed to disk as one JSON array, so long runs do not hold the trace in
+memory. Load the file in ``chrome://tracing`` or https://ui.perfetto.dev. Each span sits
+on a named lane (shown as a thread) so stage 1, generation and stage 2 line up and
+the idle gaps between them stand out.
+
+Instrumented code calls the module-level ``span`` helper, which does nothing unless a
+trace is being recorded.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Iterator, MutableMapping, Optional, TextIO
+
+LANE_ORCHESTRATOR = "Orchestrator"
+LANE_STAGE1 = "Stage 1 CLI"
+LANE_GENERATION = "Generation"
+LANE_STAGE2 = "Stage 2 CLI"
+LANE_INTERACTIVE = "Interactive CLI"
+LANE_REPORT = "Reports"
+# Lanes listed here sort in this order; any others follow in first-use order.
+LANE_ORDER = (LANE_ORCHESTRATOR, LANE_STAGE1, LANE_GENERATION, LANE_STAGE2, LANE_INTERACTIVE, LANE_REPORT)
+
+
+class TraceWriter:
+    """Stream complete (``ph: X``) events and lane metadata to ``path``."""
+
+    def __init__(self, path: Path, *, process_name: str = "evaluate.py") -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle: Optional[TextIO] = path.open("w", encoding="utf-8")
+        self._handle.write("[\n")
+        self._first = True
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._lanes: MutableMapping[str, int] = {}
+        self._emit({"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": process_name}})
+
+    def lane_id(self, lane: str) -> int:
+        """Stable thread ID for ``lane``, announcing it to the viewer on first use."""
+
+        with self._lock:
+            known = self._lanes.get(lane)
+            if known is not None:
+                return known
+            tid = len(self._lanes) + 1
+            self._lanes[lane] = tid
+        sort_index = LANE_ORDER.index(lane) if lane in LANE_ORDER else len(LANE_ORDER) + tid
+        self._emit({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": lane}})
+        self._emit(
+            {"name": "thread_sort_index", "ph": "M", "pid": self._pid, "tid": tid, "args": {"sort_index": sort_index}}
+        )
+        return tid
+
+    @contextmanager
+    def span(self, name: str, *, cat: str, lane: Optional[str] = None, **args: Any) -> Iterator[MutableMapping[str, Any]]:
+        """Record the enclosed block; the yielded dict may gain args before it closes."""
+
+        tid = self.lane_id(lane or threading.current_thread().name)
+        start = time.perf_counter_ns()
+        span_args: MutableMapping[str, Any] = dict(args)
+        try:
+            yield span_args
+        finally:
+            end = time.perf_counter_ns()
+            self._emit(
+                {
+                    "name": name,
+                    "cat": cat,
+                    "ph": "X",
+                    "ts": (start - self._origin) / 1000,
+                    "dur": (end - start) / 1000,
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": span_args,
+                }
+            )
+
+    def instant(self, name: str, *, cat: str, lane: Optional[str] = None, **args: Any) -> None:
+        tid = self.lane_id(lane or threading.current_thread().name)
+        self._emit(
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "i",
+                "s": "t",
+                "ts": (time.perf_counter_ns() - self._origin) / 1000,
+                "pid": self._pid,
+                "tid": tid,
+                "args": args,
+            }
+        )
+
+    def _emit(self, event: MutableMapping[str, Any]) -> None:
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._handle is None:
+                return
+            self._handle.write(line if self._first else ",\n" + line)
+            self._first = False
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is None:
+                return
+            self._handle.write("\n]\n")
+            self._handle.close()
+            self._handle = None
+
+
+_active: Optional[TraceWriter] = None
+
+
+def start(path: Path) -> TraceWriter:
+    """Begin recording to ``path``; replaces any trace already in progress."""
+
+    global _active
+    stop()
+    _active = TraceWriter(path)
+    return _active
+
+
+def stop() -> Optional[Path]:
+    """Finish the active trace, if any, and return its path."""
+
+    global _active
+    writer, _active = _active, None
+    if writer is None:
+        return None
+    writer.close()
+    return writer.path
+
+
+def span(name: str, *, cat: str, lane: Optional[str] = None, **args: Any) -> ContextManager[MutableMapping[str, Any]]:
+    """Span on the active trace, or a no-op when nothing is being recorded."""
+
+    if _active is None:
+        return nullcontext({})
+    return _active.span(name, cat=cat, lane=lane, **args)
+
+
+def instant(name: str, *, cat: str, lane: Optional[str] = None, **args: Any) -> None:
+    if _active is not None:
+        _active.instant(name, cat=cat, lane=lane, **args)
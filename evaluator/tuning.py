@@ -0,0 +1,429 @@
+"""Generation parameter sweep behind ``evaluate.py tune``.
+
+The sweep collects real prompts by running stage 1 over the test cases, then times the
+loaded model on a sample of them. When token limits are given, it first finds the
+smallest one that leaves reference outputs unchanged and still has ``TOKEN_HEADROOM``
+times the longest reference answer to spare; otherwise the model's default limit is
+kept. It then finds the fastest CPU thread count, and finally the fastest batch size and
+padding strategy whose outputs still match the reference. The winning settings are
+written to the tuning profile that normal runs load automatically.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import shlex
+import sys
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import torch
+
+import evaluate
+from models import ModelInference, SUPPORTED_MODELS
+from timing import peak_rss_from_proc, reset_peak_rss, rss_from_proc
+from tuning_profile import (
+    DEFAULT_PROFILE_PATH,
+    PADDING_STRATEGIES,
+    GenerationSettings,
+    TuningProfile,
+    machine_signature,
+    save_tuning_profile,
+)
+
+DEFAULT_SAMPLE_SIZE = 16
+DEFAULT_BATCH_SIZES = (1, 2, 4, 8)
+# A lowered token limit must leave this multiple of the longest reference answer, since
+# the sample is small and a profile's limit truncates every later run.
+TOKEN_HEADROOM = 2.0
+MEMORY_POLL_SECONDS = 0.05
+
+
+@dataclass
+class SweepMeasurement:
+    """Throughput and memory for one generation configuration."""
+
+    settings: GenerationSettings
+    prompts_per_second: float
+    peak_memory_mb: Optional[float]
+    matches_reference: float
+    # Most tokens generated for one prompt; None when the model reports no token counts.
+    longest_generated: Optional[int] = None
+
+    def to_json(self) -> dict:
+        return {
+            "batch_size": self.settings.batch_size,
+            "padding": self.settings.padding,
+            "num_threads": self.settings.num_threads,
+            "max_new_tokens": self.settings.max_new_tokens,
+            "prompts_per_second": round(self.prompts_per_second, 3),
+            "peak_memory_mb": round(self.peak_memory_mb, 1) if self.peak_memory_mb is not None else None,
+            "matches_reference": round(self.matches_reference, 3),
+            "longest_generated": self.longest_generated,
+        }
+
+
+class PeakMemory:
+    """Track peak memory while a configuration runs.
+
+    On CUDA this reads the allocator's peak. On Linux it resets the process's RSS
+    high-water mark (``VmHWM``) on entry and reads it on exit; kernels that refuse the
+    reset are polled for ``VmRSS`` instead. Elsewhere it falls back to
+    ``ru_maxrss``, the process's peak so far, which is an upper bound for the
+    configuration.
+    """
+
+    def __init__(self) -> None:
+        self.peak_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._high_water_mark = False
+
+    def __enter__(self) -> "PeakMemory":
+        if torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+            return self
+        if rss_from_proc(os.getpid()) is None:
+            return self
+        self._high_water_mark = reset_peak_rss()
+        if not self._high_water_mark:
+            self.peak_mb = self._rss_mb()
+            self._thread = threading.Thread(target=self._poll, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if torch.cuda.is_available():
+            self.peak_mb = torch.cuda.max_memory_allocated() / (1024 * 1024)
+        elif self._high_water_mark:
+            peak_kb = peak_rss_from_proc(os.getpid())
+            self.peak_mb = peak_kb / 1024 if peak_kb is not None else None
+        elif self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+        else:
+            self.peak_mb = _max_rss_mb()
+
+    def _rss_mb(self) -> float:
+        return (rss_from_proc(os.getpid()) or 0.0) / 1024
+
+    def _poll(self) -> None:
+        while not self._stop.wait(MEMORY_POLL_SECONDS):
+            self.peak_mb = max(self.peak_mb or 0.0, self._rss_mb())
+
+
+def _max_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def collect_sample_prompts(
+    *,
+    test_cases_path: Optional[Path],
+    config_path: Optional[Path],
+    jar_path: Optional[Path],
+    only_test_ids: Optional[Sequence[str]],
+    java_cmd: Optional[tuple[str, ...]],
+    prompt_mode: str,
+    sample_size: int,
+    seed: int,
+) -> List[str]:
+    """Run stage 1 over the test cases and return a seeded sample of the queued prompts."""
+
+    test_cases = evaluate.select_test_cases(test_cases_path, only_test_ids)
+    if not test_cases:
+        return []
+    stage_one = evaluate.run_stage_one(
+        test_cases,
+        base_context=evaluate.load_config_context(config_path),
+        jar_path=jar_path or evaluate.find_cli_jar(),
+        java_cmd=java_cmd or evaluate.DEFAULT_JAVA_CMD,
+        prompt_mode=prompt_mode,
+    )
+    prompts = [exchange.prompt for _, pending in stage_one.pending for exchange in pending.prompts]
+    if len(prompts) <= sample_size:
+        return prompts
+    return random.Random(seed).sample(prompts, sample_size)
+
+
+def generate_with(
+    model: ModelInference,
+    prompts: List[str],
+    settings: GenerationSettings,
+) -> tuple[List[str], float, Optional[int]]:
+    """Generate ``prompts`` under ``settings``.
+
+    Returns the responses in input order, the seconds taken, and the most tokens
+    generated for one prompt (``None`` when the model reports no token counts).
+    """
+
+    model.configure(max_new_tokens=settings.max_new_tokens, num_threads=settings.num_threads)
+    responses: List[Optional[str]] = [None] * len(prompts)
+    longest: Optional[int] = None
+    start = time.perf_counter()
+    for chunk_indices in evaluate.generation_chunks(prompts, settings):
+        chunk_responses, chunk_stats = evaluate.generate_responses(model, [prompts[index] for index in chunk_indices])
+        for index, response in zip(chunk_indices, chunk_responses):
+            responses[index] = response
+        for stats in chunk_stats:
+            if stats is not None:
+                longest = max(longest or 0, stats.generated_tokens)
+    elapsed = time.perf_counter() - start
+    return [response or "" for response in responses], elapsed, longest
+
+
+def measure(
+    model: ModelInference,
+    prompts: List[str],
+    settings: GenerationSettings,
+    reference: Optional[List[str]],
+) -> tuple[SweepMeasurement, List[str]]:
+    with PeakMemory() as memory:
+        responses, elapsed, longest = generate_with(model, prompts, settings)
+    if reference is None:
+        agreement = 1.0
+    else:
+        agreement = sum(1 for got, want in zip(responses, reference) if got == want) / len(prompts)
+    measurement = SweepMeasurement(
+        settings=settings,
+        prompts_per_second=len(prompts) / elapsed if elapsed > 0 else float("inf"),
+        peak_memory_mb=memory.peak_mb,
+        matches_reference=agreement,
+        longest_generated=longest,
+    )
+    print(
+        f"  batch={settings.batch_size} padding={settings.padding} threads={settings.num_threads} "
+        f"max_new_tokens={settings.max_new_tokens or 'default'}: {measurement.prompts_per_second:.2f} prompts/s, "
+        f"agreement {agreement * 100:.0f}%"
+    )
+    return measurement, responses
+
+
+def default_thread_counts() -> List[int]:
+    cpus = os.cpu_count() or 1
+    return sorted({1, max(1, cpus // 2), cpus})
+
+
+def sweep(
+    model: ModelInference,
+    prompts: List[str],
+    *,
+    batch_sizes: Sequence[int],
+    paddings: Sequence[str],
+    thread_counts: Sequence[int],
+    token_limits: Optional[Sequence[int]] = None,
+) -> tuple[GenerationSettings, List[SweepMeasurement]]:
+    """Sweep one dimension at a time and return the best settings plus every measurement.
+
+    The first measurement is the reference. Without ``token_limits`` the model's default
+    ``max_new_tokens`` is kept; with them, the reference uses the largest and a smaller
+    one is only chosen with ``TOKEN_HEADROOM`` over the longest reference answer.
+    """
+
+    measurements: List[SweepMeasurement] = []
+    limits = sorted(set(token_limits or ()))
+
+    best = GenerationSettings(batch_size=1, max_new_tokens=limits[-1] if limits else None)
+    print("Warm-up...")
+    # The first generate call pays for lazy initialisation; keep it out of every timing.
+    generate_with(model, prompts[:1], best)
+
+    print(f"Reference outputs (batch 1, {'largest token limit' if limits else 'model default token limit'})...")
+    current, reference = measure(model, prompts, best, None)
+    measurements.append(current)
+
+    longest = current.longest_generated
+    if len(limits) > 1:
+        print("Token limits...")
+    for limit in limits[:-1]:
+        if longest is None:
+            print("  Token limit kept: the model reports no token counts, so headroom cannot be checked.")
+            break
+        needed = math.ceil(longest * TOKEN_HEADROOM)
+        if limit < needed:
+            print(
+                f"  max_new_tokens={limit}: skipped, needs at least {needed} "
+                f"({TOKEN_HEADROOM:g}x the longest reference answer, {longest} tokens)"
+            )
+            continue
+        measurement, _ = measure(model, prompts, replace(best, max_new_tokens=limit), reference)
+        measurements.append(measurement)
+        if measurement.matches_reference == 1.0:
+            best, current = measurement.settings, measurement
+            break
+
+    if not torch.cuda.is_available():
+        print("Thread counts...")
+        # The default thread count (num_threads=None) is already measured as ``current``;
+        # an explicit count must beat it to be chosen.
+        base, fastest = best, current.prompts_per_second
+        default_threads = torch.get_num_threads()
+        for threads in thread_counts:
+            measurement, _ = measure(model, prompts, replace(base, num_threads=threads), reference)
+            measurements.append(measurement)
+            if measurement.prompts_per_second > fastest:
+                fastest = measurement.prompts_per_second
+                best = measurement.settings
+        # configure() leaves threads alone for None, so put the default back explicitly.
+        model.configure(num_threads=best.num_threads or default_threads)
+
+    print("Batch sizes and padding...")
+    candidates: List[SweepMeasurement] = []
+    for batch_size in batch_sizes:
+        for padding in paddings:
+            settings = replace(best, batch_size=batch_size, padding=padding)
+            measurement, _ = measure(model, prompts, settings, reference)
+            measurements.append(measurement)
+            if measurement.matches_reference == 1.0:
+                candidates.append(measurement)
+    if candidates:
+        best = max(candidates, key=lambda item: item.prompts_per_second).settings
+    return best, measurements
+
+
+def _int_list(value: str) -> List[int]:
+    try:
+        values = [int(item) for item in value.split(",") if item.strip()]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got '{value}'") from exc
+    if not values or any(item < 1 for item in values):
+        raise argparse.ArgumentTypeError(f"expected positive integers, got '{value}'")
+    return values
+
+
+def _iter_table(measurements: Sequence[SweepMeasurement]) -> Iterator[str]:
+    yield "| Batch | Padding | Threads | Max tokens | Prompts/s | Peak memory | Agreement |"
+    yield "| --- | --- | --- | --- | --- | --- | --- |"
+    for item in measurements:
+        memory = f"{item.peak_memory_mb:.0f} MB" if item.peak_memory_mb is not None else "n/a"
+        yield (
+            f"| {item.settings.batch_size} | {item.settings.padding} | {item.settings.num_threads or 'default'} "
+            f"| {item.settings.max_new_tokens} | {item.prompts_per_second:.2f} | {memory} "
+            f"| {item.matches_reference * 100:.0f}% |"
+        )
+
+
+def parse_tune_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="evaluate.py tune",
+        description="Sweep generation settings on this machine and write a tuning profile.",
+    )
+    parser.add_argument("--model", required=True, choices=SUPPORTED_MODELS, help="Model to tune.")
+    parser.add_argument("--jar", type=Path, help="Path to the Kotlin CLI jar.")
+    parser.add_argument("--config", type=Path, default=evaluate.CONFIG_FILE, help="Path to config.json.")
+    parser.add_argument("--test-cases", type=Path, default=evaluate.TEST_CASES_FILE, help="Markdown test cases.")
+    parser.add_argument("--test", dest="tests", action="append", help="Limit prompt collection to these IDs.")
+    parser.add_argument("--java", metavar="CMD", help="Override the java command used to launch the CLI.")
+    parser.add_argument(
+        "--prompt-mode",
+        choices=evaluate.PROMPT_MODES,
+        default=evaluate.PROMPT_MODE_PER_FIELD,
+        help="Prompt mode used when collecting sample prompts.",
+    )
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE_SIZE, help="Number of prompts to time.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for prompt sampling.")
+    parser.add_argument("--batch-sizes", type=_int_list, default=list(DEFAULT_BATCH_SIZES))
+    parser.add_argument("--paddings", nargs="+", choices=PADDING_STRATEGIES, default=list(PADDING_STRATEGIES))
+    parser.add_argument("--threads", type=_int_list, default=default_thread_counts())
+    parser.add_argument(
+        "--max-new-tokens",
+        type=_int_list,
+        help=(
+            "Comma-separated token limits to try, e.g. 64,128,256. Without it the model's default limit "
+            "is kept, since a lowered limit truncates longer answers in every later run."
+        ),
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_PROFILE_PATH,
+        help="Profile file to write (defaults to evaluator/tuning_profile.json).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover - CLI entrypoint
+    args = parse_tune_args(argv)
+    java_cmd = tuple(shlex.split(args.java)) if args.java else None
+
+    try:
+        prompts = collect_sample_prompts(
+            test_cases_path=args.test_cases,
+            config_path=args.config,
+            jar_path=args.jar,
+            only_test_ids=args.tests,
+            java_cmd=java_cmd,
+            prompt_mode=args.prompt_mode,
+            sample_size=args.sample,
+            seed=args.seed,
+        )
+    except FileNotFoundError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(2) from exc
+    if not prompts:
+        print("No prompts collected; the selected cases never needed AI refinement.", file=sys.stderr)
+        raise SystemExit(4)
+
+    print(f"Tuning {args.model} on {len(prompts)} prompt(s)...")
+    model = ModelInference(args.model)
+    try:
+        best, measurements = sweep(
+            model,
+            prompts,
+            batch_sizes=args.batch_sizes,
+            paddings=args.paddings,
+            thread_counts=args.threads,
+            token_limits=args.max_new_tokens,
+        )
+    except Exception as exc:  # pragma: no cover - model runtime issue
+        print(f"Error: Model inference failed: {exc}", file=sys.stderr)
+        raise SystemExit(3) from exc
+    finally:
+        model.close()
+
+    print()
+    for line in _iter_table(measurements):
+        print(line)
+    profile = TuningProfile(
+        machine=machine_signature(),
+        models={args.model: best},
+        measurements={args.model: [item.to_json() for item in measurements]},
+    )
+    path = save_tuning_profile(profile, args.output)
+    print()
+    print(
+        f"Selected batch={best.batch_size} padding={best.padding} threads={best.num_threads or 'default'} "
+        f"max_new_tokens={best.max_new_tokens or 'default'}"
+    )
+    print_token_limit(best, measurements[0])
+    print(f"Tuning profile written to: {path}")
+
+
+def print_token_limit(best: GenerationSettings, reference: SweepMeasurement) -> None:
+    """Spell out the saved token limit, since it silently truncates answers in later runs."""
+
+    longest = reference.longest_generated
+    seen = f"longest sampled answer: {longest} tokens" if longest is not None else "answer lengths not reported"
+    print()
+    if best.max_new_tokens is None:
+        print(f"TOKEN LIMIT: model default ({seen}). Pass --max-new-tokens to try lower limits.")
+        return
+    print(f"TOKEN LIMIT: max_new_tokens={best.max_new_tokens} ({seen}).")
+    print("  Every run that loads this profile stops answers at this many tokens.")
+    if longest is not None and longest >= best.max_new_tokens:
+        print(
+            "  Warning: some reference answers reached the limit and may already be truncated; "
+            "try a larger --max-new-tokens.",
+            file=sys.stderr,
+        )
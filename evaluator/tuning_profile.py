@@ -0,0 +1,132 @@
+"""Per-machine generation settings written by ``evaluate.py tune``."""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Mapping, MutableMapping, Optional
+
+PROFILE_VERSION = 1
+DEFAULT_PROFILE_PATH = Path(__file__).resolve().with_name("tuning_profile.json")
+DEFAULT_BATCH_SIZE = 4
+PADDING_IN_ORDER = "in_order"
+PADDING_LENGTH_SORTED = "length_sorted"
+PADDING_STRATEGIES = (PADDING_IN_ORDER, PADDING_LENGTH_SORTED)
+
+
+@dataclass(frozen=True)
+class GenerationSettings:
+    """Knobs that control how queued prompts are fed to a model.
+
+    ``None`` for ``num_threads`` or ``max_new_tokens`` keeps the library/model default.
+    """
+
+    batch_size: int = DEFAULT_BATCH_SIZE
+    padding: str = PADDING_IN_ORDER
+    num_threads: Optional[int] = None
+    max_new_tokens: Optional[int] = None
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> "GenerationSettings":
+        batch_size = int(data.get("batch_size") or DEFAULT_BATCH_SIZE)
+        padding = str(data.get("padding") or PADDING_IN_ORDER)
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        if padding not in PADDING_STRATEGIES:
+            raise ValueError(f"Unknown padding strategy '{padding}'")
+        num_threads = data.get("num_threads")
+        max_new_tokens = data.get("max_new_tokens")
+        return cls(
+            batch_size=batch_size,
+            padding=padding,
+            num_threads=int(num_threads) if num_threads else None,
+            max_new_tokens=int(max_new_tokens) if max_new_tokens else None,
+        )
+
+
+@dataclass
+class TuningProfile:
+    """Tuned settings per model, tagged with the machine they were measured on."""
+
+    machine: MutableMapping[str, Any] = field(default_factory=lambda: machine_signature())
+    models: MutableMapping[str, GenerationSettings] = field(default_factory=dict)
+    measurements: MutableMapping[str, Any] = field(default_factory=dict)
+
+    def settings_for(self, model_name: str) -> GenerationSettings:
+        return self.models.get(model_name, GenerationSettings())
+
+    def to_json(self) -> MutableMapping[str, Any]:
+        return {
+            "version": PROFILE_VERSION,
+            "machine": dict(self.machine),
+            "models": {name: asdict(settings) for name, settings in self.models.items()},
+            "measurements": dict(self.measurements),
+        }
+
+
+def machine_signature() -> MutableMapping[str, Any]:
+    """Describe the hardware a profile was tuned on."""
+
+    signature: MutableMapping[str, Any] = {
+        "hostname": platform.node(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import torch
+    except ImportError:  # pragma: no cover - torch is a hard dependency of models.py
+        return signature
+    if torch.cuda.is_available():
+        signature["cuda_device"] = torch.cuda.get_device_name(0)
+    return signature
+
+
+def load_tuning_profile(path: Optional[Path] = None) -> Optional[TuningProfile]:
+    """Read a profile, returning ``None`` when it is absent or unusable."""
+
+    profile_path = path or DEFAULT_PROFILE_PATH
+    if not profile_path.exists():
+        return None
+    try:
+        data = json.loads(profile_path.read_text(encoding="utf-8"))
+        if data.get("version") != PROFILE_VERSION:
+            raise ValueError(f"unsupported version {data.get('version')!r}")
+        models = {
+            name: GenerationSettings.from_mapping(settings)
+            for name, settings in (data.get("models") or {}).items()
+        }
+    except (OSError, ValueError, TypeError, AttributeError) as exc:
+        print(f"Warning: ignoring tuning profile {profile_path}: {exc}", file=sys.stderr)
+        return None
+    profile = TuningProfile(
+        machine=data.get("machine") or {},
+        models=models,
+        measurements=data.get("measurements") or {},
+    )
+    current = machine_signature()
+    if profile.machine.get("hostname") and profile.machine.get("hostname") != current.get("hostname"):
+        print(
+            f"Warning: tuning profile {profile_path} was measured on "
+            f"'{profile.machine.get('hostname')}', not this machine.",
+            file=sys.stderr,
+        )
+    return profile
+
+
+def save_tuning_profile(profile: TuningProfile, path: Optional[Path] = None) -> Path:
+    """Write ``profile`` to disk, merging with any models already tuned in that file."""
+
+    profile_path = path or DEFAULT_PROFILE_PATH
+    existing = load_tuning_profile(profile_path) if profile_path.exists() else None
+    if existing is not None:
+        existing.models.update(profile.models)
+        existing.measurements.update(profile.measurements)
+        existing.machine = profile.machine
+        profile = existing
+    profile_path.parent.mkdir(parents=True, exist_ok=True)
+    profile_path.write_text(json.dumps(profile.to_json(), indent=2) + "\n", encoding="utf-8")
+    return profile_path
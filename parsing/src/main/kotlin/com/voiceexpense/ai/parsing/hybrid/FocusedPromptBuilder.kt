@@ -48,6 +48,30 @@ class FocusedPromptBuilder {
         return clamped
     }
 
+    /**
+     * Builds one multi-field JSON prompt covering every target field, regardless of how
+     * many there are. Used when refinement is coalesced into a single generation.
+     */
+    fun buildCoalescedPrompt(
+        input: String,
+        heuristicDraft: HeuristicDraft,
+        targetFields: Set<FieldKey>,
+        context: ParsingContext = ParsingContext()
+    ): String {
+        if (targetFields.isEmpty()) {
+            return buildFocusedPrompt(input, heuristicDraft, targetFields, context)
+        }
+        val orderedFields = targetFields
+            .sortedBy { FIELD_ORDER.indexOf(it).takeIf { index -> index >= 0 } ?: Int.MAX_VALUE }
+        val prompt = buildMultiFieldPrompt(LinkedHashSet(orderedFields), input, heuristicDraft, context)
+        val clamped = prompt.take(MAX_PROMPT_LENGTH)
+        Log.d(
+            tag,
+            "built coalesced prompt len=${clamped.length} fields=${orderedFields.joinToString()}"
+        )
+        return clamped
+    }
+
     private fun buildTemplatePrompt(
         fields: List<FieldKey>,
         input: String,
@@ -23,7 +23,8 @@ class HybridTransactionParser(
             heuristicExtractor = heuristicExtractor,
             genAiGateway = genai,
             focusedPromptBuilder = FocusedPromptBuilder(),
-            thresholds = thresholds
+            thresholds = thresholds,
+            coalescePrompts = stagedConfig.coalescePrompts
         )
     }
 
@@ -138,7 +139,9 @@ class HybridTransactionParser(
     }
 
     data class StagedParsingConfig(
-        val enabled: Boolean = true
+        val enabled: Boolean = true,
+        /** Ask for all target fields in one multi-field prompt instead of one prompt per field. */
+        val coalescePrompts: Boolean = false
     )
 
     companion object {
@@ -37,14 +37,15 @@ typealias FieldRefinementListener = suspend (FieldRefinementUpdate) -> Unit
  *
  * Each invocation executes Stage 1 heuristics, decides whether Stage 2 is required,
  * performs the focused prompt call, and merges the result back while respecting
- * user modifications.
+ * user modifications. With [coalescePrompts] all target fields share one prompt.
  */
 class StagedParsingOrchestrator(
     private val heuristicExtractor: HeuristicExtractor,
     private val genAiGateway: GenAiGateway,
     private val focusedPromptBuilder: FocusedPromptBuilder,
     private val thresholds: FieldConfidenceThresholds = FieldConfidenceThresholds.DEFAULT,
-    private val fieldSelector: FieldSelectionStrategy = FieldSelectionStrategy
+    private val fieldSelector: FieldSelectionStrategy = FieldSelectionStrategy,
+    private val coalescePrompts: Boolean = false
 ) {
     private val moshi = Moshi.Builder()
         .add(KotlinJsonAdapterFactory())
@@ -171,46 +172,53 @@ class StagedParsingOrchestrator(
         }
         val cumulativeRefinements = linkedMapOf<FieldKey, Any?>()
         var stage2DurationMs = 0L
-        orderedTargetFields.forEach { field ->
-            val attempt = refineSingleField(
-                field = field,
+        val promptGroups = if (coalescePrompts && orderedTargetFields.size > 1) {
+            listOf(orderedTargetFields)
+        } else {
+            orderedTargetFields.map { listOf(it) }
+        }
+        promptGroups.forEach { fields ->
+            val attempt = refineFields(
+                fields = fields,
                 input = input,
                 context = context,
                 draftForPrompt = heuristicDraft,
                 refinementErrors = refinementErrors
             )
             stage2DurationMs += attempt.durationMs
-            val normalizedValue = normalizeFieldValue(field, attempt.refinedValue, context)
-            normalizedValue?.let { value ->
-                cumulativeRefinements[field] = value
-                heuristicDraft = applyRefinementToDraft(heuristicDraft, field, value)
-                logger?.addEntry(
-                    type = ParsingRunLogEntryType.SUMMARY,
-                    title = "Refinement applied for ${field.name.lowercase(Locale.US)}",
-                    detail = buildString {
-                        appendLine("duration=${attempt.durationMs}ms")
-                        appendLine("value=$value")
-                    },
-                    field = field
-                )
-            }
-            listener?.let { callback ->
-                callback(
-                    FieldRefinementUpdate(
-                        field = field,
-                        value = normalizedValue,
-                        durationMs = attempt.durationMs,
-                        error = attempt.errorMessage
+            fields.forEach { field ->
+                val normalizedValue = normalizeFieldValue(field, attempt.refinedValues[field], context)
+                normalizedValue?.let { value ->
+                    cumulativeRefinements[field] = value
+                    heuristicDraft = applyRefinementToDraft(heuristicDraft, field, value)
+                    logger?.addEntry(
+                        type = ParsingRunLogEntryType.SUMMARY,
+                        title = "Refinement applied for ${field.name.lowercase(Locale.US)}",
+                        detail = buildString {
+                            appendLine("duration=${attempt.durationMs}ms")
+                            appendLine("value=$value")
+                        },
+                        field = field
                     )
-                )
-            }
-            if (attempt.errorMessage != null) {
-                logger?.addEntry(
-                    type = ParsingRunLogEntryType.ERROR,
-                    title = "Refinement error for ${field.name.lowercase(Locale.US)}",
-                    detail = attempt.errorMessage,
-                    field = field
-                )
+                }
+                listener?.let { callback ->
+                    callback(
+                        FieldRefinementUpdate(
+                            field = field,
+                            value = normalizedValue,
+                            durationMs = attempt.durationMs,
+                            error = attempt.errorMessage
+                        )
+                    )
+                }
+                if (attempt.errorMessage != null) {
+                    logger?.addEntry(
+                        type = ParsingRunLogEntryType.ERROR,
+                        title = "Refinement error for ${field.name.lowercase(Locale.US)}",
+                        detail = attempt.errorMessage,
+                        field = field
+                    )
+                }
             }
         }
 
@@ -250,24 +258,39 @@ class StagedParsingOrchestrator(
         )
     }
 
-    private suspend fun refineSingleField(
-        field: FieldKey,
+    /**
+     * Requests refinement for [fields] with a single prompt. One field uses the focused
+     * template; several fields (coalesced mode) share one multi-field JSON prompt.
+     */
+    private suspend fun refineFields(
+        fields: List<FieldKey>,
         input: String,
         context: ParsingContext,
         draftForPrompt: HeuristicDraft,
         refinementErrors: MutableList<String>
-    ): SingleFieldAttempt {
+    ): RefinementAttempt {
         val logger = context.runLogBuilder
-        val prompt = focusedPromptBuilder.buildFocusedPrompt(
-            input = input,
-            heuristicDraft = draftForPrompt,
-            targetFields = linkedSetOf(field),
-            context = context
-        )
+        val field = fields.singleOrNull()
+        val label = fields.joinToString(separator = ",") { it.name.lowercase(Locale.US) }
+        val prompt = if (field != null) {
+            focusedPromptBuilder.buildFocusedPrompt(
+                input = input,
+                heuristicDraft = draftForPrompt,
+                targetFields = linkedSetOf(field),
+                context = context
+            )
+        } else {
+            focusedPromptBuilder.buildCoalescedPrompt(
+                input = input,
+                heuristicDraft = draftForPrompt,
+                targetFields = LinkedHashSet(fields),
+                context = context
+            )
+        }
         logFocusedPrompt(prompt)
         logger?.addEntry(
             type = ParsingRunLogEntryType.PROMPT,
-            title = "Focused prompt for ${field.name.lowercase(Locale.US)}",
+            title = "Focused prompt for $label",
             detail = prompt,
             field = field
         )
@@ -288,7 +311,7 @@ class StagedParsingOrchestrator(
                     Log.e(TAG, "GenAI structured call failed", throwable)
                     logger?.addEntry(
                         type = ParsingRunLogEntryType.ERROR,
-                        title = "AI failure for ${field.name.lowercase(Locale.US)}",
+                        title = "AI failure for $label",
                         detail = throwable.stackTraceToString(),
                         field = field
                     )
@@ -314,11 +337,11 @@ class StagedParsingOrchestrator(
             } catch (_: Throwable) {}
             logger?.addEntry(
                 type = ParsingRunLogEntryType.ERROR,
-                title = "AI invocation error for ${field.name.lowercase(Locale.US)}",
+                title = "AI invocation error for $label",
                 detail = t.stackTraceToString(),
                 field = field
             )
-            return SingleFieldAttempt(durationMs = durationMs, errorMessage = message)
+            return RefinementAttempt(durationMs = durationMs, errorMessage = message)
         }
 
         if (aiPayload.isNullOrBlank()) {
@@ -328,17 +351,17 @@ class StagedParsingOrchestrator(
             refinementErrors += message
             logger?.addEntry(
                 type = ParsingRunLogEntryType.ERROR,
-                title = "AI blank response for ${field.name.lowercase(Locale.US)}",
+                title = "AI blank response for $label",
                 detail = "duration=${durationMs}ms",
                 field = field
             )
-            return SingleFieldAttempt(durationMs = durationMs, errorMessage = message)
+            return RefinementAttempt(durationMs = durationMs, errorMessage = message)
         }
 
         val validation = ValidationPipeline.validateRawResponse(aiPayload!!)
         logger?.addEntry(
             type = ParsingRunLogEntryType.RESPONSE,
-            title = "Focused response for ${field.name.lowercase(Locale.US)}",
+            title = "Focused response for $label",
             detail = aiPayload,
             field = field
         )
@@ -361,7 +384,7 @@ class StagedParsingOrchestrator(
             } catch (_: Throwable) {}
             logger?.addEntry(
                 type = ParsingRunLogEntryType.VALIDATION,
-                title = "Validation failed for ${field.name.lowercase(Locale.US)}",
+                title = "Validation failed for $label",
                 detail = buildString {
                     appendLine("errors=${validation.errors}")
                     val snippet = aiPayload!!.replace("\n", " ").take(300)
@@ -369,7 +392,7 @@ class StagedParsingOrchestrator(
                 },
                 field = field
             )
-            return SingleFieldAttempt(durationMs = durationMs, errorMessage = message.takeIf { it.isNotBlank() })
+            return RefinementAttempt(durationMs = durationMs, errorMessage = message.takeIf { it.isNotBlank() })
         }
 
         try {
@@ -378,7 +401,7 @@ class StagedParsingOrchestrator(
         } catch (_: Throwable) {}
         logger?.addEntry(
             type = ParsingRunLogEntryType.VALIDATION,
-            title = "Validation succeeded for ${field.name.lowercase(Locale.US)}",
+            title = "Validation succeeded for $label",
             detail = buildString {
                 appendLine("duration=${durationMs}ms")
                 appendLine("normalized=${validation.normalizedJson}")
@@ -387,18 +410,17 @@ class StagedParsingOrchestrator(
         )
 
         val normalized = validation.normalizedJson
-        val updates = extractFieldUpdates(normalized, setOf(field))
-        val value = updates[field]
+        val updates = extractFieldUpdates(normalized, fields.toSet())
 
         try {
             Log.d(
                 "AI.Debug",
-                "Applied refinement for ${field.name.lowercase(Locale.US)} totalErrors=${refinementErrors.size}"
+                "Applied refinement for $label totalErrors=${refinementErrors.size}"
             )
         } catch (_: Throwable) {}
-        Log.d(TAG, "Applied refinements=${field.name} errors=${refinementErrors.size}")
+        Log.d(TAG, "Applied refinements=${fields.joinToString { it.name }} errors=${refinementErrors.size}")
 
-        return SingleFieldAttempt(refinedValue = value, durationMs = durationMs)
+        return RefinementAttempt(refinedValues = updates, durationMs = durationMs)
     }
 
     private fun extractFieldUpdates(
@@ -654,8 +676,8 @@ class StagedParsingOrchestrator(
         return available
     }
 
-    private data class SingleFieldAttempt(
-        val refinedValue: Any? = null,
+    private data class RefinementAttempt(
+        val refinedValues: Map<FieldKey, Any?> = emptyMap(),
         val durationMs: Long = 0L,
         val errorMessage: String? = null
     )